@@ -23,9 +23,14 @@ usage: oci_inventory.py [-h] [--list] [--host HOST] [-config CONFIG_FILE]
                         [--compartment COMPARTMENT]
                         [--parent-compartment-ocid PARENT_COMPARTMENT_OCID]
                         [--fetch-hosts-from-subcompartments] [--refresh-cache]
+                        [--cache-format {json,compact,compact_gzip}]
+                        [--incremental-refresh]
                         [--debug] [--auth {api_key,instance_principal}]
                         [--enable-parallel-processing]
                         [--max-thread-count MAX_THREAD_COUNT]
+                        [--max-thread-count-per-region MAX_THREAD_COUNT_PER_REGION]
+                        [--hostvars-include HOSTVARS_INCLUDE]
+                        [--hostvars-exclude HOSTVARS_EXCLUDE]
                         [--freeform-tags FREEFORM_TAGS]
                         [--defined-tags DEFINED_TAGS] [--regions REGIONS]
                         [--exclude-regions EXCLUDE_REGIONS]
@@ -66,6 +71,22 @@ optional arguments:
                         Use this option whenever you are building inventory
                         with new filter options to avoid reading cached
                         inventory. (default: False - use cache files)
+  --cache-format {json,compact,compact_gzip}
+                        Format of the cache file. 'json' writes the inventory
+                        as indented JSON. 'compact' writes JSON without
+                        whitespace and stores each distinct host var value
+                        once, which makes large caches smaller and faster to
+                        read. 'compact_gzip' also compresses the compact cache
+                        with gzip. The format of an existing cache is detected
+                        when it is read. Defaults to json. This value can also
+                        be provided in the settings config file.
+  --incremental-refresh
+                        When the cache is outdated, only rebuild the inventory
+                        of the instances which were added or changed since the
+                        last build and reuse the saved inventory, including
+                        the network details, of the unchanged instances. Use
+                        --refresh-cache to force a full rebuild. This value
+                        can also be provided in the settings config file.
   --debug               Send debug messages to STDERR
   --auth {api_key,instance_principal}
                         The type of authentication to use for making API
@@ -86,6 +107,26 @@ optional arguments:
                         specifies the maximum number of threads to use.
                         Defaults to 50. This value can also be provided in the
                         settings config file.
+  --max-thread-count-per-region MAX_THREAD_COUNT_PER_REGION
+                        Only valid when --enable-parallel-processing is set.
+                        The threads are shared by all the regions. This option
+                        specifies the maximum number of threads making API
+                        calls to a single region at a time. Defaults to the
+                        value of --max-thread-count. This value can also be
+                        provided in the settings config file.
+  --hostvars-include HOSTVARS_INCLUDE
+                        Comma separated list of the host vars to include in
+                        the inventory. Use dotted paths for the keys of nested
+                        host vars, eg:
+                        id,display_name,metadata.ssh_authorized_keys. All the
+                        host vars are included by default. This value can also
+                        be provided in the settings config file.
+  --hostvars-exclude HOSTVARS_EXCLUDE
+                        Comma separated list of the host vars to exclude from
+                        the inventory. Use dotted paths for the keys of nested
+                        host vars, eg: metadata.user_data,extended_metadata.
+                        This value can also be provided in the settings config
+                        file.
   --freeform-tags FREEFORM_TAGS
                         Freeform tags provided as a string in valid JSON
                         format. Example: { "stage": "dev", "app": "demo"} Use
@@ -200,37 +241,175 @@ import json
 import os
 import re
 import sys
-from time import time
+from time import sleep, time
 from ansible.module_utils import six
 from ansible.module_utils.six.moves import configparser
 from ansible.module_utils._text import to_bytes, to_text
-from ansible.module_utils.urls import open_url
-from collections import deque, defaultdict
+from collections import defaultdict
 from multiprocessing.pool import ThreadPool
 from contextlib import contextmanager
+import gzip
 import hashlib
-from functools import partial
+import io
+import socket
+import tempfile
+from functools import partial, wraps
+from itertools import chain
+import threading
 import traceback
 
 try:
+    from importlib.util import find_spec
+except ImportError:
+    from pkgutil import find_loader as find_spec
+
+# Importing the OCI Python SDK imports the clients of all the services, which takes a considerable part of the run time
+# of the script when the inventory is read from the cache. The SDK is only imported by _import_oci_sdk when the
+# inventory needs to be built.
+HAS_OCI_PY_SDK = find_spec("oci") is not None
+oci = None
+RetryStrategyBuilder = None
+HEADER_NEXT_PAGE = None
+ComputeClient = None
+IdentityClient = None
+VirtualNetworkClient = None
+GetPublicIpByIpAddressDetails = None
+ResourceSearchClient = None
+StructuredSearchDetails = None
+to_dict = None
+ServiceError = None
+Compartment = None
+
+__version__ = "1.16.0"
+inventory_agent_name = "Oracle-Ansible-Inv/"
+
+
+def _import_oci_sdk():
+    global oci, RetryStrategyBuilder, HEADER_NEXT_PAGE, to_dict, ServiceError
+    global ComputeClient, IdentityClient, VirtualNetworkClient, ResourceSearchClient
+    global GetPublicIpByIpAddressDetails, StructuredSearchDetails, Compartment
+    if oci is not None:
+        return
     import oci
     from oci.retry import RetryStrategyBuilder
     from oci.constants import HEADER_NEXT_PAGE
     from oci.core.compute_client import ComputeClient
     from oci.identity.identity_client import IdentityClient
     from oci.core.virtual_network_client import VirtualNetworkClient
+    from oci.core.models import GetPublicIpByIpAddressDetails
+    from oci.resource_search.resource_search_client import ResourceSearchClient
+    from oci.resource_search.models import StructuredSearchDetails
     from oci.util import to_dict
     from oci.exceptions import ServiceError
+    from oci.identity.models import Compartment
 
-    HAS_OCI_PY_SDK = True
-except ImportError:
-    HAS_OCI_PY_SDK = False
 
-__version__ = "1.16.0"
-inventory_agent_name = "Oracle-Ansible-Inv/"
+class AdaptiveRateLimiter(object):
+    """Token bucket limiting the rate of the requests sent to a service endpoint. The rate is halved when the service
+    throttles a request (HTTP 429) and increased by additive_increase requests per second for every successful
+    request, up to max_rate. Same as oci_common_utils.AdaptiveRateLimiter."""
+
+    def __init__(
+        self,
+        name,
+        max_rate,
+        min_rate=1.0,
+        additive_increase=0.1,
+        decrease_factor=0.5,
+        log=None,
+    ):
+        self.name = name
+        self.max_rate = float(max_rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.log = log
+        self.rate = self.max_rate
+        self.tokens = self.max_rate
+        self._last_refill_time = time()
+        self._last_decrease_time = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.max_rate, self.tokens + (now - self._last_refill_time) * self.rate
+        )
+        self._last_refill_time = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill(time())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            sleep(wait_time)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate >= self.max_rate:
+                return
+            self._refill(time())
+            self.rate = min(self.max_rate, self.rate + self.additive_increase)
+            recovered = self.rate == self.max_rate
+        if recovered and self.log:
+            self.log(
+                "Rate of the requests to {0} recovered to {1:.2f} requests per second.".format(
+                    self.name, self.max_rate
+                )
+            )
+
+    def on_throttle(self):
+        with self._lock:
+            now = time()
+            # The requests in flight when the rate was decreased are likely throttled too, so decrease the rate at
+            # most once per second.
+            if self._last_decrease_time and now - self._last_decrease_time < 1:
+                return
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = min(self.tokens, 0)
+            self._last_decrease_time = now
+            rate = self.rate
+        if self.log:
+            self.log(
+                "Request to {0} throttled. Decreased the rate to {1:.2f} requests per second.".format(
+                    self.name, rate
+                )
+            )
+
+    def call(self, fn, *args, **kwargs):
+        self.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except ServiceError as ex:
+            if ex.status == 429:
+                self.on_throttle()
+            raise
+        self.on_success()
+        return result
+
+
+def rate_limit_call_api(call_api, rate_limiter):
+    """Return a wrapper of the call_api method of a base client which sends every request through the rate limiter.
+    Same as oci_common_utils.rate_limit_call_api."""
+
+    @wraps(call_api)
+    def _call_api(*args, **kwargs):
+        return rate_limiter.call(call_api, *args, **kwargs)
+
+    _call_api.rate_limiter = rate_limiter
+    return _call_api
+
+
+_retry_strategy = None
 
 
 def _get_retry_strategy():
+    global _retry_strategy
+    if _retry_strategy is not None:
+        return _retry_strategy
     retry_strategy_builder = RetryStrategyBuilder(
         max_attempts_check=True,
         max_attempts=10,
@@ -242,7 +421,8 @@ def _get_retry_strategy():
         service_error_retry_config={429: [], 400: ["QuotaExceeded", "LimitExceeded"]},
         service_error_retry_on_any_5xx=True,
     )
-    return retry_strategy_builder.get_retry_strategy()
+    _retry_strategy = retry_strategy_builder.get_retry_strategy()
+    return _retry_strategy
 
 
 def list_all_resources(target_fn, **kwargs):
@@ -275,19 +455,95 @@ def call_with_backoff(fn, **kwargs):
             return fn(**kwargs)
 
 
+def _get_path_tree(paths):
+    """Return the dotted paths as a tree of dicts. The keys where a path ends map to None."""
+    tree = {}
+    for path in paths:
+        node = tree
+        keys = path.split(".")
+        for key in keys[:-1]:
+            if key in node and node[key] is None:
+                # a shorter path already covers this path
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[keys[-1]] = None
+    return tree
+
+
+def _include_path_tree(d, tree):
+    included = dict()
+    for key, subtree in six.iteritems(tree):
+        if key not in d:
+            continue
+        if subtree is None:
+            included[key] = d[key]
+        elif isinstance(d[key], dict):
+            included[key] = _include_path_tree(d[key], subtree)
+    return included
+
+
+def _exclude_path_tree(d, tree):
+    excluded = dict(d)
+    for key, subtree in six.iteritems(tree):
+        if key not in excluded:
+            continue
+        if subtree is None:
+            del excluded[key]
+        elif isinstance(excluded[key], dict):
+            excluded[key] = _exclude_path_tree(excluded[key], subtree)
+    return excluded
+
+
+def project_dict(d, include_paths=None, exclude_paths=None):
+    """Return a copy of the dictionary with only the keys in include_paths and without the keys in exclude_paths.
+    The paths are dotted paths to the keys of nested dictionaries, eg: metadata.user_data. All the keys are included
+    when include_paths is not set. The given dictionary is not modified."""
+    if include_paths:
+        d = _include_path_tree(d, _get_path_tree(include_paths))
+    if exclude_paths:
+        d = _exclude_path_tree(d, _get_path_tree(exclude_paths))
+    return d
+
+
 class OCIInventory:
 
     LIFECYCLE_ACTIVE_STATE = "ACTIVE"
     LIFECYCLE_RUNNING_STATE = "RUNNING"
     LIFECYCLE_ATTACHED_STATE = "ATTACHED"
+    CACHE_FORMATS = ["json", "compact", "compact_gzip"]
+    # The compact cache is written with sorted keys, so that it always starts with the cache_format key.
+    COMPACT_CACHE_PREFIX = '{"cache_format":"compact"'
+    GZIP_MAGIC = b"\x1f\x8b"
 
     def __init__(self):
-        self.inventory = {"all": {"hosts": [], "vars": {}}, "_meta": {"hostvars": {}}}
+        # The hosts and children of the groups are kept in sets while the inventory is built and converted to
+        # sorted lists when the inventory is serialized. See get_serializable_inventory.
+        self.inventory = {
+            "all": {"hosts": set(), "vars": {}},
+            "_meta": {"hostvars": {}},
+        }
         self.config = {}
         self._region_subscriptions = None
         self._regions = None
         self._region_short_names = None
         self._region_long_names = None
+        # Indexes of the network resources of the instances keyed by OCID. These are populated by
+        # prefetch_network_details and filled lazily for any resource which could not be prefetched.
+        self._prefetched_compartments = set()
+        self._vnic_attachments = defaultdict(list)
+        self._subnets = {}
+        self._vcns = {}
+        # Thread pool shared by all the regions while the inventory is built with parallel processing enabled
+        self._thread_pool = None
+        self._region_semaphores = {}
+        # Per-region, per-compartment instance inventories of the last build. Used by incremental refreshes.
+        self._instance_state = None
+        # Host name to (instance OCID, region) index of the last build. Used to look up a single host with --host.
+        self._host_index = None
+        self._resource_search_clients = {}
+        self._compartment_tree = None
+        self.compartments = None
         self.params = {
             "ini_file": os.path.join(
                 to_bytes(os.path.dirname(os.path.realpath(__file__))),
@@ -303,7 +559,11 @@ class OCIInventory:
             "pass_phrase": None,
             "cache_dir": ".",
             "cache_max_age": 300,
+            "compartment_cache_max_age": 3600,
+            "rate_limit": 0,
             "cache_file": None,
+            "cache_format": "json",
+            "incremental_refresh": False,
             "compartment_ocid": None,
             "compartment": None,
             "parent_compartment_ocid": None,
@@ -315,16 +575,20 @@ class OCIInventory:
             "auth": "api_key",
             "enable_parallel_processing": False,
             "max_thread_count": 50,
+            "max_thread_count_per_region": None,
             "freeform_tags": None,
             "defined_tags": None,
             "regions": None,
             "exclude_regions": None,
             "strict_hostname_checking": "no",
+            "hostvars_include": None,
+            "hostvars_exclude": None,
         }
         boolean_options = [
             "sanitize_names",
             "replace_dash_in_names",
             "ignore_hostname_errors",
+            "incremental_refresh",
         ]
         dict_options = ["freeform_tags", "defined_tags"]
         try:
@@ -371,31 +635,8 @@ class OCIInventory:
             self.read_env_vars()
             self.read_cli_args(dict_options)
 
-            self.identity_client = self.create_service_client(IdentityClient)
-            # For the case, when auth="instance_principal", tenancy_id & region name are not available.
-            if self.params["auth"] == "instance_principal":
-                # self.params.update(self.get_instance_details_from_metadata())
-                instance_details = self.get_instance_details_from_metadata()
-                self.params.update(instance_details)
-
-            self.validate_params()
-
-            self.log("Using following parameters for OCI dynamic inventory:")
-            self.log(self.params)
-
-            self._compute_clients = dict(
-                (region, self.create_service_client(ComputeClient, region=region))
-                for region in self.regions
-            )
-
-            self._virtual_nw_clients = dict(
-                (
-                    region,
-                    self.create_service_client(VirtualNetworkClient, region=region),
-                )
-                for region in self.regions
-            )
-
+            # The cache file is determined from the parameters alone, so that a valid cache is read without importing
+            # the SDK or making any network calls.
             self.params["cache_file"] = self._get_cache_file()
 
             if not self.args.refresh_cache and self.is_cache_valid():
@@ -404,10 +645,24 @@ class OCIInventory:
                         self.params["cache_file"]
                     )
                 )
-                self.inventory = self.read_from_cache()
+                if not self.args.host:
+                    self.write_cached_inventory_json(sys.stdout)
+                    return
+                self.inventory = self.read_from_cache(hosts=[self.args.host])
             else:
-                self.build_inventory()
-                self.write_to_cache(self.inventory)
+                self.setup_clients()
+                if self.args.host and self.build_host_inventory(self.args.host):
+                    self.log(
+                        "Built the inventory of host {0} without rebuilding the whole inventory.".format(
+                            self.args.host
+                        )
+                    )
+                else:
+                    self.build_inventory()
+                    self.write_to_cache(self.inventory)
+                    self.write_host_index()
+                    if self.params["incremental_refresh"]:
+                        self.write_instance_state()
 
             if self.args.host:
                 if self.args.host in self.inventory["_meta"]["hostvars"]:
@@ -425,7 +680,13 @@ class OCIInventory:
                     print({})
 
             else:
-                print(json.dumps(self.inventory, sort_keys=True, indent=2))
+                print(
+                    json.dumps(
+                        self.get_serializable_inventory(self.inventory),
+                        sort_keys=True,
+                        indent=2,
+                    )
+                )
 
         except Exception as ex:
             stacktrace = traceback.format_exc()
@@ -435,6 +696,30 @@ class OCIInventory:
                 error_message = str(ex)
             self.fail(message=error_message, stacktrace=stacktrace)
 
+    def setup_clients(self):
+        """Import the SDK and set up the identity client and the parameters which need API calls to resolve. The
+        clients of the regions are created when they are first used."""
+        _import_oci_sdk()
+        # Fill in the defaults of the SDK config which are not read from the config file.
+        for setting, value in six.iteritems(oci.config.DEFAULT_CONFIG):
+            self.params.setdefault(setting, value)
+
+        self.identity_client = self.create_service_client(IdentityClient)
+        # For the case, when auth="instance_principal", tenancy_id & region name are not available.
+        if self.params["auth"] == "instance_principal":
+            # self.params.update(self.get_instance_details_from_metadata())
+            instance_details = self.get_instance_details_from_metadata()
+            self.params.update(instance_details)
+
+        self.validate_params()
+
+        self.log("Using following parameters for OCI dynamic inventory:")
+        self.log(self.params)
+
+        self._clients_lock = threading.Lock()
+        self._compute_clients = {}
+        self._virtual_nw_clients = {}
+
     def _is_instance_principal_auth(self):
         # check if auth is set to `instance_principal`.
         return self.params["auth"] == "instance_principal"
@@ -463,6 +748,19 @@ class OCIInventory:
         # Create service client class with the signer.
         client = service_client_class(params, **kwargs)
 
+        # The clients of the same class and region share the endpoint. As a client is created once per region, each
+        # client gets its own rate limiter. Every request of the client, including the retries, goes through it.
+        if float(self.params["rate_limit"]) > 0:
+            rate_limiter = AdaptiveRateLimiter(
+                "{0} {1}".format(
+                    service_client_class.__name__, client.base_client.endpoint
+                ),
+                self.params["rate_limit"],
+                log=self.log,
+            )
+            client.base_client.call_api = rate_limit_call_api(
+                client.base_client.call_api, rate_limiter
+            )
         return client
 
     def get_region_short_name(self, name):
@@ -509,26 +807,43 @@ class OCIInventory:
 
     def get_compute_client_for_region(self, region):
         if region not in self._compute_clients:
-            raise ValueError(
-                "Could not fetch the compute client for region {0}.".format(region)
-            )
+            if region not in self.regions:
+                raise ValueError(
+                    "Could not fetch the compute client for region {0}.".format(region)
+                )
+            self._create_region_client(self._compute_clients, ComputeClient, region)
         return self._compute_clients[region]
 
     def get_virtual_nw_client_for_region(self, region):
-        if region not in self._compute_clients:
-            raise ValueError(
-                "Could not fetch the virtual network for region {0}.".format(region)
+        if region not in self._virtual_nw_clients:
+            if region not in self.regions:
+                raise ValueError(
+                    "Could not fetch the virtual network for region {0}.".format(region)
+                )
+            self._create_region_client(
+                self._virtual_nw_clients, VirtualNetworkClient, region
             )
         return self._virtual_nw_clients[region]
 
+    def _create_region_client(self, clients, service_client_class, region):
+        # The clients are created lazily by the threads of the pool. Make sure only one client is created per region.
+        with self._clients_lock:
+            if region not in clients:
+                clients[region] = self.create_service_client(
+                    service_client_class, region=region
+                )
+
     def log(self, *args, **kwargs):
         if self.params["debug"]:
             print(*args, file=sys.stderr, **kwargs)
 
     def get_instance_details_from_metadata(self):
         """Get and return the instance details using the metadata endpoint"""
+        # use ansible provided open_url to avoid external dependencies. It is imported here as it is only needed when
+        # the inventory is built.
+        from ansible.module_utils.urls import open_url
+
         metadata_url = "http://169.254.169.254/opc/v1/instance"
-        # use ansible provided open_url to avoid external dependencies
         try:
             response = open_url(metadata_url, method="GET")
             metadata_response = json.loads(response.read())
@@ -556,9 +871,8 @@ class OCIInventory:
 
     def read_config(self):
         if os.path.isfile(to_bytes(self.params["config_file"])):
-            self.config = oci.config.from_file(
-                file_location=self.params["config_file"],
-                profile_name=self.params["profile"],
+            self.config = self.read_config_file(
+                self.params["config_file"], self.params["profile"]
             )
 
         self.config["additional_user_agent"] = inventory_agent_name + __version__
@@ -566,6 +880,35 @@ class OCIInventory:
         for setting in self.config:
             self.params[setting] = self.config[setting]
 
+    @staticmethod
+    def read_config_file(config_file, profile):
+        """Read the profile from the OCI config file the same way as oci.config.from_file, without importing the
+        SDK."""
+        parser = configparser.RawConfigParser()
+        if not parser.read(to_text(config_file)):
+            raise Exception("Could not find config file at {0}".format(config_file))
+        if profile == configparser.DEFAULTSECT:
+            config = dict(parser.defaults())
+        elif parser.has_section(profile):
+            config = dict(parser.items(profile))
+        else:
+            raise Exception(
+                "Profile '{0}' not found in config file {1}".format(profile, config_file)
+            )
+        if "log_requests" in config:
+            config["log_requests"] = config["log_requests"].lower() in [
+                "1",
+                "yes",
+                "true",
+                "on",
+            ]
+        if "key_content" in config:
+            raise ValueError(
+                "'key_content' cannot be specified in a config file for security reasons. To use this key you must "
+                "add it to the config programmatically."
+            )
+        return config
+
     def read_env_vars(self):
         EnvParamsMapping = dict(
             OCI_CONFIG_FILE="config_file",
@@ -574,6 +917,8 @@ class OCIInventory:
             OCI_REGION="region",
             OCI_CACHE_DIR="cache_dir",
             OCI_CACHE_MAX_AGE="cache_max_age",
+            OCI_COMPARTMENT_CACHE_MAX_AGE="compartment_cache_max_age",
+            OCI_ANSIBLE_RATE_LIMIT="rate_limit",
             OCI_HOSTNAME_FORMAT="hostname_format",
             OCI_USER_ID="user",
             OCI_USER_FINGERPRINT="fingerprint",
@@ -605,6 +950,12 @@ class OCIInventory:
         """Validate the parameters passed."""
         if not self.params["tenancy"] and self.params["auth"] != "instance_principal":
             self.fail("Tenany OCID required.")
+        if self.params["cache_format"] not in self.CACHE_FORMATS:
+            raise ValueError(
+                "Invalid cache format {0}. Supported cache formats: {1}.".format(
+                    self.params["cache_format"], ", ".join(self.CACHE_FORMATS)
+                )
+            )
         if self.params["regions"]:
             # Check if the regions passed are valid
             subscribed_regions = [
@@ -622,7 +973,7 @@ class OCIInventory:
         params_str = u""
         if self.params["tenancy"]:
             params_str += u"@{0}:{1}@".format("tenancy", self.params["tenancy"])
-        params_str += u"@{0}:{1}@".format("regions", ",".join(sorted(self.regions)))
+        params_str += u"@{0}:{1}@".format("regions", ",".join(self._get_region_params()))
         if self.params["compartment_ocid"]:
             params_str += u"@{0}:{1}@".format(
                 "compartment", self.params["compartment_ocid"]
@@ -643,6 +994,11 @@ class OCIInventory:
         params_str += u"@{0}:{1}@".format(
             "hostname_format", self.params["hostname_format"]
         )
+        for option in ["hostvars_include", "hostvars_exclude"]:
+            if self.params[option]:
+                params_str += u"@{0}:{1}@".format(
+                    option, ",".join(self.get_hostvars_paths(option))
+                )
         if self.params["freeform_tags"]:
             freeform_tag_params_str = u""
             for key in sorted(self.params["freeform_tags"]):
@@ -669,6 +1025,30 @@ class OCIInventory:
             to_bytes("ansible-oci-{0}.cache".format(hashed_params_str)),
         )
 
+    def _get_region_params(self):
+        """Return the regions for the cache file name from the parameters alone. Resolving 'all' needs an API call, so
+        it is used as such."""
+        if self.params["regions"] == "all":
+            regions = ["all"]
+        elif self.params["regions"]:
+            regions = sorted(
+                set(region.strip() for region in self.params["regions"].split(","))
+            )
+        else:
+            regions = [self.params["region"] or "instance_region"]
+        if self.params["exclude_regions"]:
+            regions.append(
+                "exclude={0}".format(
+                    "+".join(
+                        sorted(
+                            region.strip()
+                            for region in self.params["exclude_regions"].split(",")
+                        )
+                    )
+                )
+            )
+        return regions
+
     def is_cache_valid(self):
         if os.path.isfile(to_bytes(self.params["cache_file"])):
             mod_time = os.path.getmtime(to_bytes(self.params["cache_file"]))
@@ -681,14 +1061,416 @@ class OCIInventory:
             self.log("Cache file is invalid.")
         return False
 
-    def read_from_cache(self):
-        with open(to_bytes(self.params["cache_file"]), "r") as cache:
-            return json.loads(cache.read())
+    def read_cache_file(self):
+        """Return the contents of the cache file. The format of the cache is detected from the contents, so that a
+        cache written in another format can still be read."""
+        with open(to_bytes(self.params["cache_file"]), "rb") as cache:
+            data = cache.read()
+        if data[:2] == self.GZIP_MAGIC:
+            data = gzip.GzipFile(fileobj=io.BytesIO(data)).read()
+        return to_text(data)
+
+    def write_cached_inventory_json(self, stream):
+        """Write the cached inventory as JSON to the stream. A JSON cache is written as it is."""
+        cache_data = self.read_cache_file()
+        if not cache_data.startswith(self.COMPACT_CACHE_PREFIX):
+            stream.write(cache_data)
+        else:
+            self.write_compact_inventory_json(json.loads(cache_data), stream)
+        stream.write("\n")
+
+    def read_from_cache(self, hosts=None):
+        """Return the cached inventory. When hosts is set, only the vars of these hosts are read from a compact
+        cache."""
+        cache_data = self.read_cache_file()
+        if not cache_data.startswith(self.COMPACT_CACHE_PREFIX):
+            return json.loads(cache_data)
+        compact_inventory = json.loads(cache_data)
+        compact_hostvars = compact_inventory["hostvars"]
+        if hosts is None:
+            hosts = compact_hostvars
+        # Decode every value once. The hosts with the same value share the decoded value.
+        values = compact_inventory["values"]
+        decoded_values = {}
+        hostvars = {}
+        for host in hosts:
+            if host not in compact_hostvars:
+                continue
+            host_vars = hostvars[host] = {}
+            for key, value_index in six.iteritems(compact_hostvars[host]):
+                if value_index not in decoded_values:
+                    decoded_values[value_index] = json.loads(values[value_index])
+                host_vars[key] = decoded_values[value_index]
+        inventory = compact_inventory["groups"]
+        inventory["_meta"] = {"hostvars": hostvars}
+        return inventory
 
     def write_to_cache(self, data):
-        json_data = json.dumps(data, sort_keys=True, indent=2)
-        with open(to_bytes(self.params["cache_file"]), "w") as f:
-            f.write(json_data)
+        inventory = self.get_serializable_inventory(data)
+        if self.params["cache_format"] == "json":
+            cache_data = json.dumps(inventory, sort_keys=True, indent=2)
+        else:
+            cache_data = self.get_compact_inventory(inventory)
+        cache_data = to_bytes(cache_data)
+        if self.params["cache_format"] == "compact_gzip":
+            compressed_data = io.BytesIO()
+            with gzip.GzipFile(fileobj=compressed_data, mode="wb") as f:
+                f.write(cache_data)
+            cache_data = compressed_data.getvalue()
+        self.write_file_atomically(self.params["cache_file"], cache_data)
+
+    @staticmethod
+    def get_compact_inventory(inventory):
+        """Return the compact JSON of the inventory. The JSON has no whitespace and the values of the host vars are
+        stored once in a table of JSON texts, which the host vars refer to by index."""
+        values = []
+        value_indexes = {}
+        compact_hostvars = {}
+        for host, host_vars in six.iteritems(inventory["_meta"]["hostvars"]):
+            compact_host_vars = compact_hostvars[host] = {}
+            for key, value in six.iteritems(host_vars):
+                value_json = json.dumps(value, sort_keys=True, separators=(",", ":"))
+                value_index = value_indexes.get(value_json)
+                if value_index is None:
+                    value_index = value_indexes[value_json] = len(values)
+                    values.append(value_json)
+                compact_host_vars[key] = value_index
+        return json.dumps(
+            dict(
+                cache_format="compact",
+                groups=dict(
+                    (group, group_inventory)
+                    for group, group_inventory in six.iteritems(inventory)
+                    if group != "_meta"
+                ),
+                hostvars=compact_hostvars,
+                values=values,
+            ),
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+
+    @staticmethod
+    def write_compact_inventory_json(compact_inventory, stream):
+        """Write the JSON of the inventory from the loaded compact cache to the stream. The JSON of the host vars is
+        assembled from the JSON texts of their values, without decoding them, and written host by host."""
+        values = compact_inventory["values"]
+        key_jsons = {}
+        groups_json = json.dumps(
+            compact_inventory["groups"], sort_keys=True, separators=(",", ":")
+        )[1:-1]
+        stream.write(
+            '{{{0}{1}"_meta":{{"hostvars":{{'.format(
+                groups_json, "," if groups_json else ""
+            )
+        )
+        separator = ""
+        for host, host_vars in six.iteritems(compact_inventory["hostvars"]):
+            host_vars_json = []
+            for key, value_index in six.iteritems(host_vars):
+                if key not in key_jsons:
+                    key_jsons[key] = json.dumps(key) + ":"
+                host_vars_json.append(key_jsons[key] + values[value_index])
+            stream.write(
+                "{0}{1}:{{{2}}}".format(
+                    separator, json.dumps(host), ",".join(host_vars_json)
+                )
+            )
+            separator = ","
+        stream.write("}}}")
+
+    @staticmethod
+    def write_file_atomically(path, data):
+        """Write the data to a temporary file in the directory of path and rename it to path, so that readers never
+        see a partially written file."""
+        path = to_bytes(path)
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)),
+            prefix=b"." + os.path.basename(path) + b".",
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(to_bytes(data))
+            os.rename(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _get_instance_state_file(self):
+        return self.params["cache_file"] + to_bytes(".state")
+
+    def _get_instance_state_settings(self):
+        """Return the settings which change the inventory of an instance without changing the instance. The saved
+        instance inventories are discarded when any of these change."""
+        return dict(
+            (setting, self.params[setting])
+            for setting in [
+                "hostname_format",
+                "sanitize_names",
+                "replace_dash_in_names",
+                "strict_hostname_checking",
+                "hostvars_include",
+                "hostvars_exclude",
+            ]
+        )
+
+    def read_instance_state(self):
+        """Return the instance inventories saved by the last build, keyed by region, compartment and instance OCID.
+        Return an empty dict when there is no usable saved state."""
+        if not self.params["incremental_refresh"] or self.args.refresh_cache:
+            return {}
+        state_file = self._get_instance_state_file()
+        if not os.path.isfile(state_file):
+            self.log("Instance state file {0} does not exist.".format(state_file))
+            return {}
+        try:
+            with open(state_file, "r") as f:
+                state = json.loads(f.read())
+        except (IOError, OSError, ValueError) as ex:
+            self.log("Ignoring unreadable instance state file: {0}".format(str(ex)))
+            return {}
+        if state.get("settings") != self._get_instance_state_settings():
+            self.log("Inventory settings changed. Ignoring the instance state file.")
+            return {}
+        return state.get("regions", {})
+
+    def write_instance_state(self):
+        if self._instance_state is None:
+            return
+        json_data = json.dumps(
+            dict(
+                settings=self._get_instance_state_settings(),
+                regions=self._instance_state,
+            ),
+            sort_keys=True,
+        )
+        self.write_file_atomically(self._get_instance_state_file(), json_data)
+
+    def _get_host_index_file(self):
+        return self.params["cache_file"] + to_bytes(".hosts")
+
+    def read_host_index(self):
+        """Return the index of the host names of the last build to their instance OCID and region."""
+        host_index_file = self._get_host_index_file()
+        if not os.path.isfile(host_index_file):
+            return {}
+        try:
+            with open(host_index_file, "r") as f:
+                return json.loads(f.read())
+        except (IOError, OSError, ValueError) as ex:
+            self.log("Ignoring unreadable host index file: {0}".format(str(ex)))
+            return {}
+
+    def write_host_index(self):
+        if self._host_index is None:
+            return
+        self.write_file_atomically(
+            self._get_host_index_file(), json.dumps(self._host_index, sort_keys=True)
+        )
+
+    def build_host_inventory(self, host):
+        """Build the inventory of only the instance of the given host and update its entry in the cache. The instance
+        is resolved through the host index of the last build or, if the host is not in the index, through a lookup
+        by IP address or a Resource Search by display name. Return False when the host could not be resolved, so that
+        the whole inventory is built instead."""
+        host_index = self.read_host_index()
+        if host in host_index:
+            instance_id, region = host_index[host]
+            candidates = [(instance_id, region, None)]
+        else:
+            self.log(
+                "Host {0} is not in the host index. Searching for its instance.".format(
+                    host
+                )
+            )
+            candidates = self.search_host_instances(host)
+
+        self.compartments = {}
+        for instance_id, region, compartment_ids in candidates:
+            instance_inventory = self.build_inventory_for_instance_id(
+                instance_id, region, compartment_ids
+            )
+            if instance_inventory and host in instance_inventory:
+                self.update_cached_instance_inventory(instance_inventory)
+                return True
+        return False
+
+    def search_host_instances(self, host):
+        """Return the (instance OCID, region, compartment OCIDs in scope) tuples of the instances which could have the
+        given host name."""
+        compartment_ids = None
+        if self.params["compartment_ocid"] or self.params["compartment"]:
+            compartment_ids = set(
+                compartment.id
+                for compartment in self.get_compartments(
+                    compartment_ocid=self.params["compartment_ocid"],
+                    parent_compartment_ocid=self.params["parent_compartment_ocid"],
+                    compartment_name=self.params["compartment"],
+                    fetch_hosts_from_subcompartments=self.params[
+                        "fetch_hosts_from_subcompartments"
+                    ],
+                )
+            )
+
+        candidates = []
+        for region in self.regions:
+            try:
+                if self.params["hostname_format"] in ["public_ip", "private_ip"]:
+                    instance_ids = self.search_instances_by_ip_address(host, region)
+                else:
+                    instance_ids = self.search_instances_by_display_name(host, region)
+            except ServiceError as ex:
+                if ex.status == 401:
+                    self.log(ex)
+                    raise
+                self.log(ex)
+                continue
+            candidates.extend(
+                (instance_id, region, compartment_ids) for instance_id in instance_ids
+            )
+        return candidates
+
+    def search_instances_by_ip_address(self, ip_address, region):
+        """Return the OCIDs of the instances with the given IP address in the region."""
+        try:
+            socket.inet_aton(ip_address)
+        except (socket.error, TypeError):
+            return []
+        virtual_nw_client = self.get_virtual_nw_client_for_region(region)
+        if self.params["hostname_format"] == "public_ip":
+            try:
+                public_ip = call_with_backoff(
+                    virtual_nw_client.get_public_ip_by_ip_address,
+                    get_public_ip_by_ip_address_details=GetPublicIpByIpAddressDetails(
+                        ip_address=ip_address
+                    ),
+                ).data
+            except ServiceError as ex:
+                if ex.status == 404:
+                    return []
+                raise
+            if not public_ip.private_ip_id:
+                return []
+            private_ip_ids = [public_ip.private_ip_id]
+        else:
+            private_ip_ids = [
+                resource.identifier
+                for resource in self.search_resources(
+                    "query privateip resources where ipAddress = '{0}'".format(
+                        ip_address
+                    ),
+                    region,
+                )
+            ]
+
+        instance_ids = []
+        for private_ip_id in private_ip_ids:
+            private_ip = call_with_backoff(
+                virtual_nw_client.get_private_ip, private_ip_id=private_ip_id
+            ).data
+            instance_ids.extend(
+                vnic_attachment.instance_id
+                for vnic_attachment in list_all_resources(
+                    target_fn=self.get_compute_client_for_region(
+                        region
+                    ).list_vnic_attachments,
+                    compartment_id=private_ip.compartment_id,
+                    vnic_id=private_ip.vnic_id,
+                )
+                if vnic_attachment.lifecycle_state == self.LIFECYCLE_ATTACHED_STATE
+            )
+        return instance_ids
+
+    def search_instances_by_display_name(self, host, region):
+        """Return the OCIDs of the running instances in the region whose display name is the host name or, for FQDN
+        host names, the first label of the host name."""
+        display_names = set([host, host.split(".")[0]])
+        query = "query instance resources where ({0}) && lifecycleState = '{1}'".format(
+            " || ".join(
+                "displayName = '{0}'".format(display_name.replace("'", "\\'"))
+                for display_name in sorted(display_names)
+            ),
+            self.LIFECYCLE_RUNNING_STATE,
+        )
+        return [resource.identifier for resource in self.search_resources(query, region)]
+
+    def search_resources(self, query, region):
+        if region not in self._resource_search_clients:
+            self._resource_search_clients[region] = self.create_service_client(
+                ResourceSearchClient, region=region
+            )
+        self.log("Searching resources in region {0}: {1}".format(region, query))
+        return call_with_backoff(
+            self._resource_search_clients[region].search_resources,
+            search_details=StructuredSearchDetails(query=query),
+        ).data.items
+
+    def build_inventory_for_instance_id(self, instance_id, region, compartment_ids):
+        """Get the instance with the given OCID and build its inventory if it matches the inventory filters. When
+        compartment_ids is set, the instance must be in one of these compartments."""
+        try:
+            instance = call_with_backoff(
+                self.get_compute_client_for_region(region).get_instance,
+                instance_id=instance_id,
+            ).data
+            if (
+                instance.lifecycle_state != self.LIFECYCLE_RUNNING_STATE
+                or not self.is_instance_matching_tags(instance)
+                or (
+                    compartment_ids is not None
+                    and instance.compartment_id not in compartment_ids
+                )
+            ):
+                self.log(
+                    "Instance {0} does not match the inventory filters.".format(
+                        instance_id
+                    )
+                )
+                return None
+            if instance.compartment_id not in self.compartments:
+                self.compartments[instance.compartment_id] = call_with_backoff(
+                    self.identity_client.get_compartment,
+                    compartment_id=instance.compartment_id,
+                ).data
+        except ServiceError as ex:
+            if ex.status == 401:
+                self.log(ex)
+                raise
+            self.log(ex)
+            return None
+        return self.build_inventory_for_instance(instance, region)
+
+    def update_cached_instance_inventory(self, instance_inventory):
+        """Replace the hosts of the instance in the cached inventory. The modification time of the cache file is
+        preserved, so that the rest of the inventory is still rebuilt when the cache is outdated."""
+        cache_file = self.params["cache_file"]
+        cache_stat = None
+        if os.path.isfile(cache_file):
+            cache_stat = os.stat(cache_file)
+            try:
+                self.inventory = self.get_mutable_inventory(self.read_from_cache())
+            except ValueError as ex:
+                self.log("Ignoring unreadable cache file: {0}".format(str(ex)))
+                cache_stat = None
+
+        for host_name in instance_inventory:
+            self.remove_host(host_name)
+        self.merge_instance_inventories([instance_inventory])
+
+        if cache_stat:
+            self.write_to_cache(self.inventory)
+            os.utime(cache_file, (cache_stat.st_atime, cache_stat.st_mtime))
+
+    def get_instance_fingerprint(self, instance):
+        """Return a digest of everything the inventory of an instance depends on apart from its network details."""
+        fingerprint_data = dict(
+            instance=to_dict(instance),
+            compartment_name=self.compartments[instance.compartment_id].name,
+        )
+        return hashlib.md5(
+            to_bytes(json.dumps(fingerprint_data, sort_keys=True, default=str))
+        ).hexdigest()
 
     @property
     def region_subscriptions(self):
@@ -778,28 +1560,19 @@ class OCIInventory:
             )
 
         try:
-            tenancy = call_with_backoff(
-                self.identity_client.get_compartment,
-                compartment_id=self.params["tenancy"],
-            ).data
+            compartment_tree = self.get_compartment_tree()
         except ServiceError as se:
             if se.status == 404:
                 raise Exception(
                     "Either tenancy ocid is invalid or need inspect permission on root compartment to get the "
                     "compartments in the tenancy."
                 )
+            raise
 
-        all_compartments = [tenancy] + [
-            compartment
-            for compartment in list_all_resources(
-                target_fn=self.identity_client.list_compartments,
-                compartment_id=self.params["tenancy"],
-                compartment_id_in_subtree=True,
-            )
-            if self.filter_resource(
-                compartment, lifecycle_state=self.LIFECYCLE_ACTIVE_STATE
-            )
-        ]
+        all_compartments = self.get_compartment_subtree(
+            compartment_tree, self.params["tenancy"]
+        )
+        tenancy = all_compartments[0]
 
         # return all the compartments if compartment_name is not passed
         if not compartment_name:
@@ -835,27 +1608,166 @@ class OCIInventory:
         return self.get_sub_compartments(compartment_with_name)
 
     def get_sub_compartments(self, root):
-        # OCI SDK does not support fetching sub-compartments for non root compartments
-        # So traverse the compartment tree to fetch all the sub compartments
-        compartments = []
-        queue = deque()
-        queue.append(root)
-        while len(queue) > 0:
-            parent_compartment = queue.popleft()
-            compartments.append(parent_compartment)
-            child_compartments = [
+        """Return the compartment and the compartments in its hierarchy. The hierarchy is taken from the compartment
+        tree of the tenancy when the compartments of the tenancy can be listed."""
+        if not self.params["tenancy"]:
+            return [root] + self.list_subcompartments(root.id)
+        try:
+            compartment_tree = self.get_compartment_tree()
+        except ServiceError as ex:
+            if ex.status == 401:
+                self.log(ex)
+                raise
+            self.log(
+                "Could not list the compartments of the tenancy. Listing the compartments in the hierarchy of "
+                "compartment {0}. Error: {1}".format(root.id, ex)
+            )
+        else:
+            if root.id in compartment_tree["compartments"]:
+                return self.get_compartment_subtree(compartment_tree, root.id)
+        return [root] + self.list_subcompartments(root.id)
+
+    def list_subcompartments(self, compartment_id):
+        """Return the ACTIVE compartments in the hierarchy of the compartment, excluding the compartment. The
+        compartments are listed level by level, in parallel when parallel processing is enabled."""
+        subcompartments = []
+        parent_ids = [compartment_id]
+        while parent_ids:
+            list_child_compartments = partial(
+                list_all_resources, target_fn=self.identity_client.list_compartments
+            )
+            if self._thread_pool is None:
+                lists_of_children = [
+                    list_child_compartments(compartment_id=parent_id)
+                    for parent_id in parent_ids
+                ]
+            else:
+                lists_of_children = self._thread_pool.map(
+                    lambda parent_id: list_child_compartments(compartment_id=parent_id),
+                    parent_ids,
+                )
+            children = [
+                child
+                for children_of_parent in lists_of_children
+                for child in children_of_parent
+                if self.filter_resource(
+                    child, lifecycle_state=self.LIFECYCLE_ACTIVE_STATE
+                )
+            ]
+            subcompartments.extend(children)
+            parent_ids = [child.id for child in children]
+        return subcompartments
+
+    def get_compartment_tree(self):
+        """Return the tree of the ACTIVE compartments of the tenancy with the compartments (as dicts) keyed by OCID and
+        the parent to children index. The tree is built from a single listing of the compartments in the subtree of
+        the tenancy and cached on disk for compartment_cache_max_age seconds. The cache is shared with the inventory
+        plugin and the modules (see oci_common_utils.get_compartment_tree).
+
+        :raises ServiceError: When the compartments of the tenancy cannot be listed
+        """
+        if self._compartment_tree:
+            return self._compartment_tree
+        tenancy_id = self.params["tenancy"]
+        cache_file = os.path.join(
+            self.get_shared_cache_dir(),
+            "compartments-{0}.json".format(
+                hashlib.md5(to_bytes(tenancy_id)).hexdigest()
+            ),
+        )
+        max_age = float(self.params["compartment_cache_max_age"])
+        if self.args.refresh_cache:
+            max_age = 0
+        if max_age and os.path.isfile(cache_file):
+            if os.path.getmtime(cache_file) + max_age > time():
+                try:
+                    with open(cache_file, "r") as f:
+                        compartment_tree = json.loads(f.read())
+                except (IOError, OSError, ValueError) as ex:
+                    self.log("Ignoring unreadable compartment cache: {0}".format(ex))
+                else:
+                    if compartment_tree.get("tenancy_id") == tenancy_id:
+                        self.log("Using cached compartments {0}.".format(cache_file))
+                        self._compartment_tree = compartment_tree
+                        return compartment_tree
+
+        tenancy = call_with_backoff(
+            self.identity_client.get_compartment, compartment_id=tenancy_id
+        ).data
+        compartments = to_dict(
+            [tenancy]
+            + [
                 compartment
                 for compartment in list_all_resources(
                     target_fn=self.identity_client.list_compartments,
-                    compartment_id=parent_compartment.id,
+                    compartment_id=tenancy_id,
+                    compartment_id_in_subtree=True,
                 )
                 if self.filter_resource(
                     compartment, lifecycle_state=self.LIFECYCLE_ACTIVE_STATE
                 )
             ]
-            for child_compartment in child_compartments:
-                queue.append(child_compartment)
-        return compartments
+        )
+        children = dict((compartment["id"], []) for compartment in compartments)
+        for compartment in compartments:
+            if compartment["compartment_id"] in children:
+                children[compartment["compartment_id"]].append(compartment["id"])
+        self._compartment_tree = dict(
+            tenancy_id=tenancy_id,
+            compartments=dict(
+                (compartment["id"], compartment) for compartment in compartments
+            ),
+            children=children,
+        )
+        try:
+            if not os.path.isdir(os.path.dirname(cache_file)):
+                os.makedirs(os.path.dirname(cache_file), 0o700)
+            self.write_file_atomically(
+                cache_file, json.dumps(self._compartment_tree)
+            )
+        except (IOError, OSError) as ex:
+            self.log("Could not cache the compartments: {0}".format(ex))
+        return self._compartment_tree
+
+    @staticmethod
+    def get_shared_cache_dir():
+        """Return the directory of the caches shared with the inventory plugin and the modules"""
+        return os.path.expanduser(
+            os.path.expandvars(
+                os.environ.get(
+                    "OCI_ANSIBLE_CACHE_DIR",
+                    os.path.join("~", ".cache", "oci-ansible"),
+                )
+            )
+        )
+
+    @staticmethod
+    def get_compartment_subtree(compartment_tree, compartment_id):
+        """Return the Compartment models of the compartment and the compartments in its hierarchy from the compartment
+        tree, parents first. The attributes which the Compartment model does not have are ignored, as the cached tree
+        may have been written with another version of the SDK."""
+        attributes = Compartment().swagger_types
+        subtree = []
+        compartment_ids = [compartment_id]
+        while compartment_ids:
+            subtree.extend(
+                Compartment(
+                    **dict(
+                        (key, value)
+                        for key, value in six.iteritems(
+                            compartment_tree["compartments"][cid]
+                        )
+                        if key in attributes
+                    )
+                )
+                for cid in compartment_ids
+            )
+            compartment_ids = [
+                child_id
+                for cid in compartment_ids
+                for child_id in compartment_tree["children"].get(cid, [])
+            ]
+        return subtree
 
     @staticmethod
     def filter_resource(resource, **kwargs):
@@ -872,33 +1784,16 @@ class OCIInventory:
         """
         instances = defaultdict(list)
 
-        if self.params["enable_parallel_processing"]:
-            for region in self.regions:
-                num_threads = min(
-                    len(compartment_ocids), self.params["max_thread_count"]
-                )
-                self.log(
-                    "Parallel processing enabled. Getting instances from {0} in {1} threads.".format(
-                        region, num_threads
-                    )
-                )
-
-                with self.pool(processes=num_threads) as pool:
-                    get_filtered_instances_for_region = partial(
-                        self.get_filtered_instances, region=region
-                    )
-                    lists_of_instances = pool.map(
-                        get_filtered_instances_for_region, compartment_ocids
-                    )
-                for sublist in lists_of_instances:
-                    instances[region].extend(sublist)
-
-        else:
-            for region in self.regions:
-                for compartment_ocid in compartment_ocids:
-                    instances[region].extend(
-                        self.get_filtered_instances(compartment_ocid, region)
-                    )
+        region_compartments = self.get_region_tasks(
+            dict((region, compartment_ocids) for region in self.regions)
+        )
+        lists_of_instances = self.map_region_tasks(
+            self.get_filtered_instances, region_compartments
+        )
+        for (region, compartment_ocid), sublist in zip(
+            region_compartments, lists_of_instances
+        ):
+            instances[region].extend(sublist)
 
         return instances
 
@@ -920,31 +1815,11 @@ class OCIInventory:
                     compartment_ocid, instances
                 )
             )
-            if self.params["freeform_tags"]:
+            if self.params["freeform_tags"] or self.params["defined_tags"]:
                 instances = [
                     instance
                     for instance in instances
-                    if all(
-                        instance.freeform_tags.get(key) == value
-                        for key, value in six.iteritems(self.params["freeform_tags"])
-                    )
-                ]
-                self.log(
-                    "Instances in compartment {0} which match all the freeform tags: {1}".format(
-                        compartment_ocid, instances
-                    )
-                )
-            if self.params["defined_tags"]:
-                instances = [
-                    instance
-                    for instance in instances
-                    if all(
-                        (instance.defined_tags.get(namespace, {})).get(key) == value
-                        for namespace in self.params["defined_tags"]
-                        for key, value in six.iteritems(
-                            self.params["defined_tags"][namespace]
-                        )
-                    )
+                    if self.is_instance_matching_tags(instance)
                 ]
                 self.log(
                     "Instances in compartment {0} which match all the freeform & defined tags: {1}".format(
@@ -959,15 +1834,39 @@ class OCIInventory:
             self.log(ex)
             return []
 
+    def get_hostvars_paths(self, option):
+        """Return the list of dotted paths of the hostvars_include or hostvars_exclude option"""
+        if not self.params[option]:
+            return []
+        return [path.strip() for path in self.params[option].split(",") if path.strip()]
+
+    def project_host_vars(self, host_vars):
+        """Return the host vars with only the paths in hostvars_include and without the paths in hostvars_exclude"""
+        return project_dict(
+            host_vars,
+            include_paths=self.get_hostvars_paths("hostvars_include"),
+            exclude_paths=self.get_hostvars_paths("hostvars_exclude"),
+        )
+
+    def is_instance_matching_tags(self, instance):
+        """Return whether the instance has all the freeform and defined tags of the inventory filters."""
+        if self.params["freeform_tags"] and not all(
+            instance.freeform_tags.get(key) == value
+            for key, value in six.iteritems(self.params["freeform_tags"])
+        ):
+            return False
+        if self.params["defined_tags"] and not all(
+            (instance.defined_tags.get(namespace, {})).get(key) == value
+            for namespace in self.params["defined_tags"]
+            for key, value in six.iteritems(self.params["defined_tags"][namespace])
+        ):
+            return False
+        return True
+
     def get_host_name(self, vnic, region):
-        virtual_nw_client = self.get_virtual_nw_client_for_region(region)
         if self.params["hostname_format"] == "fqdn":
-            subnet = call_with_backoff(
-                virtual_nw_client.get_subnet, subnet_id=vnic.subnet_id
-            ).data
-            vcn = call_with_backoff(
-                virtual_nw_client.get_vcn, vcn_id=subnet.vcn_id
-            ).data
+            subnet = self.get_subnet(vnic.subnet_id, region)
+            vcn = self.get_vcn(subnet.vcn_id, region)
 
             values = [
                 vnic.hostname_label,
@@ -988,16 +1887,129 @@ class OCIInventory:
         self.log("Public IP for VNIC: {0} is {1}.".format(vnic.id, vnic.public_ip))
         return vnic.public_ip
 
+    def prefetch_network_details(self, instances_by_region):
+        """Prefetch the VNIC attachments, VCNs and subnets of all the compartments having instances into indexes keyed
+        by OCID. This makes the number of API calls to build the inventory proportional to the number of compartments
+        instead of the number of instances.
+
+        :param instances_by_region: dict with region as key and list of instances of the region as value
+        """
+        region_compartments = self.get_region_tasks(
+            dict(
+                (
+                    region,
+                    set(
+                        instance.compartment_id
+                        for instance in instances_by_region[region]
+                    ),
+                )
+                for region in instances_by_region
+            )
+        )
+        network_details = self.map_region_tasks(
+            self.list_network_details, region_compartments
+        )
+
+        for (region, compartment_id), (vnic_attachments, vcns, subnets) in zip(
+            region_compartments, network_details
+        ):
+            if vnic_attachments is not None:
+                self._prefetched_compartments.add((region, compartment_id))
+                for vnic_attachment in vnic_attachments:
+                    self._vnic_attachments[vnic_attachment.instance_id].append(
+                        vnic_attachment
+                    )
+            for vcn in vcns:
+                self._vcns[vcn.id] = vcn
+            for subnet in subnets:
+                self._subnets[subnet.id] = subnet
+
+    def list_network_details(self, compartment_ocid, region):
+        """List the ATTACHED VNIC attachments, VCNs and subnets of a compartment. The VNIC attachments are returned as
+        None if they could not be listed, so that they get listed per instance."""
+        compute_client = self.get_compute_client_for_region(region)
+        virtual_nw_client = self.get_virtual_nw_client_for_region(region)
+        self.log(
+            "Prefetching network details from compartment: {0} and region: {1}".format(
+                compartment_ocid, region
+            )
+        )
+        vnic_attachments = None
+        vcns = []
+        subnets = []
+        try:
+            vnic_attachments = [
+                vnic_attachment
+                for vnic_attachment in list_all_resources(
+                    target_fn=compute_client.list_vnic_attachments,
+                    compartment_id=compartment_ocid,
+                )
+                if self.filter_resource(
+                    vnic_attachment, lifecycle_state=self.LIFECYCLE_ATTACHED_STATE
+                )
+            ]
+            vcns = list_all_resources(
+                target_fn=virtual_nw_client.list_vcns, compartment_id=compartment_ocid
+            )
+            for vcn in vcns:
+                subnets.extend(
+                    list_all_resources(
+                        target_fn=virtual_nw_client.list_subnets,
+                        compartment_id=compartment_ocid,
+                        vcn_id=vcn.id,
+                    )
+                )
+        except ServiceError as ex:
+            if ex.status == 401:
+                self.log(ex)
+                raise
+            self.log(ex)
+        return vnic_attachments, vcns, subnets
+
+    def get_vnic_attachments(self, instance, region):
+        """Return the ATTACHED VNIC attachments of an instance, from the prefetched index when available."""
+        if (region, instance.compartment_id) in self._prefetched_compartments:
+            return self._vnic_attachments.get(instance.id, [])
+        compute_client = self.get_compute_client_for_region(region)
+        return [
+            vnic_attachment
+            for vnic_attachment in list_all_resources(
+                target_fn=compute_client.list_vnic_attachments,
+                compartment_id=instance.compartment_id,
+                instance_id=instance.id,
+            )
+            if self.filter_resource(
+                vnic_attachment, lifecycle_state=self.LIFECYCLE_ATTACHED_STATE
+            )
+        ]
+
+    def get_subnet(self, subnet_id, region):
+        """Return the subnet from the prefetched index. Subnets which are not in the index are fetched and indexed."""
+        if subnet_id not in self._subnets:
+            virtual_nw_client = self.get_virtual_nw_client_for_region(region)
+            self._subnets[subnet_id] = call_with_backoff(
+                virtual_nw_client.get_subnet, subnet_id=subnet_id
+            ).data
+        return self._subnets[subnet_id]
+
+    def get_vcn(self, vcn_id, region):
+        """Return the VCN from the prefetched index. VCNs which are not in the index are fetched and indexed."""
+        if vcn_id not in self._vcns:
+            virtual_nw_client = self.get_virtual_nw_client_for_region(region)
+            self._vcns[vcn_id] = call_with_backoff(
+                virtual_nw_client.get_vcn, vcn_id=vcn_id
+            ).data
+        return self._vcns[vcn_id]
+
     def build_inventory_for_instance(self, instance, region):
         """Build and return inventory for an instance"""
         try:
             self.log("Building inventory for instance {0}".format(instance.id))
             instance_inventory = {}
-            compute_client = self.get_compute_client_for_region(region)
             virtual_nw_client = self.get_virtual_nw_client_for_region(region)
             compartment = self.compartments[instance.compartment_id]
 
-            instance_vars = to_dict(instance)
+            instance_vars = self.project_host_vars(to_dict(instance))
 
             common_groups = set(["all"])
             # Group by availability domain
@@ -1054,17 +2066,7 @@ class OCIInventory:
                     )
                     common_groups.add(ext_metadata_grp_name)
 
-            vnic_attachments = [
-                vnic_attachment
-                for vnic_attachment in list_all_resources(
-                    target_fn=compute_client.list_vnic_attachments,
-                    compartment_id=compartment.id,
-                    instance_id=instance.id,
-                )
-                if self.filter_resource(
-                    vnic_attachment, lifecycle_state=self.LIFECYCLE_ATTACHED_STATE
-                )
-            ]
+            vnic_attachments = self.get_vnic_attachments(instance, region)
 
             for vnic_attachment in vnic_attachments:
 
@@ -1100,9 +2102,7 @@ class OCIInventory:
 
                 groups = set(common_groups)
 
-                subnet = call_with_backoff(
-                    virtual_nw_client.get_subnet, subnet_id=vnic.subnet_id
-                ).data
+                subnet = self.get_subnet(vnic.subnet_id, region)
                 groups.add(subnet.id)
                 groups.add(subnet.vcn_id)
 
@@ -1163,7 +2163,67 @@ class OCIInventory:
             # terminate the pool
             pool.terminate()
 
+    @contextmanager
+    def region_executor(self):
+        """Set up the thread pool shared by all the regions when parallel processing is enabled. The pool size is the
+        global cap on the number of concurrent API calls and a semaphore per region caps the calls made to a region."""
+        if not self.params["enable_parallel_processing"]:
+            yield
+            return
+        max_thread_count = int(self.params["max_thread_count"])
+        max_thread_count_per_region = int(
+            self.params["max_thread_count_per_region"] or max_thread_count
+        )
+        self._region_semaphores = dict(
+            (region, threading.BoundedSemaphore(max_thread_count_per_region))
+            for region in self.regions
+        )
+        self.log(
+            "Parallel processing enabled. Using {0} threads across all regions with at most {1} threads "
+            "per region.".format(max_thread_count, max_thread_count_per_region)
+        )
+        with self.pool(processes=max_thread_count) as pool:
+            self._thread_pool = pool
+            try:
+                yield
+            finally:
+                self._thread_pool = None
+
+    @staticmethod
+    def get_region_tasks(tasks_by_region):
+        """Return a list of (region, task) tuples with the tasks of the regions interleaved, so that the threads of the
+        shared pool are spread across the regions instead of waiting on the cap of a single region."""
+        tasks_per_region = [
+            [(region, task) for task in tasks_by_region[region]]
+            for region in tasks_by_region
+        ]
+        return [
+            region_task
+            for region_task in chain.from_iterable(
+                six.moves.zip_longest(*tasks_per_region)
+            )
+            if region_task is not None
+        ]
+
+    def map_region_tasks(self, fn, region_tasks):
+        """Call fn(task, region) for all the (region, task) tuples and return the results in the same order. The tasks
+        are run in the shared thread pool when parallel processing is enabled."""
+        if self._thread_pool is None:
+            return [fn(task, region) for region, task in region_tasks]
+        return self._thread_pool.map(
+            partial(self._call_with_region_limit, fn), region_tasks, chunksize=1
+        )
+
+    def _call_with_region_limit(self, fn, region_task):
+        region, task = region_task
+        with self._region_semaphores[region]:
+            return fn(task, region)
+
     def build_inventory(self):
+        with self.region_executor():
+            self._build_inventory()
+
+    def _build_inventory(self):
         self.log("Building inventory.")
 
         # Compartments(including the root compartment) from which the instances are to be retrieved.
@@ -1189,35 +2249,72 @@ class OCIInventory:
 
         self.log("Building inventory for instances {0}".format(instances_by_region))
 
-        instance_inventories = []
+        # Reuse the inventories of the instances which did not change since the last build, including their network
+        # details, and only rebuild the inventories of the new and changed instances.
+        saved_state = self.read_instance_state()
+        instance_state = {}
+        host_index = {}
+        instance_fingerprints = {}
+        reused_instance_inventories = {}
+        changed_instances_by_region = defaultdict(list)
+        for region in instances_by_region:
+            for instance in instances_by_region[region]:
+                fingerprint = self.get_instance_fingerprint(instance)
+                instance_fingerprints[instance.id] = fingerprint
+                saved_instance = (
+                    saved_state.get(region, {})
+                    .get(instance.compartment_id, {})
+                    .get(instance.id)
+                )
+                if saved_instance and saved_instance["fingerprint"] == fingerprint:
+                    reused_instance_inventories[instance.id] = saved_instance[
+                        "inventory"
+                    ]
+                else:
+                    changed_instances_by_region[region].append(instance)
 
-        if self.params["enable_parallel_processing"]:
-            instance_inventories = []
-            for region in instances_by_region:
-                instances = instances_by_region[region]
-                if instances:
-                    num_threads = min(len(instances), self.params["max_thread_count"])
-                    self.log(
-                        "Parallel processing enabled. Building individual instance inventories in {0} threads.".format(
-                            num_threads
-                        )
-                    )
-                    with self.pool(processes=num_threads) as pool:
-                        instance_inventories.extend(
-                            pool.map(
-                                partial(
-                                    self.build_inventory_for_instance, region=region
-                                ),
-                                instances,
-                            )
-                        )
+        if saved_state:
+            self.log(
+                "Reusing the inventories of {0} unchanged instances.".format(
+                    len(reused_instance_inventories)
+                )
+            )
 
-        else:
-            instance_inventories = [
-                self.build_inventory_for_instance(instance, region)
-                for region in instances_by_region
-                for instance in instances_by_region[region]
-            ]
+        self.prefetch_network_details(changed_instances_by_region)
+
+        changed_instances = self.get_region_tasks(changed_instances_by_region)
+        built_instance_inventories = dict(
+            (instance.id, instance_inventory)
+            for (region, instance), instance_inventory in zip(
+                changed_instances,
+                self.map_region_tasks(
+                    self.build_inventory_for_instance, changed_instances
+                ),
+            )
+        )
+
+        instance_inventories = []
+        for region in instances_by_region:
+            for instance in instances_by_region[region]:
+                if instance.id in reused_instance_inventories:
+                    instance_inventory = reused_instance_inventories[instance.id]
+                else:
+                    instance_inventory = built_instance_inventories[instance.id]
+                instance_inventories.append(instance_inventory)
+                for host_name in instance_inventory or []:
+                    host_index[host_name] = [instance.id, region]
+                # Do not save the inventories which could not be built so that they are retried in the next build.
+                if instance_inventory:
+                    instance_state.setdefault(region, {}).setdefault(
+                        instance.compartment_id, {}
+                    )[instance.id] = dict(
+                        time_created=str(instance.time_created),
+                        lifecycle_state=instance.lifecycle_state,
+                        fingerprint=instance_fingerprints[instance.id],
+                        inventory=instance_inventory,
+                    )
+        self._instance_state = instance_state
+        self._host_index = host_index
 
         self.log("Instance inventories: {0}".format(instance_inventories))
         self.log("Merging instance inventories.")
@@ -1310,6 +2407,27 @@ class OCIInventory:
             "(default: False - use cache files)",
         )
 
+        parser.add_argument(
+            "--cache-format",
+            action="store",
+            choices=OCIInventory.CACHE_FORMATS,
+            help="Format of the cache file. 'json' writes the inventory as indented JSON. 'compact' writes JSON "
+            "without whitespace and stores each distinct host var value once, which makes large caches smaller "
+            "and faster to read. 'compact_gzip' also compresses the compact cache with gzip. The format of an "
+            "existing cache is detected when it is read. Defaults to json. This value can also be provided in the "
+            "settings config file.",
+        )
+
+        parser.add_argument(
+            "--incremental-refresh",
+            action="store_true",
+            default=None,
+            help="When the cache is outdated, only rebuild the inventory of the instances which were added or "
+            "changed since the last build and reuse the saved inventory, including the network details, of the "
+            "unchanged instances. Use --refresh-cache to force a full rebuild. This value can also be provided in "
+            "the settings config file.",
+        )
+
         parser.add_argument(
             "--debug",
             action="store_true",
@@ -1344,6 +2462,32 @@ class OCIInventory:
             "threads to use. Defaults to 50. This value can also be provided in the settings config file.",
         )
 
+        parser.add_argument(
+            "--max-thread-count-per-region",
+            action="store",
+            type=int,
+            help="Only valid when --enable-parallel-processing is set. The threads are shared by all the regions. "
+            "This option specifies the maximum number of threads making API calls to a single region at a time. "
+            "Defaults to the value of --max-thread-count. This value can also be provided in the settings config "
+            "file.",
+        )
+
+        parser.add_argument(
+            "--hostvars-include",
+            action="store",
+            help="Comma separated list of the host vars to include in the inventory. Use dotted paths for the keys "
+            "of nested host vars, eg: id,display_name,metadata.ssh_authorized_keys. All the host vars are included "
+            "by default. This value can also be provided in the settings config file.",
+        )
+
+        parser.add_argument(
+            "--hostvars-exclude",
+            action="store",
+            help="Comma separated list of the host vars to exclude from the inventory. Use dotted paths for the keys "
+            "of nested host vars, eg: metadata.user_data,extended_metadata. This value can also be provided in the "
+            "settings config file.",
+        )
+
         parser.add_argument(
             "--freeform-tags",
             action="store",
@@ -1424,18 +2568,24 @@ class OCIInventory:
             groups = set("all")
         for group in groups:
             self.add_group(group, children=groups[group].setdefault("children", []))
-            if host not in self.inventory[group]["hosts"]:
-                self.inventory[group]["hosts"].append(host)
+            self.inventory[group]["hosts"].add(host)
         if vars:
             self.add_host_vars(host, vars)
 
+    def remove_host(self, host):
+        """Remove host from the inventory"""
+        for group in self.inventory:
+            if group != "_meta":
+                self.inventory[group].get("hosts", set()).discard(host)
+        self.inventory["_meta"]["hostvars"].pop(host, None)
+
     def add_host_vars(self, host, vars):
         """Add vars to the host in inventory"""
         self.inventory["_meta"]["hostvars"][host] = vars
 
     def add_group(self, group, children=None):
         """Add group to the inventory"""
-        self.inventory.setdefault(group, {"hosts": []})
+        self.inventory.setdefault(group, {"hosts": set()})
         if children:
             for child in children:
                 self.add_child_group(group, child)
@@ -1443,9 +2593,31 @@ class OCIInventory:
     def add_child_group(self, parent, child):
         """Add child group to the inventory"""
         self.add_group(parent)
-        children = self.inventory[parent].setdefault("children", [])
-        if child not in children:
-            children.append(child)
+        self.inventory[parent].setdefault("children", set()).add(child)
+
+    @staticmethod
+    def get_serializable_inventory(inventory):
+        """Return the inventory with the hosts and children of the groups as sorted lists"""
+        return dict(
+            (
+                group,
+                dict(
+                    (key, sorted(value) if isinstance(value, set) else value)
+                    for key, value in six.iteritems(group_inventory)
+                ),
+            )
+            for group, group_inventory in six.iteritems(inventory)
+        )
+
+    @staticmethod
+    def get_mutable_inventory(inventory):
+        """Return the serialized inventory with the hosts and children of the groups as sets"""
+        for group, group_inventory in six.iteritems(inventory):
+            if group != "_meta":
+                for key in ["hosts", "children"]:
+                    if key in group_inventory:
+                        group_inventory[key] = set(group_inventory[key])
+        return inventory
 
 
 if __name__ == "__main__":
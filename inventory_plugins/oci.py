@@ -35,6 +35,23 @@ DOCUMENTATION = """
                - name: OCI_ANSIBLE_AUTH_TYPE
         enable_parallel_processing:
               description: Use multiple threads to speedup lookup.
+        max_thread_count:
+              description: Only valid when enable_parallel_processing is set. The maximum number of threads to use.
+                  The threads are shared by all the regions.
+              type: int
+              default: 50
+        max_thread_count_per_region:
+              description: Only valid when enable_parallel_processing is set. The maximum number of threads making
+                  API calls to a single region at a time. Defaults to the value of max_thread_count.
+              type: int
+        compartment_cache_max_age:
+             description: The number of seconds the compartments of the tenancy are cached. The compartments are
+                 cached in the directory set by the OCI_ANSIBLE_CACHE_DIR environment variable
+                 (default ~/.cache/oci-ansible). Set to 0 to always list the compartments.
+             type: int
+             default: 3600
+             env:
+               - name: OCI_COMPARTMENT_CACHE_MAX_AGE
         regions:
              description: A list of regions to search. If not specified, the region is read from config file.
         hostnames:
@@ -42,6 +59,14 @@ DOCUMENTATION = """
         filters:
              description: A dictionary of filter value pairs. Available filters  are
                  display_name, lifecycle_state, availability_domain, defined_tags, freeform_tags.
+        hostvars_include:
+             description: A list of the host vars to include in the inventory. Use dotted paths for the keys of nested
+                 host vars, eg. metadata.ssh_authorized_keys. All the host vars are included by default.
+             type: list
+        hostvars_exclude:
+             description: A list of the host vars to exclude from the inventory. Use dotted paths for the keys of
+                 nested host vars, eg. metadata.user_data.
+             type: list
 """
 
 EXAMPLES = """
@@ -59,6 +84,8 @@ regions:
 
 # Enable threads to speedup lookup
 enable_parallel_processing: yes
+max_thread_count: 50
+max_thread_count_per_region: 10
 
 # Select compartment by ocid or name
 compartments:
@@ -88,6 +115,11 @@ filters:
      "oci:compute:instancepool": "ocid1.instancepool.oc1.phx.xxxx"
     }
 
+# Example leaving out the host vars which are not used by the playbooks
+hostvars_exclude:
+  - metadata.user_data
+  - extended_metadata
+
 # Enable Cache
 cache: yes
 cache_plugin: jsonfile
@@ -108,10 +140,12 @@ from ansible.utils.display import Display
 
 from ansible.module_utils import six
 from ansible.module_utils.oracle import oci_utils, oci_config_utils, oci_common_utils
-from collections import deque, defaultdict
+from collections import defaultdict
 from multiprocessing.pool import ThreadPool
 from functools import partial
 from contextlib import contextmanager
+from itertools import chain
+import threading
 
 try:
     import oci
@@ -139,8 +173,12 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         self.inventory = None
         self.config = {}
         self.compartments = None
+        self._compartment_tree = None
         self._region_subscriptions = None
         self.regions = {}
+        # Thread pool shared by all the regions while the inventory is built with parallel processing enabled
+        self._thread_pool = None
+        self._region_semaphores = {}
         self.params = {
             "config_file": os.path.join(os.path.expanduser("~"), ".oci", "config"),
             "profile": "DEFAULT",
@@ -285,6 +323,64 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             # terminate the pool
             pool.terminate()
 
+    @contextmanager
+    def region_executor(self):
+        """Set up the thread pool shared by all the regions when parallel processing is enabled. The pool size is the
+        global cap on the number of concurrent API calls and a semaphore per region caps the calls made to a region."""
+        if not self.get_option("enable_parallel_processing"):
+            yield
+            return
+        max_thread_count = int(
+            self.get_option("max_thread_count") or self.params["max_thread_count"]
+        )
+        max_thread_count_per_region = int(
+            self.get_option("max_thread_count_per_region") or max_thread_count
+        )
+        self._region_semaphores = dict(
+            (region, threading.BoundedSemaphore(max_thread_count_per_region))
+            for region in self.regions
+        )
+        self.display.warning(
+            "Parallel processing enabled. Using {0} threads across all regions with at most {1} threads "
+            "per region.".format(max_thread_count, max_thread_count_per_region)
+        )
+        with self.pool(processes=max_thread_count) as pool:
+            self._thread_pool = pool
+            try:
+                yield
+            finally:
+                self._thread_pool = None
+
+    @staticmethod
+    def get_region_tasks(tasks_by_region):
+        """Return a list of (region, task) tuples with the tasks of the regions interleaved, so that the threads of the
+        shared pool are spread across the regions instead of waiting on the cap of a single region."""
+        tasks_per_region = [
+            [(region, task) for task in tasks_by_region[region]]
+            for region in tasks_by_region
+        ]
+        return [
+            region_task
+            for region_task in chain.from_iterable(
+                six.moves.zip_longest(*tasks_per_region)
+            )
+            if region_task is not None
+        ]
+
+    def map_region_tasks(self, fn, region_tasks):
+        """Call fn(task, region) for all the (region, task) tuples and return the results in the same order. The tasks
+        are run in the shared thread pool when parallel processing is enabled."""
+        if self._thread_pool is None:
+            return [fn(task, region) for region, task in region_tasks]
+        return self._thread_pool.map(
+            partial(self._call_with_region_limit, fn), region_tasks, chunksize=1
+        )
+
+    def _call_with_region_limit(self, fn, region_task):
+        region, task = region_task
+        with self._region_semaphores[region]:
+            return fn(task, region)
+
     def _get_instances_by_region(self, regions):
         """
            :param regions: a list of regions in which to describe instances
@@ -308,13 +404,12 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             self.display.warning("No compartments matching the criteria.")
             return
 
-        all_instances = self.get_instances(self.compartments)
+        with self.region_executor():
+            all_instances = self.get_instances(self.compartments)
 
-        instance_inventories = [
-            self.build_inventory_for_instance(instance, region)
-            for region in all_instances
-            for instance in all_instances[region]
-        ]
+            instance_inventories = self.map_region_tasks(
+                self.build_inventory_for_instance, self.get_region_tasks(all_instances)
+            )
 
         return instance_inventories
 
@@ -326,33 +421,16 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         """
         instances = defaultdict(list)
 
-        if self.get_option("enable_parallel_processing"):
-            for region in self.regions:
-                num_threads = min(
-                    len(compartment_ocids), self.params["max_thread_count"]
-                )
-                self.display.warning(
-                    "Parallel processing enabled. Getting instances from {0} in {1} threads.".format(
-                        region, num_threads
-                    )
-                )
-
-                with self.pool(processes=num_threads) as pool:
-                    get_filtered_instances_for_region = partial(
-                        self.get_filtered_instances, region=region
-                    )
-                    lists_of_instances = pool.map(
-                        get_filtered_instances_for_region, compartment_ocids
-                    )
-                for sublist in lists_of_instances:
-                    instances[region].extend(sublist)
-
-        else:
-            for region in self.regions:
-                for compartment_ocid in compartment_ocids:
-                    instances[region].extend(
-                        self.get_filtered_instances(compartment_ocid, region)
-                    )
+        region_compartments = self.get_region_tasks(
+            dict((region, compartment_ocids) for region in self.regions)
+        )
+        lists_of_instances = self.map_region_tasks(
+            self.get_filtered_instances, region_compartments
+        )
+        for (region, compartment_ocid), sublist in zip(
+            region_compartments, lists_of_instances
+        ):
+            instances[region].extend(sublist)
 
         return instances
 
@@ -411,28 +489,21 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             )
 
         try:
-            tenancy = oci_utils.call_with_backoff(
-                self.identity_client.get_compartment,
-                compartment_id=self.params["tenancy"],
-            ).data
+            compartment_tree = self.get_compartment_tree()
         except ServiceError as se:
             if se.status == 404:
                 raise Exception(
                     "Either tenancy ocid is invalid or need inspect permission on root compartment to get the "
                     "compartments in the tenancy."
                 )
+            raise
 
-        all_compartments = [tenancy] + [
-            compartment
-            for compartment in oci_utils.list_all_resources(
-                target_fn=self.identity_client.list_compartments,
-                compartment_id=self.params["tenancy"],
-                compartment_id_in_subtree=True,
-            )
-            if self.filter_resource(
-                compartment, lifecycle_state=self.LIFECYCLE_ACTIVE_STATE
+        all_compartments = oci_common_utils.get_compartment_models(
+            oci_common_utils.get_compartment_subtree(
+                compartment_tree, self.params["tenancy"]
             )
-        ]
+        )
+        tenancy = all_compartments[0]
 
         # return all the compartments if compartment_name is not passed
         if not compartment_name:
@@ -474,28 +545,40 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 return False
         return True
 
+    def get_compartment_tree(self):
+        """Return the compartment tree of the tenancy, see oci_common_utils.get_compartment_tree"""
+        if self._compartment_tree is None:
+            self._compartment_tree = oci_common_utils.get_compartment_tree(
+                self.identity_client,
+                self.params["tenancy"],
+                max_age=self.get_option("compartment_cache_max_age"),
+            )
+        return self._compartment_tree
+
     def get_sub_compartments(self, root):
-        # OCI SDK does not support fetching sub-compartments for non root compartments
-        # So traverse the compartment tree to fetch all the sub compartments
-        compartments = []
-        queue = deque()
-        queue.append(root)
-        while len(queue) > 0:
-            parent_compartment = queue.popleft()
-            compartments.append(parent_compartment)
-            child_compartments = [
-                compartment
-                for compartment in oci_utils.list_all_resources(
-                    target_fn=self.identity_client.list_compartments,
-                    compartment_id=parent_compartment.id,
-                )
-                if self.filter_resource(
-                    compartment, lifecycle_state=self.LIFECYCLE_ACTIVE_STATE
+        # OCI SDK does not support fetching sub-compartments for non root compartments. So take the hierarchy from
+        # the compartment tree of the tenancy or, when the compartments of the tenancy cannot be listed, traverse the
+        # hierarchy level by level.
+        if self.params["tenancy"]:
+            try:
+                compartment_tree = self.get_compartment_tree()
+            except ServiceError as ex:
+                if ex.status == 401:
+                    raise
+                self.log(
+                    "Could not list the compartments of the tenancy. Listing the compartments in the hierarchy of "
+                    "compartment {0}. Error: {1}".format(root.id, ex)
                 )
-            ]
-            for child_compartment in child_compartments:
-                queue.append(child_compartment)
-        return compartments
+            else:
+                if root.id in compartment_tree["compartments"]:
+                    return oci_common_utils.get_compartment_models(
+                        oci_common_utils.get_compartment_subtree(
+                            compartment_tree, root.id
+                        )
+                    )
+        return [root] + oci_common_utils.list_subcompartments_in_parallel(
+            self.identity_client, root.id
+        )
 
     def build_inventory_for_instance(self, instance, region):
         """Build and return inventory for an instance"""
@@ -611,7 +694,11 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         self, instance_inventory, host_name, vars, groups
     ):
         instance_inventory.setdefault(host_name, {"groups": {}, "vars": {}})
-        instance_inventory[host_name]["vars"] = vars
+        instance_inventory[host_name]["vars"] = oci_common_utils.project_dict(
+            vars,
+            include_paths=self.get_option("hostvars_include"),
+            exclude_paths=self.get_option("hostvars_exclude"),
+        )
         for group in groups:
             instance_inventory[host_name]["groups"].setdefault(group, {"children": []})
 
@@ -773,7 +860,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                             self.inventory.add_host(host_name, group=group)
                             self.inventory.set_variable(
                                 host_name,
-                                host_inventory["vars"]["display_name"],
+                                host_inventory["vars"].get("display_name", host_name),
                                 host_inventory["vars"],
                             )
                             self.inventory.add_child("all", host_name)
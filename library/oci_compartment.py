@@ -126,7 +126,7 @@ work_request:
 """
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.oracle import oci_utils
+from ansible.module_utils.oracle import oci_common_utils, oci_utils
 
 
 try:
@@ -204,6 +204,16 @@ def is_compartment_root(identity_client, compartment_id):
     return compartment.compartment_id is None
 
 
+def invalidate_compartment_tree(identity_client, module):
+    # The compartment tree of the tenancy cached by the facts module and the inventory does not have the change.
+    # The instance principals signer has the tenancy OCID from the certificate of the instance.
+    tenancy_id = oci_utils.get_oci_config(module).get("tenancy") or getattr(
+        identity_client.base_client.signer, "tenancy_id", None
+    )
+    if tenancy_id:
+        oci_common_utils.invalidate_compartment_tree(tenancy_id)
+
+
 def main():
     module_args = oci_utils.get_taggable_arg_spec(supports_wait=True)
     module_args.update(
@@ -277,6 +287,9 @@ def main():
     else:
         result = delete_compartment(identity_client, module)
 
+    if result.get("changed"):
+        invalidate_compartment_tree(identity_client, module)
+
     module.exit_json(**result)
 
 
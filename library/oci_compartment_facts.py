@@ -45,9 +45,21 @@ options:
     depth:
         description: Specify the hierarchy level upto which subcompartments under I(compartment_id) should be retrieved.
                      Use this option with I(fetch_subcompartments=True) to fetch details of all the subcompartments
-                     which are upto I(depth) deep under I(compartment_id).
+                     which are upto I(depth) deep under I(compartment_id). The subcompartments of a level are listed
+                     in parallel.
         required: false
         default: 1
+    compartment_cache_max_age:
+        description: With a I(depth) greater than 1, take the subcompartments from the tree of the compartments of the
+                     tenancy cached for up to I(compartment_cache_max_age) seconds, instead of listing them. The tree
+                     is listed once and cached in the directory set by the OCI_ANSIBLE_CACHE_DIR environment variable
+                     (default ~/.cache/oci-ansible), and is shared with the oci inventory plugin and script. The tree
+                     only has the ACTIVE compartments, and M(oci_compartment) removes it when it changes a compartment.
+                     The subcompartments are listed when the tree cannot be listed or does not have I(compartment_id).
+                     By default, the subcompartments are always listed.
+        required: false
+        default: 0
+        type: int
 author: "Rohit Chaware (@rohitChaware)"
 extends_documentation_fragment: [ oracle, oracle_name_option ]
 """
@@ -146,7 +158,7 @@ compartments:
 """
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.oracle import oci_utils
+from ansible.module_utils.oracle import oci_common_utils, oci_utils
 
 try:
     from oci.identity.identity_client import IdentityClient
@@ -162,25 +174,38 @@ MAXIMUM_DEPTH_OF_NESTED_COMPARTMENT = 6
 
 
 def list_subcompartments_upto_depth(identity_client, compartment_id, depth):
-    if depth == 1:
-        return oci_utils.list_all_resources(
-            identity_client.list_compartments, compartment_id=compartment_id
-        )
-
-    subcompartments = []
-
-    immediate_subcompartments = oci_utils.list_all_resources(
-        identity_client.list_compartments, compartment_id=compartment_id
+    """Return the subcompartments upto depth in the compartment, in all the lifecycle states. The subcompartments of
+    a level are listed in parallel."""
+    return oci_common_utils.list_subcompartments_in_parallel(
+        identity_client, compartment_id, depth=depth, lifecycle_state=None
     )
 
-    if immediate_subcompartments:
-        subcompartments.extend(immediate_subcompartments)
 
-    for comp in immediate_subcompartments:
-        subcompartments.extend(
-            list_subcompartments_upto_depth(identity_client, comp.id, depth - 1)
+def list_subcompartments_from_tree(identity_client, module, tenancy):
+    """Return the subcompartments upto depth in the compartment from the cached compartment tree of the tenancy, or
+    None if the tree cannot be listed or does not have the compartment (eg. the compartment is not ACTIVE)."""
+    compartment_id = module.params["compartment_id"]
+    if tenancy is not None:
+        tenancy_id = tenancy.id
+    else:
+        tenancy_id = oci_utils.get_oci_config(module).get("tenancy")
+    if not tenancy_id:
+        return None
+
+    try:
+        tree = oci_common_utils.get_compartment_tree(
+            identity_client,
+            tenancy_id,
+            max_age=module.params["compartment_cache_max_age"],
         )
-    return subcompartments
+    except ServiceError:
+        return None
+    if compartment_id not in tree["compartments"]:
+        return None
+    # The subtree starts with the compartment itself
+    return oci_common_utils.get_compartment_subtree(
+        tree, compartment_id, depth=module.params["depth"]
+    )[1:]
 
 
 def list_subcompartments(identity_client, module, tenancy):
@@ -197,6 +222,11 @@ def list_subcompartments(identity_client, module, tenancy):
 
     compartment_id = module.params["compartment_id"]
 
+    if module.params["depth"] > 1 and module.params.get("compartment_cache_max_age"):
+        result = list_subcompartments_from_tree(identity_client, module, tenancy)
+        if result is not None:
+            return result
+
     if module.params["depth"] >= MAXIMUM_DEPTH_OF_NESTED_COMPARTMENT:
         # Using API to list all compartment under tenancy using parameter `compartment_id_in_subtree`.
         if tenancy:
@@ -239,6 +269,7 @@ def main():
             compartment_id=dict(type="str", required=True),
             fetch_subcompartments=dict(type="bool", required=False),
             depth=dict(type="int", required=False, default=1),
+            compartment_cache_max_age=dict(type="int", required=False, default=0),
         )
     )
 
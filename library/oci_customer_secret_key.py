@@ -272,7 +272,7 @@ def main():
     user_id = module.params.get("user_id", None)
     secret_key_id = module.params.get("customer_secret_key_id", None)
     name = module.params.get("name", None)
-    get_logger().debug("Id is " + str(secret_key_id))
+    get_logger().debug("Id is %s", secret_key_id)
 
     if secret_key_id is not None:
         secret_key = _get_customer_secret_key_from_id(
@@ -72,7 +72,10 @@ options:
         aliases: [ 'metadata' ]
     src:
         description: The source file path when uploading an object. Use with I(state=present) to upload
-                     an object. This option is mutually exclusive with I(dest).
+                     an object. This option is mutually exclusive with I(dest). The md5 of the file is cached in the
+                     directory set by the OCI_ANSIBLE_CACHE_DIR environment variable (default ~/.cache/oci-ansible)
+                     until the file changes, for OCI_FILE_MD5_CACHE_MAX_AGE seconds (default 30 days). Set
+                     OCI_FILE_MD5_CACHE_MAX_AGE to 0 to disable the cache.
         required: false
     upload_id:
         description: The upload ID for a multipart upload. Use with I(state=abort_multipart_upload) to abort
@@ -89,6 +92,11 @@ options:
                      when I(multipart_upload=True).
         required: false
         default: True
+    parallel_downloads:
+        description: Use I(parallel_downloads=True) to download an object larger than 128 MiB in byte ranges of 128 MiB,
+                     three ranges at a time. Disable parallel download feature with I(parallel_downloads=False).
+        required: false
+        default: True
     state:
         description: The final state of the object after the task.
                      Use I(state=absent) with I(object) to delete a specific object.
@@ -181,8 +189,7 @@ object:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_bytes
-from ansible.module_utils.oracle import oci_utils
-import base64
+from ansible.module_utils.oracle import oci_utils, oci_object_storage_utils
 import os
 
 try:
@@ -225,41 +232,47 @@ def get_object(object_storage_client, module):
     dest = module.params["dest"]
 
     result = dict()
+    kwargs = dict(namespace_name=namespace, bucket_name=bucket, object_name=obj)
 
     try:
         response = oci_utils.call_with_backoff(
-            object_storage_client.get_object,
-            namespace_name=namespace,
-            bucket_name=bucket,
-            object_name=obj,
+            object_storage_client.head_object, **kwargs
         )
     except ServiceError as ex:
         module.fail_json(msg=ex.message)
 
-    # create dest file if it does not exist
-    try:
-        with open(dest, "a"):
-            pass
-    except IOError as ioex:
-        module.fail_json(
-            msg="Error opening/creating the dest file: {0}".format(str(ioex))
-        )
-
-    # Check if file exists with the same checksum. Get md5 hexdigest of the file content, convert it to binary and then
-    #  get base-64 encoded MD5 hash.
-    dest_md5 = base64.b64encode(base64.b16decode(module.md5(dest), True)).decode(
-        "ascii"
-    )
-    if os.path.isfile(to_bytes(dest)) and (
-        dest_md5 == response.headers.get("Content-MD5", None)
-        or dest_md5 == response.headers.get("opc-multipart-md5", None)
-    ):
+    # Check if file exists with the same checksum.
+    if os.path.isfile(
+        to_bytes(dest)
+    ) and oci_object_storage_utils.is_file_matching_object(dest, response.headers):
         changed = False
     else:
-        with open(to_bytes(dest), "wb") as dest_file:
-            dest_file.write(response.data.content)
-            changed = True
-            result["object"] = dict(response.headers)
+        # Stream the object to the file, so that the memory used does not depend on the size of the object. Large
+        # objects are downloaded in byte ranges in parallel.
+        size = int(response.headers.get("Content-Length") or 0)
+        try:
+            if (
+                module.params.get("parallel_downloads")
+                and size > oci_object_storage_utils.DOWNLOAD_PART_SIZE
+            ):
+                oci_object_storage_utils.download_object_in_parts(
+                    object_storage_client, dest, size, response.headers, **kwargs
+                )
+            else:
+                oci_object_storage_utils.download_object(
+                    oci_utils.call_with_backoff(
+                        object_storage_client.get_object, **kwargs
+                    ),
+                    dest,
+                )
+        except ServiceError as ex:
+            module.fail_json(msg=ex.message)
+        except (IOError, OSError, ValueError) as ex:
+            module.fail_json(
+                msg="Error downloading the object to the dest file: {0}".format(str(ex))
+            )
+        changed = True
+        result["object"] = dict(response.headers)
 
     result["changed"] = changed
 
@@ -302,16 +315,14 @@ def put_object(object_storage_client, module):
 
     result = dict(changed=False)
 
-    # Check if the object exists with same checksum.
+    # Check if the object exists with same checksum. The file is hashed only if the object has its size, and its md5
+    # is cached until it changes.
     remote_object = head_object(object_storage_client, module)
 
-    src_md5 = base64.b64encode(base64.b16decode(module.md5(src), True)).decode("ascii")
-
     # ENHANCEMENT_OVER_SDK: This is a EoU enhancement to make it easier for an Ansible user to provide
     # content for their object
-    if remote_object is not None and (
-        src_md5 == remote_object.headers.get("Content-MD5", None)
-        or src_md5 == remote_object.headers.get("opc-multipart-md5", None)
+    if remote_object is not None and oci_object_storage_utils.is_file_matching_object(
+        src, remote_object.headers
     ):
         changed = False
     elif module.params.get("multipart_upload"):
@@ -331,28 +342,29 @@ def put_object(object_storage_client, module):
         changed = True
         result["object"] = dict(response.headers)
     else:
+        # Stream the file as the body of the request, so that the memory used does not depend on the size of the file
         with open(to_bytes(src), "rb") as src_file:
-            put_object_body = src_file.read()
-
-        try:
-            response = oci_utils.call_with_backoff(
-                object_storage_client.put_object,
-                namespace_name=namespace,
-                bucket_name=bucket,
-                object_name=obj,
-                put_object_body=put_object_body,
-                content_encoding=content_encoding,
-                content_language=content_language,
-                content_length=content_length,
-                content_md5=content_md5,
-                content_type=content_type,
-                opc_meta=opc_meta,
-            )
-            changed = True
-            result["object"] = dict(response.headers)
+            if content_length is None:
+                content_length = os.fstat(src_file.fileno()).st_size
+            try:
+                response = oci_utils.call_with_backoff(
+                    object_storage_client.put_object,
+                    namespace_name=namespace,
+                    bucket_name=bucket,
+                    object_name=obj,
+                    put_object_body=src_file,
+                    content_encoding=content_encoding,
+                    content_language=content_language,
+                    content_length=content_length,
+                    content_md5=content_md5,
+                    content_type=content_type,
+                    opc_meta=opc_meta,
+                )
+                changed = True
+                result["object"] = dict(response.headers)
 
-        except ServiceError as ex:
-            module.fail_json(msg=ex.message)
+            except ServiceError as ex:
+                module.fail_json(msg=ex.message)
 
     result["changed"] = changed
     return result
@@ -433,6 +445,7 @@ def main():
             opc_meta=dict(type=dict, required=False, aliases=["metadata"]),
             multipart_upload=dict(type=bool, required=False, default=True),
             parallel_uploads=dict(type=bool, required=False, default=True),
+            parallel_downloads=dict(type=bool, required=False, default=True),
         )
     )
 
@@ -0,0 +1,282 @@
+#!/usr/bin/python
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# This software is made available to you under the terms of the GPL 3.0 license or the Apache 2.0 license.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+# Apache License v2.0
+# See LICENSE.TXT for details.
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+
+DOCUMENTATION = """
+---
+module: oci_object_sync
+short_description: Sync a local directory tree to a bucket in OCI Object Storage Service
+description:
+    - This module uploads the files of a local directory tree to the objects of a bucket under a prefix, and optionally
+      deletes the objects under the prefix which have no local file, in a single task.
+    - The objects under the prefix are listed once. A file is uploaded only if the bucket has no object for it, or if
+      the size or the md5 of the object differs from the file. The files are hashed only when their size matches, and
+      their md5 is cached until they change (see I(src) of M(oci_object)).
+    - The uploads and the deletions run in parallel.
+version_added: "2.5"
+options:
+    namespace_name:
+        description: Name of the namespace of the bucket.
+        required: true
+        aliases: [ 'namespace' ]
+    bucket_name:
+        description: Name of the bucket to sync the directory to.
+        required: true
+        aliases: [ 'bucket' ]
+    src_dir:
+        description: The local directory to sync. The files of the directory tree are uploaded to objects named after
+                     their path relative to I(src_dir), prefixed with I(prefix). Symbolic links to directories are not
+                     followed.
+        required: true
+    prefix:
+        description: The prefix of the names of the objects the directory is synced to, eg. C(backups/). The prefix is
+                     a directory of the bucket, a C(/) is appended to a prefix which does not end with one, so that
+                     the objects of the other directories starting with the prefix are not synced or deleted.
+        required: false
+        default: ""
+    delete:
+        description: Delete the objects under I(prefix) which have no file in I(src_dir).
+        required: false
+        default: false
+        type: bool
+    parallel_count:
+        description: The number of files uploaded or objects deleted in parallel.
+        required: false
+        default: 10
+        type: int
+author:
+    - Manoj Meda (@manojmeda)
+    - Mike Ross (@mross22)
+    - Nabeel Al-Saber (@nalsaber)
+extends_documentation_fragment: oracle
+"""
+
+EXAMPLES = """
+- name: Sync a directory to a bucket
+  oci_object_sync:
+    namespace: mynamespace
+    bucket: mybucket
+    src_dir: /var/backups/mydb
+    prefix: backups/mydb/
+
+- name: Sync a directory to a bucket and delete the objects of the removed files
+  oci_object_sync:
+    namespace: mynamespace
+    bucket: mybucket
+    src_dir: /var/www/static
+    delete: true
+"""
+
+RETURN = """
+uploaded:
+    description: The names of the objects uploaded, or which would be uploaded in check mode
+    returned: always
+    type: list
+    sample: ["backups/mydb/2019-10-01.dump"]
+deleted:
+    description: The names of the objects deleted, or which would be deleted in check mode
+    returned: always
+    type: list
+    sample: ["backups/mydb/2019-09-01.dump"]
+unchanged:
+    description: The names of the objects which already have the content of their file
+    returned: always
+    type: list
+    sample: ["backups/mydb/2019-09-30.dump"]
+failed:
+    description: The objects which could not be uploaded or deleted, with the error. The task fails if any.
+    returned: always
+    type: list
+    sample: [{"name": "backups/mydb/2019-10-02.dump", "msg": "Permission denied"}]
+"""
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.oracle import (
+    oci_common_utils,
+    oci_object_storage_utils,
+    oci_utils,
+)
+
+try:
+    from oci.object_storage.object_storage_client import ObjectStorageClient
+    from oci.exceptions import ServiceError
+    from oci.object_storage import UploadManager
+
+    HAS_OCI_PY_SDK = True
+except ImportError:
+    HAS_OCI_PY_SDK = False
+
+UPLOADED = "uploaded"
+DELETED = "deleted"
+UNCHANGED = "unchanged"
+
+
+def get_prefix(module):
+    """Return the prefix of the object names, ending with / so that eg. backups/mydb does not match backups/mydb2/"""
+    prefix = module.params.get("prefix") or ""
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+    return prefix
+
+
+def list_remote_objects(object_storage_client, module, prefix):
+    """Return the objects under the prefix keyed by name, listed with their size and md5"""
+    kwargs = dict(
+        namespace_name=module.params["namespace_name"],
+        bucket_name=module.params["bucket_name"],
+        fields="name,size,md5,timeCreated",
+    )
+    if prefix:
+        kwargs["prefix"] = prefix
+    return dict(
+        (remote_object.name, remote_object)
+        for remote_object in oci_utils.list_all_resources(
+            object_storage_client.list_objects, **kwargs
+        ).objects
+    )
+
+
+def sync_file(object_storage_client, module, name, path, remote_object):
+    """Upload the file to the object unless the object has the content of the file. Return the action taken."""
+    if remote_object is not None and oci_object_storage_utils.is_file_matching(
+        path, remote_object.size, remote_object.md5
+    ):
+        return UNCHANGED
+    if not module.check_mode:
+        # The files are uploaded in parallel, the parts of a file are uploaded one at a time
+        upload_manager = UploadManager(
+            object_storage_client, allow_parallel_uploads=False
+        )
+        oci_utils.call_with_backoff(
+            upload_manager.upload_file,
+            namespace_name=module.params["namespace_name"],
+            bucket_name=module.params["bucket_name"],
+            object_name=name,
+            file_path=path,
+        )
+    return UPLOADED
+
+
+def delete_object(object_storage_client, module, name):
+    if not module.check_mode:
+        oci_utils.call_with_backoff(
+            object_storage_client.delete_object,
+            namespace_name=module.params["namespace_name"],
+            bucket_name=module.params["bucket_name"],
+            object_name=name,
+        )
+    return DELETED
+
+
+def run_task(task):
+    """Run a task of the sync, returning the name of the object with the action taken or the error. Any error is
+    reported, eg. a MultipartUploadError of a large file or a connection error, so that the failure of an object does
+    not lose the results of the others."""
+    name, fn, args = task
+    try:
+        return name, fn(*args), None
+    except ServiceError as ex:
+        return name, None, ex.message
+    except Exception as ex:
+        return name, None, str(ex) or type(ex).__name__
+
+
+def sync_dir(object_storage_client, module):
+    src_dir = module.params["src_dir"]
+    prefix = get_prefix(module)
+    local_files = oci_object_storage_utils.get_local_files(src_dir, prefix)
+    try:
+        remote_objects = list_remote_objects(object_storage_client, module, prefix)
+    except ServiceError as ex:
+        module.fail_json(msg=ex.message)
+
+    tasks = [
+        (
+            name,
+            sync_file,
+            (object_storage_client, module, name, path, remote_objects.get(name)),
+        )
+        for name, path in sorted(local_files.items())
+    ]
+    if module.params.get("delete"):
+        tasks.extend(
+            (name, delete_object, (object_storage_client, module, name))
+            for name in sorted(remote_objects)
+            if name not in local_files
+        )
+
+    result = dict(uploaded=[], deleted=[], unchanged=[], failed=[])
+    if tasks:
+        pool = oci_common_utils.multiprocessing_pool.ThreadPool(
+            processes=min(module.params["parallel_count"], len(tasks))
+        )
+        try:
+            for name, action, error in pool.imap(run_task, tasks):
+                if error is not None:
+                    result["failed"].append(dict(name=name, msg=error))
+                else:
+                    result[action].append(name)
+        finally:
+            pool.close()
+            pool.join()
+
+    result["changed"] = bool(result["uploaded"] or result["deleted"])
+    return result
+
+
+def main():
+    module_args = oci_utils.get_common_arg_spec()
+    module_args.update(
+        dict(
+            namespace_name=dict(type="str", required=True, aliases=["namespace"]),
+            bucket_name=dict(type="str", required=True, aliases=["bucket"]),
+            src_dir=dict(type="path", required=True),
+            prefix=dict(type="str", required=False, default=""),
+            delete=dict(type="bool", required=False, default=False),
+            parallel_count=dict(type="int", required=False, default=10),
+        )
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    if not HAS_OCI_PY_SDK:
+        module.fail_json(msg="oci python sdk required for this module")
+
+    if not os.path.isdir(module.params["src_dir"]):
+        module.fail_json(
+            msg="The source path {0} must be a directory.".format(
+                module.params["src_dir"]
+            )
+        )
+    if module.params["parallel_count"] < 1:
+        module.fail_json(msg="parallel_count must be at least 1.")
+
+    object_storage_client = oci_utils.create_service_client(module, ObjectStorageClient)
+
+    result = sync_dir(object_storage_client, module)
+    if result["failed"]:
+        module.fail_json(
+            msg="Failed to sync {0} of the objects.".format(len(result["failed"])),
+            **result
+        )
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
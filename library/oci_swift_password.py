@@ -274,7 +274,7 @@ def main():
     user_id = module.params.get("user_id", None)
     id = module.params.get("swift_password_id", None)
     description = module.params.get("description", None)
-    get_logger().debug("Id is " + str(id))
+    get_logger().debug("Id is %s", id)
 
     if id is not None:
         sw_pass = _get_swift_password_from_id(identity_client, user_id, id, module)
@@ -320,7 +320,7 @@ def main():
     description = module.params.get("description", None)
     is_cost_tracking = module.params.get("is_cost_tracking", None)
 
-    get_logger().debug("tag key definition name is " + str(tag_name))
+    get_logger().debug("tag key definition name is %s", tag_name)
 
     tag = _get_tag_definition_from_id(identity_client, tag_namespace_id, tag_name)
 
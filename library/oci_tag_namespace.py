@@ -229,7 +229,7 @@ def main():
     name = module.params.get("name", None)
     description = module.params.get("description", None)
 
-    get_logger().debug("Tag namespace id is " + str(tag_ns_id))
+    get_logger().debug("Tag namespace id is %s", tag_ns_id)
 
     if tag_ns_id is not None:
         tag_ns = oci_utils.call_with_backoff(
@@ -6,6 +6,9 @@ class ModuleDocFragment(object):
     notes:
         - For OCI python sdk configuration, please refer to
           U(https://oracle-cloud-infrastructure-python-sdk.readthedocs.io/en/latest/configuration.html)
+        - The requests are not rate limited by default. Set the OCI_ANSIBLE_RATE_LIMIT environment variable to the
+          maximum number of requests per second sent to a service endpoint to rate limit them. The rate is halved when
+          OCI throttles a request and recovers gradually as the requests succeed.
     options:
         config_file_location:
             description:
@@ -71,4 +74,11 @@ class ModuleDocFragment(object):
                   U(https://docs.us-phoenix-1.oraclecloud.com/Content/General/Concepts/regions.htm) for more information
                   on OCI regions.
             type: str
+        home_region:
+            description:
+                - The home region of the tenancy. The requests to the Identity and Access Management service are
+                  sent to the home region. If not set, then the value of the OCI_IDENTITY_HOME_REGION variable, if
+                  any, is used. Otherwise the home region is looked up and cached in the directory set by the
+                  OCI_ANSIBLE_CACHE_DIR variable (default ~/.cache/oci-ansible).
+            type: str
     """
@@ -4,7 +4,7 @@
 # Apache License v2.0
 # See LICENSE.TXT for details.
 
-from ansible.module_utils.oracle import oci_utils
+from ansible.module_utils.oracle import oci_common_utils, oci_utils
 from ansible.module_utils.oracle.oci_resource_utils import (
     convert_input_data_to_model_class,
 )
@@ -39,8 +39,8 @@ FAILED_STATES = ["FAILED"]
 logger = oci_utils.get_logger("oci_ce_utils")
 
 
-def _debug(s):
-    get_logger().debug(s)
+def _debug(s, *args):
+    oci_common_utils.log_debug(get_logger(), s, *args)
 
 
 def get_logger():
@@ -154,9 +154,9 @@ def delete_and_wait(
             result[resource_type] = resource
         else:
             _debug(
-                "Resource {0} with {1} already deleted. So returning changed=False".format(
-                    resource_type, kwargs_get
-                )
+                "Resource {0} with {1} already deleted. So returning changed=False",
+                resource_type,
+                kwargs_get,
             )
     except ServiceError as ex:
         if ex.status != 404:
@@ -331,7 +331,7 @@ def create_and_wait(
         result["work_request"] = to_dict(
             wait_on_work_request(client, get_wr_response, module)
         )
-        _debug("Work request:{0}".format(result["work_request"]))
+        _debug("Work request:{0}", result["work_request"])
         result["changed"] = True
         if wait_applicable and module.params.get("wait", None):
             if states is None:
@@ -339,7 +339,7 @@ def create_and_wait(
             states = states + FAILED_STATES
             if resource_type == "cluster":
                 resource_affected = result["work_request"]["resources"][0]
-                _debug("Affected resources:{0}".format(resource_affected))
+                _debug("Affected resources:{0}", resource_affected)
                 resource = to_dict(
                     wait_on_resource(
                         client,
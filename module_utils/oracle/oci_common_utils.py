@@ -7,10 +7,27 @@
 from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import os
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
 from ansible.module_utils import six
+from ansible.module_utils._text import to_bytes
 
 try:
     import oci
+    from oci.exceptions import ServiceError
     from oci.retry import RetryStrategyBuilder
     from oci.util import to_dict
 
@@ -18,6 +35,39 @@ try:
 except ImportError:
     HAS_OCI_PY_SDK = False
 
+
+class LazyModule(object):
+    """
+    Proxy of a module which imports the module on the first access to one of its attributes. Ansible starts a new
+    python process for every task, so the modules which are expensive to import and are used only by some code paths
+    should be imported lazily, eg. yaml = LazyModule("yaml").
+    """
+
+    def __init__(self, name):
+        self._lazy_module_name = name
+        self._lazy_module = None
+
+    def __getattr__(self, attr):
+        if self._lazy_module is None:
+            self._lazy_module = importlib.import_module(self._lazy_module_name)
+        return getattr(self._lazy_module, attr)
+
+
+def is_sdk_class(cls, module_name, class_name):
+    """
+    Check if cls is the class_name class of the module_name module, without importing the module. If the module is not
+    imported yet, cls can not be the class.
+    :param cls: The class to check
+    :param module_name: Name of the module of the class. For example, oci.identity.identity_client.
+    :param class_name: Name of the class. For example, IdentityClient.
+    :return: True if cls is the class
+    """
+    module = sys.modules.get(module_name)
+    return module is not None and getattr(module, class_name, None) is cls
+
+
+multiprocessing_pool = LazyModule("multiprocessing.pool")
+
 __version__ = "1.16.0"
 MAX_WAIT_TIMEOUT_IN_SECONDS = 2000
 DEAD_STATES = [
@@ -72,8 +122,217 @@ DELETE_OPERATION_KEY = "DELETE"
 ACTION_OPERATION_KEY = "ACTION"
 ANY_OPERATION_KEY = "ANY"
 
+# Directory of the caches shared by the modules, the inventory plugin and the inventory script
+CACHE_DIR_ENV_VAR = "OCI_ANSIBLE_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "oci-ansible")
+COMPARTMENT_CACHE_MAX_AGE_ENV_VAR = "OCI_COMPARTMENT_CACHE_MAX_AGE"
+DEFAULT_COMPARTMENT_CACHE_MAX_AGE = 3600
+MAX_COMPARTMENT_LISTING_THREADS = 10
+REGION_SUBSCRIPTIONS_CACHE_MAX_AGE_ENV_VAR = "OCI_REGION_SUBSCRIPTIONS_CACHE_MAX_AGE"
+DEFAULT_REGION_SUBSCRIPTIONS_CACHE_MAX_AGE = 3600
+HOME_REGION_CACHE_MAX_AGE_ENV_VAR = "OCI_HOME_REGION_CACHE_MAX_AGE"
+# The home region of a tenancy does not change
+DEFAULT_HOME_REGION_CACHE_MAX_AGE = 30 * 24 * 3600
+RATE_LIMIT_ENV_VAR = "OCI_ANSIBLE_RATE_LIMIT"
+# The requests are not rate limited unless OCI_ANSIBLE_RATE_LIMIT is set
+DEFAULT_RATE_LIMIT = 0
+
+# The optional kwargs of the SDK operations, keyed by function. See get_supported_kwargs.
+_supported_kwargs_cache = {}
+
+# The retry strategy is stateless, so a single instance is shared by all the calls
+_retry_strategy = None
+# Rate limiters shared by all the threads of the process, keyed by service client class and endpoint
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+class LazyValue(object):
+    """Argument of a log message which is computed only when the message is formatted"""
+
+    def __init__(self, fn, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.fn(*self.args, **self.kwargs))
+
+    def __repr__(self):
+        return repr(self.fn(*self.args, **self.kwargs))
+
+
+def lazy(fn, *args, **kwargs):
+    """Return a LazyValue, eg. _debug("Resource {0}", lazy(to_dict, resource)) converts the resource to a dict only
+    when debug logging is enabled."""
+    return LazyValue(fn, *args, **kwargs)
+
+
+def log_debug(logger, msg, *args):
+    """Log a debug message with the logger. The message is formatted with args only when the logger is enabled for
+    debug messages."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(msg.format(*args) if args else msg)
+
+
+def _debug(s, *args):
+    log_debug(logging.getLogger(__name__), s, *args)
+
+
+class AdaptiveRateLimiter(object):
+    """Token bucket limiting the rate of the requests sent to a service endpoint. The rate is adjusted with additive
+    increase/multiplicative decrease (AIMD): it is halved when the service throttles a request (HTTP 429) and increased
+    by additive_increase requests per second for every successful request, up to max_rate. The limiter is thread
+    safe."""
+
+    def __init__(
+        self,
+        name,
+        max_rate,
+        min_rate=1.0,
+        additive_increase=0.1,
+        decrease_factor=0.5,
+    ):
+        """
+        :param str name: Name of the limiter, used in the debug logs
+        :param float max_rate: Initial and maximum number of requests per second. Also the size of the bucket.
+        :param float min_rate: Minimum number of requests per second
+        :param float additive_increase: Requests per second added to the rate for every successful request
+        :param float decrease_factor: Factor the rate is multiplied with when a request is throttled
+        """
+        self.name = name
+        self.max_rate = float(max_rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.rate = self.max_rate
+        self.tokens = self.max_rate
+        self._last_refill_time = time.time()
+        self._last_decrease_time = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.max_rate, self.tokens + (now - self._last_refill_time) * self.rate
+        )
+        self._last_refill_time = now
+
+    def acquire(self):
+        """Wait until the rate allows a request to be sent"""
+        while True:
+            with self._lock:
+                self._refill(time.time())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate >= self.max_rate:
+                return
+            self._refill(time.time())
+            self.rate = min(self.max_rate, self.rate + self.additive_increase)
+            recovered = self.rate == self.max_rate
+        if recovered:
+            _debug(
+                "Rate of the requests to {0} recovered to {1:.2f} requests per second.",
+                self.name,
+                self.max_rate,
+            )
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.time()
+            # The requests in flight when the rate was decreased are likely throttled too, so decrease the rate at
+            # most once per second.
+            if self._last_decrease_time and now - self._last_decrease_time < 1:
+                return
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = min(self.tokens, 0)
+            self._last_decrease_time = now
+            rate = self.rate
+        _debug(
+            "Request to {0} throttled. Decreased the rate to {1:.2f} requests per second.",
+            self.name,
+            rate,
+        )
+
+    def call(self, fn, *args, **kwargs):
+        """Call fn when the rate allows it and adjust the rate based on the outcome of the call"""
+        self.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except ServiceError as ex:
+            if ex.status == 429:
+                self.on_throttle()
+            raise
+        self.on_success()
+        return result
+
+
+def rate_limit_call_api(call_api, rate_limiter):
+    """Return a wrapper of the call_api method of a base client which sends every request through the rate limiter.
+    The retry strategies retry call_api, so every attempt of a call is rate limited. The wrapper keeps the name of
+    call_api, which the SDK checks to rewind the file bodies of the requests before retrying them."""
+
+    @functools.wraps(call_api)
+    def _call_api(*args, **kwargs):
+        return rate_limiter.call(call_api, *args, **kwargs)
+
+    _call_api.rate_limiter = rate_limiter
+    return _call_api
+
+
+def add_rate_limiter(service_client):
+    """Send the requests of the service client through the rate limiter of its endpoint (see get_rate_limiter), unless
+    they already go through a rate limiter or are not rate limited"""
+    base_client = getattr(service_client, "base_client", None)
+    call_api = getattr(base_client, "call_api", None)
+    if call_api is None or getattr(call_api, "rate_limiter", None) is not None:
+        return
+    rate_limiter = get_rate_limiter(service_client)
+    if rate_limiter is not None:
+        base_client.call_api = rate_limit_call_api(call_api, rate_limiter)
+
+
+def get_rate_limit():
+    """Return the maximum number of requests per second sent to a service endpoint, or 0 if the requests are not
+    rate limited"""
+    return float(os.environ.get(RATE_LIMIT_ENV_VAR, DEFAULT_RATE_LIMIT))
+
+
+def get_rate_limiter(service_client):
+    """Return the rate limiter shared by the service clients of the same class and endpoint. Return None if the
+    requests are not rate limited or the endpoint of the client is unknown."""
+    endpoint = getattr(getattr(service_client, "base_client", None), "endpoint", None)
+    if not endpoint:
+        return None
+    max_rate = get_rate_limit()
+    if max_rate <= 0:
+        return None
+    key = (type(service_client).__name__, endpoint)
+    with _rate_limiters_lock:
+        if key not in _rate_limiters:
+            _rate_limiters[key] = AdaptiveRateLimiter(
+                "{0} {1}".format(*key), max_rate
+            )
+        return _rate_limiters[key]
+
+
+def get_retry_strategy(fn=None):
+    """Return the retry strategy for the calls to fn. When fn is a method of a service client, the requests of the
+    client are rate limited first (see add_rate_limiter), so that every attempt of the call is rate limited."""
+    add_rate_limiter(getattr(fn, "__self__", None))
+    return _get_retry_strategy()
+
 
 def _get_retry_strategy():
+    global _retry_strategy
+    if _retry_strategy is not None:
+        return _retry_strategy
     retry_strategy_builder = RetryStrategyBuilder(
         max_attempts_check=True,
         max_attempts=3,
@@ -89,12 +348,13 @@ def _get_retry_strategy():
         },
         service_error_retry_on_any_5xx=True,
     )
-    return retry_strategy_builder.get_retry_strategy()
+    _retry_strategy = retry_strategy_builder.get_retry_strategy()
+    return _retry_strategy
 
 
 def call_with_backoff(fn, *args, **kwargs):
     if "retry_strategy" not in kwargs:
-        kwargs["retry_strategy"] = _get_retry_strategy()
+        kwargs["retry_strategy"] = get_retry_strategy(fn)
     try:
         return fn(*args, **kwargs)
     except TypeError as te:
@@ -138,6 +398,18 @@ def filter_response_data(response_data, filter_params):
     return filter_resources(response_data, filter_params)
 
 
+def list_call_get_all_results(target_fn, **kwargs):
+    """Return the response of oci.pagination.list_call_get_all_results. As in call_with_backoff, the call is made again
+    without the retry strategy if the SDK operation does not support it, as in the older SDKs."""
+    try:
+        return oci.pagination.list_call_get_all_results(target_fn, **kwargs)
+    except (TypeError, ValueError) as ex:
+        if "retry_strategy" in kwargs and "retry_strategy" in str(ex):
+            del kwargs["retry_strategy"]
+            return oci.pagination.list_call_get_all_results(target_fn, **kwargs)
+        raise
+
+
 def list_all_resources(target_fn, **kwargs):
     """
     Return all resources after paging through all results returned by target_fn. If a `display_name` or `name` is
@@ -149,8 +421,11 @@ def list_all_resources(target_fn, **kwargs):
     :raises MaximumWaitTimeExceededError: When maximum wait time is exceeded while invoking target_fn
     """
     filter_params = None
+    if "retry_strategy" not in kwargs:
+        # rate limit and retry the call of every page
+        kwargs["retry_strategy"] = get_retry_strategy(target_fn)
     try:
-        response = oci.pagination.list_call_get_all_results(target_fn, **kwargs)
+        response = list_call_get_all_results(target_fn, **kwargs)
     except ValueError as ex:
         if "unknown kwargs" in str(ex):
             if "display_name" in kwargs:
@@ -161,7 +436,7 @@ def list_all_resources(target_fn, **kwargs):
                 if kwargs["name"]:
                     filter_params = {"name": kwargs["name"]}
                 del kwargs["name"]
-        response = oci.pagination.list_call_get_all_results(target_fn, **kwargs)
+        response = list_call_get_all_results(target_fn, **kwargs)
 
     # If the underlying SDK Service list* method doesn't support filtering by name or display_name, filter the resources
     # and return the matching list of resources
@@ -214,9 +489,58 @@ def is_list_subset(source_list, target_list):
         return False
     if not (isinstance(source_list, list) and isinstance(target_list, list)):
         return False
-    if all([is_in_list(target_list, element) for element in source_list]):
-        return True
-    return False
+    # Index the target list once, instead of comparing every element of the source list with every element of the
+    # target list. Primitive elements are looked up in a set of the frozen target elements. Dict elements are looked up
+    # by their primitive attributes, and only the matching target dicts are compared with is_dict_subset to handle the
+    # nested dicts and lists and the extra keys in the target dicts.
+    target_elements = None
+    target_dicts_indexes = {}
+    for element in source_list:
+        if isinstance(element, dict):
+            attrs = _get_primitive_attrs(element)
+            if attrs not in target_dicts_indexes:
+                target_dicts_indexes[attrs] = _index_dicts(target_list, attrs)
+            candidates = target_dicts_indexes[attrs].get(
+                tuple(freeze(element[attr]) for attr in attrs), []
+            )
+            if not any(is_dict_subset(element, candidate) for candidate in candidates):
+                return False
+        elif isinstance(element, list):
+            if not is_in_list(target_list, element):
+                return False
+        else:
+            if target_elements is None:
+                target_elements = _get_frozen_elements(target_list)
+            if element not in target_elements:
+                return False
+    return True
+
+
+def _get_primitive_attrs(d):
+    return tuple(
+        sorted(
+            attr
+            for attr, value in six.iteritems(d)
+            if value is not None and not isinstance(value, (dict, list))
+        )
+    )
+
+
+def _index_dicts(list_of_dicts, attrs):
+    """Index the dicts in the list by the frozen values of the attributes"""
+    index = {}
+    for d in list_of_dicts:
+        if isinstance(d, dict) and all(attr in d for attr in attrs):
+            index.setdefault(tuple(freeze(d[attr]) for attr in attrs), []).append(d)
+    return index
+
+
+def _get_frozen_elements(l):
+    try:
+        return set(freeze(element) for element in l)
+    except TypeError:
+        # unhashable elements, fall back to comparing the elements
+        return l
 
 
 def is_in_list(l, element):
@@ -285,6 +609,14 @@ def are_lists_equal(s, t):
         # service gateway has an attribute `services` which is a list of `ServiceIdResponseDetails`. This has a key
         # `service_name` which is not provided in the list of `services` by a user while making an update call; only
         # `service_id` is provided by the user in the update call.
+        keys = _get_common_keys(s)
+        if keys is not None and all(
+            isinstance(d, dict) and all(key in d for key in keys) for d in t
+        ):
+            # Compare the multisets of the frozen dicts, ignoring the additional keys of the dicts in t.
+            return Counter(freeze(d) for d in s) == Counter(
+                freeze(dict((key, d[key]) for key in keys)) for d in t
+            )
         sorted_s = sort_list_of_dictionary(s)
         sorted_t = sort_list_of_dictionary(t)
         for index, d in enumerate(sorted_s):
@@ -292,13 +624,43 @@ def are_lists_equal(s, t):
                 return False
         return True
     else:
-        # Handle lists of primitive types.
+        # Handle lists of primitive types. Compare the multisets of the elements.
         try:
-            for elem in s:
-                t.remove(elem)
-        except ValueError:
-            return False
-        return not t
+            return Counter(freeze(elem) for elem in s) == Counter(
+                freeze(elem) for elem in t
+            )
+        except TypeError:
+            # unhashable elements
+            try:
+                for elem in s:
+                    t.remove(elem)
+            except ValueError:
+                return False
+            return not t
+
+
+def _get_common_keys(list_of_dict):
+    """Return the keys of the dicts in the list if all the dicts have the same keys, None otherwise"""
+    keys = set(list_of_dict[0])
+    for d in list_of_dict:
+        if not (isinstance(d, dict) and len(d) == len(keys) and keys.issuperset(d)):
+            return None
+    return keys
+
+
+def freeze(value):
+    """
+    Convert a value into a hashable canonical form, so that it can be compared using sets and Counters. Dicts are
+    converted to frozensets of their items and lists to frozensets of the counts of their elements, recursively. Lists
+    are compared as multisets, the same as are_lists_equal and sort_dictionary do.
+    :param value: A value made of dicts, lists and hashable primitives. For example, the dict of a resource.
+    :return: The frozen form of the value.
+    """
+    if isinstance(value, dict):
+        return dict, frozenset([(k, freeze(v)) for k, v in value.items()])
+    if isinstance(value, list):
+        return list, frozenset(Counter([freeze(v) for v in value]).items())
+    return value
 
 
 def sort_list_of_dictionary(list_of_dict):
@@ -408,6 +770,7 @@ def get_common_arg_spec(supports_create=False, supports_wait=False):
         ),
         tenancy=dict(type="str"),
         region=dict(type="str"),
+        home_region=dict(type="str"),
     )
 
     if supports_create:
@@ -503,6 +866,57 @@ def merge_dicts(*dictionaries):
     return merged_dict
 
 
+def _get_path_tree(paths):
+    """Return the dotted paths as a tree of dicts. The keys where a path ends map to None."""
+    tree = {}
+    for path in paths:
+        node = tree
+        keys = path.split(".")
+        for key in keys[:-1]:
+            if key in node and node[key] is None:
+                # a shorter path already covers this path
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[keys[-1]] = None
+    return tree
+
+
+def _include_path_tree(d, tree):
+    included = dict()
+    for key, subtree in six.iteritems(tree):
+        if key not in d:
+            continue
+        if subtree is None:
+            included[key] = d[key]
+        elif isinstance(d[key], dict):
+            included[key] = _include_path_tree(d[key], subtree)
+    return included
+
+
+def _exclude_path_tree(d, tree):
+    excluded = dict(d)
+    for key, subtree in six.iteritems(tree):
+        if key not in excluded:
+            continue
+        if subtree is None:
+            del excluded[key]
+        elif isinstance(excluded[key], dict):
+            excluded[key] = _exclude_path_tree(excluded[key], subtree)
+    return excluded
+
+
+def project_dict(d, include_paths=None, exclude_paths=None):
+    """Return a copy of the dictionary with only the keys in include_paths and without the keys in exclude_paths.
+    The paths are dotted paths to the keys of nested dictionaries, eg: metadata.user_data. All the keys are included
+    when include_paths is not set. The given dictionary is not modified."""
+    if include_paths:
+        d = _include_path_tree(d, _get_path_tree(include_paths))
+    if exclude_paths:
+        d = _exclude_path_tree(d, _get_path_tree(exclude_paths))
+    return d
+
+
 def get_default_response_from_resource(resource):
     return oci.Response(status=200, headers=None, data=resource, request=None)
 
@@ -536,3 +950,355 @@ def get_work_request_completed_states():
 
 def get_work_request_success_states():
     return WORK_REQUEST_SUCCESS_STATES
+
+
+def get_cache_dir():
+    """Return the directory of the caches shared by the modules, the inventory plugin and the inventory script"""
+    return os.path.expanduser(
+        os.path.expandvars(os.environ.get(CACHE_DIR_ENV_VAR, DEFAULT_CACHE_DIR))
+    )
+
+
+def read_json_cache(name, max_age):
+    """Return the data of the cache file with the given name in the cache directory. Return None if the cache file
+    does not exist, cannot be read or is older than max_age seconds."""
+    if not max_age:
+        return None
+    cache_file = os.path.join(get_cache_dir(), name)
+    try:
+        if os.path.getmtime(cache_file) + float(max_age) < time.time():
+            return None
+        with open(cache_file, "r") as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_json_cache(name, data):
+    """Write the data to the cache file with the given name in the cache directory. The data is written to a temporary
+    file which is then renamed, so that concurrent readers never see a partially written cache. Failures are ignored
+    as the caches are only an optimization."""
+    cache_dir = get_cache_dir()
+    temp_file = None
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+        fd, temp_file = tempfile.mkstemp(dir=cache_dir, prefix="." + name + ".")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.rename(temp_file, os.path.join(cache_dir, name))
+    except (IOError, OSError):
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+@contextmanager
+def atomic_write(path, mode="wb"):
+    """
+    Open a temporary file in the directory of path for writing, and rename it to path when the block exits without an
+    error. Readers never see a partially written file, and the existing file is left unchanged if the block fails.
+    The new file gets the permissions of the existing file, or the default permissions if path does not exist. If path
+    is a symbolic link, the file it points to is replaced.
+    :param path: The path of the file to write
+    :param mode: The mode to open the temporary file with
+    :return: A context manager which yields the temporary file object
+    """
+    path = os.path.realpath(to_bytes(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        prefix=b"." + os.path.basename(path) + b".",
+    )
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        if os.path.exists(path):
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+        os.rename(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def get_compartment_cache_max_age():
+    return int(
+        os.environ.get(
+            COMPARTMENT_CACHE_MAX_AGE_ENV_VAR, DEFAULT_COMPARTMENT_CACHE_MAX_AGE
+        )
+    )
+
+
+def get_compartment_tree_cache_name(tenancy_id):
+    return "compartments-{0}.json".format(
+        hashlib.md5(to_bytes(tenancy_id)).hexdigest()
+    )
+
+
+def _get_compartment_tree(compartments):
+    children = dict((compartment["id"], []) for compartment in compartments)
+    for compartment in compartments:
+        if compartment["compartment_id"] in children:
+            children[compartment["compartment_id"]].append(compartment["id"])
+    return dict(
+        compartments=dict(
+            (compartment["id"], compartment) for compartment in compartments
+        ),
+        children=children,
+    )
+
+
+def list_subcompartments_in_parallel(
+    identity_client,
+    compartment_id,
+    max_thread_count=MAX_COMPARTMENT_LISTING_THREADS,
+    depth=None,
+    lifecycle_state="ACTIVE",
+):
+    """Return the compartments in the hierarchy of the compartment, excluding the compartment. The compartments are
+    listed level by level and the compartments of a level are listed in parallel.
+    :param depth: If set, only the compartments up to depth levels below the compartment are listed
+    :param lifecycle_state: The lifecycle state of the compartments to return, or None to return all the compartments.
+    The compartments in the hierarchy of a compartment which is not returned are not listed.
+    """
+    subcompartments = []
+    parent_ids = [compartment_id]
+    pool = multiprocessing_pool.ThreadPool(processes=max_thread_count)
+    try:
+        while parent_ids and (depth is None or depth > 0):
+            children = [
+                child
+                for children_of_parent in pool.map(
+                    lambda parent_id: list_all_resources(
+                        identity_client.list_compartments, compartment_id=parent_id
+                    ),
+                    parent_ids,
+                )
+                for child in children_of_parent
+                if lifecycle_state is None or child.lifecycle_state == lifecycle_state
+            ]
+            subcompartments.extend(children)
+            parent_ids = [child.id for child in children]
+            if depth is not None:
+                depth -= 1
+    finally:
+        pool.close()
+        pool.join()
+    return subcompartments
+
+
+def get_compartment_tree(identity_client, tenancy_id, max_age=None):
+    """Return the tree of the ACTIVE compartments of the tenancy as a dict with the compartments (as dicts) keyed by
+    OCID and the parent to children index. The tree is built from a single listing of the compartments in the subtree
+    of the tenancy and cached on disk for max_age seconds (OCI_COMPARTMENT_CACHE_MAX_AGE or one hour by default). The
+    cache is shared with the inventory plugin and the inventory script.
+    :raises ServiceError: When the compartments of the tenancy cannot be listed
+    """
+    if max_age is None:
+        max_age = get_compartment_cache_max_age()
+    cache_name = get_compartment_tree_cache_name(tenancy_id)
+    tree = read_json_cache(cache_name, max_age)
+    if tree and tree.get("tenancy_id") == tenancy_id:
+        return tree
+
+    tenancy = call_with_backoff(
+        identity_client.get_compartment, compartment_id=tenancy_id
+    ).data
+    compartments = [tenancy] + [
+        compartment
+        for compartment in list_all_resources(
+            identity_client.list_compartments,
+            compartment_id=tenancy_id,
+            compartment_id_in_subtree=True,
+        )
+        if compartment.lifecycle_state == "ACTIVE"
+    ]
+    tree = _get_compartment_tree(to_dict(compartments))
+    tree["tenancy_id"] = tenancy_id
+    write_json_cache(cache_name, tree)
+    return tree
+
+
+def invalidate_compartment_tree(tenancy_id):
+    """Remove the cached compartment tree of the tenancy"""
+    try:
+        os.remove(
+            os.path.join(get_cache_dir(), get_compartment_tree_cache_name(tenancy_id))
+        )
+    except OSError:
+        pass
+
+
+def get_compartment_subtree(tree, compartment_id, depth=None):
+    """Return the compartment and the compartments in its hierarchy from the compartment tree, parents first. If depth
+    is set, only the compartments up to depth levels below the compartment are returned."""
+    subtree = []
+    compartment_ids = [compartment_id]
+    while compartment_ids and (depth is None or depth >= 0):
+        subtree.extend(tree["compartments"][cid] for cid in compartment_ids)
+        compartment_ids = [
+            child_id
+            for cid in compartment_ids
+            for child_id in tree["children"].get(cid, [])
+        ]
+        if depth is not None:
+            depth -= 1
+    return subtree
+
+
+def get_compartment_models(compartments):
+    """Return the Compartment models of the compartment dicts of a compartment tree. The attributes which the
+    Compartment model does not have are ignored, as the cached tree may have been written with another version of the
+    SDK."""
+    attributes = oci.identity.models.Compartment().swagger_types
+    return [
+        oci.identity.models.Compartment(
+            **dict(
+                (key, value)
+                for key, value in six.iteritems(compartment)
+                if key in attributes
+            )
+        )
+        for compartment in compartments
+    ]
+
+
+def get_region_subscriptions_cache_max_age():
+    return int(
+        os.environ.get(
+            REGION_SUBSCRIPTIONS_CACHE_MAX_AGE_ENV_VAR,
+            DEFAULT_REGION_SUBSCRIPTIONS_CACHE_MAX_AGE,
+        )
+    )
+
+
+def get_region_subscriptions_cache_name(tenancy_id):
+    return "region-subscriptions-{0}.json".format(
+        hashlib.md5(to_bytes(tenancy_id)).hexdigest()
+    )
+
+
+def get_region_subscriptions(identity_client, tenancy_id, max_age=None):
+    """Return the region subscriptions (as dicts) of the tenancy. The subscriptions are cached on disk for max_age
+    seconds (OCI_REGION_SUBSCRIPTIONS_CACHE_MAX_AGE or one hour by default), so that the home region is looked up once
+    for all the tasks of a play.
+    :raises ServiceError: When the region subscriptions cannot be listed
+    """
+    if max_age is None:
+        max_age = get_region_subscriptions_cache_max_age()
+    cache_name = get_region_subscriptions_cache_name(tenancy_id)
+    cached_region_subscriptions = read_json_cache(cache_name, max_age)
+    if (
+        cached_region_subscriptions
+        and cached_region_subscriptions.get("tenancy_id") == tenancy_id
+    ):
+        return cached_region_subscriptions["region_subscriptions"]
+
+    region_subscriptions = to_dict(
+        call_with_backoff(
+            identity_client.list_region_subscriptions, tenancy_id=tenancy_id
+        ).data
+    )
+    write_json_cache(
+        cache_name,
+        dict(tenancy_id=tenancy_id, region_subscriptions=region_subscriptions),
+    )
+    return region_subscriptions
+
+
+def get_home_region_cache_max_age():
+    return int(
+        os.environ.get(
+            HOME_REGION_CACHE_MAX_AGE_ENV_VAR, DEFAULT_HOME_REGION_CACHE_MAX_AGE
+        )
+    )
+
+
+def get_home_region_cache_name(tenancy_id):
+    return "home-region-{0}.json".format(
+        hashlib.md5(to_bytes(tenancy_id)).hexdigest()
+    )
+
+
+def get_home_region(identity_client, tenancy_id, max_age=None):
+    """Return the home region of the tenancy, or None if the region subscriptions of the tenancy have no home region.
+    The home region is cached on disk for max_age seconds (OCI_HOME_REGION_CACHE_MAX_AGE or 30 days by default).
+    :raises ServiceError: When the region subscriptions cannot be listed
+    """
+    if max_age is None:
+        max_age = get_home_region_cache_max_age()
+    cache_name = get_home_region_cache_name(tenancy_id)
+    cached_home_region = read_json_cache(cache_name, max_age)
+    if cached_home_region and cached_home_region.get("tenancy_id") == tenancy_id:
+        return cached_home_region["home_region"]
+
+    home_regions = [
+        region_subscription["region_name"]
+        for region_subscription in get_region_subscriptions(
+            identity_client, tenancy_id
+        )
+        if region_subscription["is_home_region"] is True
+    ]
+    if not home_regions:
+        return None
+    write_json_cache(
+        cache_name, dict(tenancy_id=tenancy_id, home_region=home_regions[0])
+    )
+    return home_regions[0]
+
+
+def invalidate_home_region(tenancy_id):
+    """Remove the cached home region and region subscriptions of the tenancy"""
+    for cache_name in [
+        get_home_region_cache_name(tenancy_id),
+        get_region_subscriptions_cache_name(tenancy_id),
+    ]:
+        try:
+            os.remove(os.path.join(get_cache_dir(), cache_name))
+        except OSError:
+            pass
+
+
+def invalidate_home_region_on_error(call_api, tenancy_id):
+    """Return a wrapper of the call_api method of the base client of an IdentityClient which invalidates the cached
+    home region of the tenancy when a request fails with a 404 or a redirect, as the cached home region may be stale.
+    The wrapper keeps the name of call_api, which the SDK checks to rewind the file bodies before a retry."""
+
+    @functools.wraps(call_api)
+    def _call_api(*args, **kwargs):
+        try:
+            return call_api(*args, **kwargs)
+        except ServiceError as ex:
+            if ex.status == 404 or 300 <= ex.status < 400:
+                _debug(
+                    "Request to the home region failed with status {0}. Invalidating the cached home region.",
+                    ex.status,
+                )
+                invalidate_home_region(tenancy_id)
+            raise
+
+    return _call_api
+
+
+def get_supported_kwargs(fn):
+    """Return the names of the optional kwargs supported by an operation of a service client, as documented in the
+    docstring of the operation, eg. display_name or lifecycle_state for most of the list operations. Return an empty set
+    if fn is not a documented SDK operation."""
+    fn = getattr(fn, "__func__", fn)
+    try:
+        return _supported_kwargs_cache[fn]
+    except KeyError:
+        pass
+    except TypeError:
+        # unhashable callable
+        return frozenset()
+    supported_kwargs = frozenset(
+        re.findall(
+            r":param \S+ (\w+): \(optional\)", getattr(fn, "__doc__", None) or ""
+        )
+    )
+    _supported_kwargs_cache[fn] = supported_kwargs
+    return supported_kwargs
@@ -16,8 +16,6 @@ try:
         MissingPrivateKeyPassphrase,
         ConfigFileNotFound,
     )
-    from oci.identity.identity_client import IdentityClient
-    from oci.database import DatabaseClient
 
     HAS_OCI_PY_SDK = True
 except ImportError:
@@ -26,6 +24,43 @@ except ImportError:
 agent_name = "Oracle-Ansible/"
 inventory_agent_name = "Oracle-Ansible-Inv/"
 
+# The module options and the environment variables which determine the effective configuration and the signer
+AUTH_MODULE_OPTIONS = [
+    "config_file_location",
+    "config_profile_name",
+    "api_user",
+    "api_user_fingerprint",
+    "api_user_key_file",
+    "api_user_key_pass_phrase",
+    "tenancy",
+    "region",
+    "auth_type",
+]
+AUTH_ENV_VARS = [
+    "OCI_CONFIG_FILE",
+    "OCI_CONFIG_PROFILE",
+    "OCI_USER_ID",
+    "OCI_USER_FINGERPRINT",
+    "OCI_USER_KEY_FILE",
+    "OCI_USER_KEY_PASS_PHRASE",
+    "OCI_TENANCY",
+    "OCI_REGION",
+    "OCI_ANSIBLE_AUTH_TYPE",
+]
+
+# A module usually creates more than one service client with the same parameters. The effective configurations, the
+# signers and the service clients are cached for the life of the process, keyed by the effective auth parameters, so
+# that the config file is parsed, the private key is loaded and the home region is looked up only once.
+_config_cache = {}
+_signer_cache = {}
+_service_client_cache = {}
+
+
+def _get_auth_params_key(module):
+    return tuple(module.params.get(option) for option in AUTH_MODULE_OPTIONS) + tuple(
+        os.environ.get(env_var) for env_var in AUTH_ENV_VARS
+    )
+
 
 def get_oci_config(module, service_client_class=None):
     """Return the OCI configuration to use for all OCI API calls. The effective OCI configuration is derived by merging
@@ -36,7 +71,16 @@ def get_oci_config(module, service_client_class=None):
     3. For each authentication attribute, check if an override is provided either through
         a. Ansible Module option
         b. Environment variable
-        and override the value in the config dict in that order."""
+        and override the value in the config dict in that order.
+    The effective configuration is cached for the life of the process. A copy is returned so that callers can modify
+    it."""
+    key = _get_auth_params_key(module)
+    if key not in _config_cache:
+        _config_cache[key] = _get_oci_config(module)
+    return dict(_config_cache[key])
+
+
+def _get_oci_config(module):
     config = {}
 
     config_file = module.params.get("config_file_location")
@@ -118,7 +162,9 @@ def get_oci_config(module, service_client_class=None):
 
 def set_db_test_flag(service_client):
     # This flag helps in quickly testing the Database
-    if service_client == DatabaseClient and os.environ.get("OCI_DB_MOCK") is not None:
+    if os.environ.get("OCI_DB_MOCK") is not None and oci_common_utils.is_sdk_class(
+        service_client, "oci.database.database_client", "DatabaseClient"
+    ):
         service_client.client.base_client.session.headers.update(
             {"opc-host-serial": "FakeHostSerial"}
         )
@@ -126,71 +172,103 @@ def set_db_test_flag(service_client):
 
 def create_service_client(module, service_client_class):
     """
-    Creates a service client using the common module options provided by the user.
+    Creates a service client using the common module options provided by the user. The clients are cached for the
+    life of the process, so repeated calls with the same options return the same client.
     :param module: An AnsibleModule that represents user provided options for a Task
     :param service_client_class: A class that represents a client to an OCI Service
     :return: A fully configured client
     """
-    config = get_oci_config(module, service_client_class)
-    kwargs = {}
-
-    if _is_instance_principal_auth(module):
-        kwargs["signer"] = _create_instance_principal_signer(module)
-
-    if _is_delegation_token_auth(module):
-        delegation_token_location = config.get("delegation_token_file")
-        kwargs["signer"] = _create_instance_principal_signer(
-            module, delegation_token_location
-        )
-
-    # XXX: Validate configuration -- this may be redundant, as all Client constructors perform a validation
-    try:
-        oci.config.validate_config(config, **kwargs)
-    except oci.exceptions.InvalidConfig as ic:
-        module.fail_json(
-            msg="Invalid OCI configuration. Exception: {0}".format(str(ic))
-        )
-
-    # Create service client class (optionally with signer)
-    client = service_client_class(config, **kwargs)
-
     # Redirect calls to home region for IAM service.
     do_not_redirect = module.params.get(
         "do_not_redirect_to_home_region", False
     ) or os.environ.get("OCI_IDENTITY_DO_NOT_REDIRECT_TO_HOME_REGION")
 
-    if service_client_class == IdentityClient and not do_not_redirect:
+    home_region = module.params.get("home_region") or os.environ.get(
+        "OCI_IDENTITY_HOME_REGION"
+    )
+    client_key = (
+        service_client_class,
+        _get_auth_params_key(module),
+        bool(do_not_redirect),
+        home_region,
+    )
+    if client_key in _service_client_cache:
+        return _service_client_cache[client_key]
+
+    config = get_oci_config(module, service_client_class)
+    signer = _get_signer(module, config)
+
+    # Create service client class (optionally with signer). Without a signer, the client builds its own signer from
+    # the config, as the SDK supports more kinds of configurations than the API key ones.
+    kwargs = {}
+    if signer is not None:
+        kwargs["signer"] = signer
+    client = service_client_class(config, **kwargs)
+
+    if not do_not_redirect and oci_common_utils.is_sdk_class(
+        service_client_class, "oci.identity.identity_client", "IdentityClient"
+    ):
 
         if "tenancy" in config:
             tenancy_id = config["tenancy"]
-        elif hasattr(kwargs.get("signer"), "tenancy_id"):
+        elif hasattr(signer, "tenancy_id"):
             # the instance principals signer has the tenancy ID from the certificate from the
             # local metadata service
-            tenancy_id = kwargs.get("signer").tenancy_id
+            tenancy_id = signer.tenancy_id
         else:
             module.fail_json(
                 msg="Could not identify tenancy OCID from config or local metadata service"
             )
 
-        region_subscriptions = oci_common_utils.call_with_backoff(
-            client.list_region_subscriptions, tenancy_id=tenancy_id
-        ).data
+        if not home_region:
+            home_region = oci_common_utils.get_home_region(client, tenancy_id)
+            if not home_region:
+                module.fail_json(msg="Could not identify home region for this tenancy")
+            # The home region may come from the cache. Invalidate it if the requests to the home region fail with an
+            # error suggesting it is stale.
+            call_api = oci_common_utils.invalidate_home_region_on_error(
+                client.base_client.call_api, tenancy_id
+            )
+            client.base_client.call_api = call_api
 
         # Replace the region for the client with the home region.
-        home_regions = [
-            rs.region_name for rs in region_subscriptions if rs.is_home_region is True
-        ]
-        if len(home_regions) == 0:
-            module.fail_json(msg="Could not identify home region for this tenancy")
-
-        home_region = home_regions[0]
-
         client.base_client.set_region(home_region)
         set_db_test_flag(client)
 
+    _service_client_cache[client_key] = client
     return client
 
 
+def _get_signer(module, config):
+    """Return the instance principals or delegation token signer for the effective auth parameters, or None if the
+    service clients build their own signer from the config. The configuration is validated only when the signer is
+    looked up for the first time."""
+    signer_key = _get_auth_params_key(module)
+    if signer_key in _signer_cache:
+        return _signer_cache[signer_key]
+
+    kwargs = {}
+    if _is_instance_principal_auth(module):
+        kwargs["signer"] = _create_instance_principal_signer(module)
+
+    if _is_delegation_token_auth(module):
+        delegation_token_location = config.get("delegation_token_file")
+        kwargs["signer"] = _create_instance_principal_signer(
+            module, delegation_token_location
+        )
+
+    try:
+        oci.config.validate_config(config, **kwargs)
+    except oci.exceptions.InvalidConfig as ic:
+        module.fail_json(
+            msg="Invalid OCI configuration. Exception: {0}".format(str(ic))
+        )
+
+    signer = kwargs.get("signer")
+    _signer_cache[signer_key] = signer
+    return signer
+
+
 def _create_instance_principal_signer(module, delegation_token_location=None):
     signer = None
     try:
@@ -4,8 +4,7 @@
 # Apache License v2.0
 # See LICENSE.TXT for details.
 
-from ansible.module_utils.oracle import oci_utils
-from ansible.module_utils._text import to_bytes
+from ansible.module_utils.oracle import oci_utils, oci_object_storage_utils
 
 try:
     from oci.database.models import (
@@ -152,7 +151,9 @@ def execute_function_and_wait(
 
 
 def write_stream_to_file(data, file):
-    with open(to_bytes(file), "wb") as f:
-        for d in data:
-            f.write(d)
+    """Stream the body of a response to the file in chunks, through a temporary file which replaces the file only when
+    the whole body is written"""
+    oci_object_storage_utils.write_chunks(
+        data.iter_content(oci_object_storage_utils.DOWNLOAD_CHUNK_SIZE), file
+    )
     return True
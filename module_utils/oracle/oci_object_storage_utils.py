@@ -0,0 +1,382 @@
+# Copyright (c) 2019 Oracle and/or its affiliates.
+# This software is made available to you under the terms of the GPL 3.0 license or the Apache 2.0 license.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+# Apache License v2.0
+# See LICENSE.TXT for details.
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import base64
+import hashlib
+import os
+import threading
+
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.oracle import oci_common_utils
+
+try:
+    from oci.exceptions import ServiceError
+
+    HAS_OCI_PY_SDK = True
+except ImportError:
+    HAS_OCI_PY_SDK = False
+
+# Size of the chunks the objects are downloaded and the files are hashed in
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# The default part size of the UploadManager. Files larger than this are uploaded in parts of this size.
+UPLOAD_PART_SIZE = 128 * 1024 * 1024
+# Objects larger than this are downloaded in byte ranges of this size. This is the part size of the uploads, so the
+# opc-multipart-md5 of the objects uploaded by the UploadManager can be checked with the ranges.
+DOWNLOAD_PART_SIZE = UPLOAD_PART_SIZE
+# Number of byte ranges downloaded in parallel, the default number of parts the UploadManager uploads in parallel
+DOWNLOAD_PARALLEL_COUNT = 3
+# Number of times the download of a byte range is attempted before the download fails
+DOWNLOAD_PART_ATTEMPTS = 3
+FILE_MD5_CACHE_MAX_AGE_ENV_VAR = "OCI_FILE_MD5_CACHE_MAX_AGE"
+# The cached md5 of a file is used only if the size and the modification time of the file did not change
+DEFAULT_FILE_MD5_CACHE_MAX_AGE = 30 * 24 * 3600
+
+
+def get_base64_md5(md5_hash):
+    """Return the base64 encoded digest of an md5 hash object, the format of the Content-MD5 header"""
+    return base64.b64encode(md5_hash.digest()).decode("ascii")
+
+
+def get_file_md5(path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Return the base64 encoded md5 of the content of a file, read in chunks of chunk_size bytes"""
+    md5_hash = hashlib.md5()
+    with open(to_bytes(path), "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5_hash.update(chunk)
+    return get_base64_md5(md5_hash)
+
+
+def get_multipart_md5(part_md5_hashes):
+    """
+    Return the md5 of an object uploaded in parts from the md5 hash objects of its parts, in the format of the
+    opc-multipart-md5 header: the base64 encoded md5 of the concatenated digests of the parts, followed by the number
+    of parts.
+    """
+    md5_hash = hashlib.md5()
+    for part_md5_hash in part_md5_hashes:
+        md5_hash.update(part_md5_hash.digest())
+    return "{0}-{1}".format(get_base64_md5(md5_hash), len(part_md5_hashes))
+
+
+def get_file_multipart_md5(path, part_size, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Return the md5 of the object the UploadManager uploads from the file in parts of part_size bytes, in the format of
+    the opc-multipart-md5 header. See get_multipart_md5.
+    """
+    part_md5_hashes = []
+    with open(to_bytes(path), "rb") as f:
+        while True:
+            md5_hash = hashlib.md5()
+            remaining = part_size
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                md5_hash.update(chunk)
+                remaining -= len(chunk)
+            if remaining == part_size:
+                break
+            part_md5_hashes.append(md5_hash)
+    return get_multipart_md5(part_md5_hashes)
+
+
+def get_file_md5_cache_max_age():
+    return int(
+        os.environ.get(FILE_MD5_CACHE_MAX_AGE_ENV_VAR, DEFAULT_FILE_MD5_CACHE_MAX_AGE)
+    )
+
+
+def get_file_md5_cache_name(path):
+    return "file-md5-{0}.json".format(hashlib.md5(to_bytes(path)).hexdigest())
+
+
+def get_cached_file_md5(path, part_size=None, max_age=None):
+    """
+    Return the md5 of the file, or its multipart md5 for parts of part_size bytes if part_size is set. The md5s are
+    cached on disk for max_age seconds (OCI_FILE_MD5_CACHE_MAX_AGE or 30 days by default) with the size and the
+    modification time of the file, and are computed again only when the file changed, so that large files which did
+    not change are not hashed on every run.
+    """
+    path = os.path.realpath(path)
+    if max_age is None:
+        max_age = get_file_md5_cache_max_age()
+    file_stat = os.stat(to_bytes(path))
+    key = str(part_size or 0)
+    cache_name = get_file_md5_cache_name(path)
+    cached_md5s = oci_common_utils.read_json_cache(cache_name, max_age)
+    if not (
+        cached_md5s
+        and cached_md5s.get("path") == path
+        and cached_md5s.get("size") == file_stat.st_size
+        and cached_md5s.get("mtime") == file_stat.st_mtime
+    ):
+        cached_md5s = dict(
+            path=path, size=file_stat.st_size, mtime=file_stat.st_mtime, md5s={}
+        )
+    if key not in cached_md5s["md5s"]:
+        if part_size:
+            cached_md5s["md5s"][key] = get_file_multipart_md5(path, part_size)
+        else:
+            cached_md5s["md5s"][key] = get_file_md5(path)
+        if max_age:
+            oci_common_utils.write_json_cache(cache_name, cached_md5s)
+    return cached_md5s["md5s"][key]
+
+
+def is_file_matching(path, size, md5, part_size=None):
+    """
+    Check if the content of the file is the content of an object of the given size and md5. The sizes are compared
+    first, so that the file is hashed only when it has the size of the object. The md5 is either the base64 encoded md5
+    of the content, or the multipart md5 of an object uploaded in parts, which can be checked only if the object was
+    uploaded in parts of part_size bytes, UPLOAD_PART_SIZE by default.
+    """
+    if size is not None and int(size) != os.path.getsize(to_bytes(path)):
+        return False
+    if not md5:
+        return False
+    # The multipart md5s end with the number of parts, "-" is not a base64 character
+    if "-" in md5:
+        return get_cached_file_md5(path, part_size=part_size or UPLOAD_PART_SIZE) == md5
+    return get_cached_file_md5(path) == md5
+
+
+def is_file_matching_object(path, headers, part_size=None):
+    """
+    Check if the content of the file is the content of an object, from the headers of a get or head object response of
+    the object. See is_file_matching.
+    """
+    return is_file_matching(
+        path,
+        headers.get("Content-Length"),
+        headers.get("Content-MD5") or headers.get("opc-multipart-md5"),
+        part_size,
+    )
+
+
+def get_local_files(src_dir, prefix=""):
+    """
+    Return the files in the src_dir directory tree keyed by the names of the objects they are uploaded to, the path of
+    the file relative to src_dir with / separators, prefixed with prefix. Symbolic links to directories are not
+    followed.
+    """
+    local_files = {}
+    for dirpath, dummy, filenames in os.walk(src_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if not os.path.isfile(path):
+                continue
+            relative_path = os.path.relpath(path, src_dir)
+            local_files[prefix + relative_path.replace(os.sep, "/")] = path
+    return local_files
+
+
+def write_chunks(chunks, dest, expected_md5=None):
+    """
+    Write the chunks to the dest file, hashing them as they are written. The chunks are written to a temporary file
+    which is renamed to dest only when all the chunks are written, so dest is never left partially written.
+    :param chunks: An iterable of bytes
+    :param dest: The path of the file to write
+    :param expected_md5: If set, the base64 encoded md5 the content must match. dest is left unchanged and a ValueError
+    is raised if it does not match.
+    :return: The base64 encoded md5 of the content
+    """
+    md5_hash = hashlib.md5()
+    with oci_common_utils.atomic_write(dest) as dest_file:
+        for chunk in chunks:
+            md5_hash.update(chunk)
+            dest_file.write(chunk)
+        md5 = get_base64_md5(md5_hash)
+        if expected_md5 is not None and md5 != expected_md5:
+            raise ValueError(
+                "The MD5 {0} of the downloaded content does not match the expected MD5 {1}".format(
+                    md5, expected_md5
+                )
+            )
+    return md5
+
+
+def download_object(response, dest, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Stream the body of a get object response to the dest file in chunks of chunk_size bytes, so that the memory used
+    does not depend on the size of the object. The content is verified against the Content-MD5 header when the
+    response has one.
+    :param response: The response of a get object call
+    :param dest: The path of the file to write
+    :param chunk_size: The size of the chunks in bytes
+    :return: The base64 encoded md5 of the content
+    """
+    # Write the object as stored, the md5 of the object is computed on the stored content
+    chunks = response.data.raw.stream(chunk_size, decode_content=False)
+    return write_chunks(chunks, dest, response.headers.get("Content-MD5"))
+
+
+def get_part_ranges(size, part_size):
+    """Return the inclusive (first byte, last byte) ranges which split an object of size bytes into parts"""
+    return [
+        (start, min(start + part_size, size) - 1) for start in range(0, size, part_size)
+    ]
+
+
+def _get_fd_md5(fd, chunk_size):
+    md5_hash = hashlib.md5()
+    os.lseek(fd, 0, os.SEEK_SET)
+    for chunk in iter(lambda: os.read(fd, chunk_size), b""):
+        md5_hash.update(chunk)
+    return get_base64_md5(md5_hash)
+
+
+def _write_at(fd, data, offset, lock):
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+    else:
+        # python 2 has no pwrite, the seek and the write of a part must not be interleaved with those of another part
+        with lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            while data:
+                data = data[os.write(fd, data) :]
+
+
+def download_part(
+    object_storage_client, fd, part_range, lock, chunk_size=DOWNLOAD_CHUNK_SIZE, **kwargs
+):
+    """
+    Download the byte range of an object and write it at its offset in the file. The range is downloaded again if the
+    download fails after the response was received, eg. when the connection is reset while the range is streamed. The
+    errors returned by the service are retried by the retry strategy of the request instead.
+    :param object_storage_client: An ObjectStorageClient
+    :param fd: The file descriptor of the file to write
+    :param part_range: The inclusive (first byte, last byte) range to download
+    :param lock: The lock which serializes the writes on platforms without os.pwrite
+    :param chunk_size: The size of the chunks the range is streamed in
+    :param kwargs: The arguments of get_object which identify the object
+    :return: The md5 hash object of the range
+    """
+    start, end = part_range
+    for attempt in range(1, DOWNLOAD_PART_ATTEMPTS + 1):
+        md5_hash = hashlib.md5()
+        offset = start
+        try:
+            response = oci_common_utils.call_with_backoff(
+                object_storage_client.get_object,
+                range="bytes={0}-{1}".format(start, end),
+                **kwargs
+            )
+            for chunk in response.data.raw.stream(chunk_size, decode_content=False):
+                _write_at(fd, chunk, offset, lock)
+                md5_hash.update(chunk)
+                offset += len(chunk)
+            if offset != end + 1:
+                raise IOError(
+                    "Received {0} bytes of the byte range {1}-{2}".format(
+                        offset - start, start, end
+                    )
+                )
+            return md5_hash
+        except ServiceError:
+            raise
+        except Exception as ex:
+            if attempt == DOWNLOAD_PART_ATTEMPTS:
+                raise
+            oci_common_utils._debug(
+                "Downloading the byte range {0}-{1} failed, retrying: {2}",
+                start,
+                end,
+                ex,
+            )
+
+
+def download_object_in_parts(
+    object_storage_client,
+    dest,
+    size,
+    headers,
+    part_size=None,
+    parallel_count=DOWNLOAD_PARALLEL_COUNT,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    upload_part_size=None,
+    **kwargs
+):
+    """
+    Download an object to the dest file in byte ranges of part_size bytes, parallel_count ranges at a time. The file is
+    preallocated and every range is written at its offset, so that the ranges can be written in any order. A range
+    whose download fails is downloaded again on its own. The ranges are requested with the ETag of the object as
+    if-match, so that the download fails if the object is replaced during the download.
+    The content is verified against the Content-MD5 header if the object has one, or against the opc-multipart-md5
+    header if the size of the parts the object was uploaded in is known. The ranges are then the parts of the object.
+    A multipart object with as many parts as there are ranges may still have parts of another size, so its md5 is not
+    verified when its part size is unknown.
+    :param object_storage_client: An ObjectStorageClient
+    :param dest: The path of the file to write, left unchanged if the download fails
+    :param size: The size of the object in bytes
+    :param headers: The headers of a head object response of the object
+    :param part_size: The size of the ranges in bytes, DOWNLOAD_PART_SIZE by default
+    :param parallel_count: The number of ranges downloaded in parallel
+    :param chunk_size: The size of the chunks the ranges are streamed in
+    :param upload_part_size: The size in bytes of the parts the object was uploaded in, if known. The ranges are then
+    upload_part_size bytes long.
+    :param kwargs: The arguments of get_object which identify the object
+    :return: The md5 of the content in the format of the header it was verified against, or None if the object has
+    no md5 which can be verified
+    """
+    part_ranges = get_part_ranges(
+        size, upload_part_size or part_size or DOWNLOAD_PART_SIZE
+    )
+    lock = threading.Lock()
+    if headers.get("ETag"):
+        kwargs["if_match"] = headers.get("ETag")
+
+    with oci_common_utils.atomic_write(dest) as dest_file:
+        # Preallocate the file, the ranges are written at their offsets
+        dest_file.truncate(size)
+        dest_file.flush()
+        fd = dest_file.fileno()
+        pool = oci_common_utils.multiprocessing_pool.ThreadPool(
+            processes=max(1, min(parallel_count, len(part_ranges)))
+        )
+        try:
+            part_md5_hashes = pool.map(
+                lambda part_range: download_part(
+                    object_storage_client, fd, part_range, lock, chunk_size, **kwargs
+                ),
+                part_ranges,
+            )
+        finally:
+            pool.close()
+            pool.join()
+
+        expected_md5 = headers.get("Content-MD5")
+        multipart_md5 = headers.get("opc-multipart-md5")
+        if expected_md5:
+            md5 = _get_fd_md5(fd, chunk_size)
+        elif (
+            multipart_md5
+            and upload_part_size
+            and multipart_md5.endswith("-{0}".format(len(part_ranges)))
+        ):
+            expected_md5 = multipart_md5
+            md5 = get_multipart_md5(part_md5_hashes)
+        else:
+            # The part size of a multipart object is unknown or differs from the ranges, its md5 can not be computed
+            # from the ranges
+            oci_common_utils._debug(
+                "Not verifying the downloaded content of {0}, the object has no md5 to verify the ranges against",
+                dest,
+            )
+            return None
+        if md5 != expected_md5:
+            raise ValueError(
+                "The MD5 {0} of the downloaded content does not match the expected MD5 {1}".format(
+                    md5, expected_md5
+                )
+            )
+    return md5
@@ -309,12 +309,13 @@ class OCIResourceHelperBase:
     def get_matching_resource(self):
         create_model = self.get_create_model()
         attributes_to_consider = self.get_attributes_to_consider(create_model)
+        create_model_dict = to_dict(create_model)
         for resource in self.list_resources():
             if not self._is_resource_active(resource):
                 continue
             resource_dict = to_dict(resource)
             if oci_common_utils.is_dict_subset(
-                source_dict=to_dict(create_model),
+                source_dict=create_model_dict,
                 target_dict=resource_dict,
                 attrs=attributes_to_consider,
             ):
@@ -495,6 +496,7 @@ class OCIResourceHelperBase:
         )
 
 
+# Custom helper classes looked up by get_custom_class, keyed by the class name
 custom_helper_mapping = {}
 
 
@@ -511,11 +513,8 @@ custom_helper_mapping = {}
 # will create a CreateVnicDetails instance with the relevant fields populated
 # based on 'data'
 def convert_input_data_to_model_class(data, model_class):
-    # e.g. oci.core.models.create_vnic_details.LaunchInstanceDetails -> oci.core.models
-    namespace = ".".join(model_class.__module__.split(".")[0:-1])
-
-    # e.g. 'oci.core.models' -> <module 'oci.core.models'>
-    module = sys.modules[namespace]
+    # e.g. oci.core.models.create_vnic_details.LaunchInstanceDetails -> <module 'oci.core.models'>
+    module, fields = get_model_conversion_plan(model_class)
 
     # if the type is polymoprhic, data might be a subtype of model_class
     # and thus we need to parse it as the correct subtype based on the discriminator
@@ -531,48 +530,86 @@ def convert_input_data_to_model_class(data, model_class):
         subtype_name = model_instance.get_subtype(camelized_top_level_keys)
         model_class = getattr(module, subtype_name)
         model_instance = model_class()
+        module, fields = get_model_conversion_plan(model_class)
 
-    for attr in model_instance.attribute_map:
-        if data.get(attr) is None:
+    for attr, field_type, field_model_class in fields:
+        value = data.get(attr)
+        if value is None:
             continue
 
-        value = data[attr]
+        # if data is complex, we need to convert nested values
+        if field_type == MODEL_FIELD:
+            value = convert_input_data_to_model_class(value, field_model_class)
+        elif field_type == LIST_FIELD:
+            # convert individual items in the list to complex type
+            value = [
+                convert_input_data_to_model_class(element, field_model_class)
+                for element in value
+            ]
+        elif field_type == DICT_FIELD:
+            # convert individual values in dict to complex type
+            value = dict(
+                (key, convert_input_data_to_model_class(value[key], field_model_class))
+                for key in value
+            )
+
+        setattr(model_instance, attr, value)
+    return model_instance
+
+
+MODEL_FIELD = "model"
+LIST_FIELD = "list"
+DICT_FIELD = "dict"
+
+# Conversion plans of the model classes, keyed by the model class
+_model_conversion_plans = {}
+
+
+def get_model_conversion_plan(model_class):
+    """
+    Get the conversion plan of a model class, which is parsed from the swagger types of the model class once and
+    cached.
+    :param model_class: The model class. For example, oci.core.models.LaunchInstanceDetails.
+    :return: A tuple of the module of the models and a list of (attr, field_type, field_model_class) tuples, one for
+    each attribute of the model class. field_type is MODEL_FIELD, LIST_FIELD or DICT_FIELD if the attribute is a
+    model, a list of models or a dict of models of the field_model_class, and None otherwise.
+    """
+    plan = _model_conversion_plans.get(model_class)
+    if plan is not None:
+        return plan
+
+    # e.g. oci.core.models.create_vnic_details.LaunchInstanceDetails -> oci.core.models
+    namespace = ".".join(model_class.__module__.split(".")[0:-1])
+
+    # e.g. 'oci.core.models' -> <module 'oci.core.models'>
+    module = sys.modules[namespace]
 
+    model_instance = model_class()
+    fields = []
+    for attr in model_instance.attribute_map:
+        field_type = None
+        field_model_class = None
         # e.g. LaunchInstanceDetails.swagger_types.get('create_vnic_details') -> 'CreateVnicDetails'
         swagger_type = model_instance.swagger_types.get(attr)
-        # if data is complex, we need to convert nested values
         if hasattr(module, swagger_type):
-            value = convert_input_data_to_model_class(
-                value, getattr(module, swagger_type)
-            )
+            field_type = MODEL_FIELD
+            field_model_class = getattr(module, swagger_type)
         elif swagger_type.find("list[") == 0:
-            # convert individual items in the list to complex type
             element_swagger_type = re.match(r"list\[(.*)\]", swagger_type).group(1)
             if hasattr(module, element_swagger_type):
-                converted_values = []
-                for element in value:
-                    converted_values.append(
-                        convert_input_data_to_model_class(
-                            element, getattr(module, element_swagger_type)
-                        )
-                    )
-                value = converted_values
+                field_type = LIST_FIELD
+                field_model_class = getattr(module, element_swagger_type)
         elif swagger_type.find("dict(") == 0:
-            # convert individual values in dict to complex type
             match = re.match(r"dict\(([^,]*), (.*)\)", swagger_type)
             entry_value_swagger_type = match.group(2)
-
             if hasattr(module, entry_value_swagger_type):
-                converted_values = {}
-                for key in value:
-                    converted_values[key] = convert_input_data_to_model_class(
-                        value[key], getattr(module, entry_value_swagger_type)
-                    )
+                field_type = DICT_FIELD
+                field_model_class = getattr(module, entry_value_swagger_type)
+        fields.append((attr, field_type, field_model_class))
 
-                value = converted_values
-
-        setattr(model_instance, attr, value)
-    return model_instance
+    plan = (module, fields)
+    _model_conversion_plans[model_class] = plan
+    return plan
 
 
 # Converts an argument to camel case with a lower case first character. For example
@@ -617,17 +654,67 @@ def get_custom_class_mapping(pkgs):
     return custom_class_mapping
 
 
-custom_helper_mapping = get_custom_class_mapping(
-    [resourcehelpers, facthelpers, actionhelpers]
-)
+HELPER_PACKAGES = {
+    "resourcehelpers": resourcehelpers,
+    "facthelpers": facthelpers,
+    "actionhelpers": actionhelpers,
+}
+
+# Index of the custom helper classes, mapping the class names to the (package, module) which defines them, so that
+# get_custom_class imports only the module of the class it looks up. Helper modules which are not in the index are
+# searched when a class is not found in the index.
+CUSTOM_CLASS_INDEX = {
+    "ApiKeyHelperCustom": ("resourcehelpers", "oci_api_key_helper"),
+    "ConfigurationHelperCustom": ("resourcehelpers", "oci_audit_configuration_helper"),
+    "AutoScalingConfigurationHelperCustom": (
+        "resourcehelpers",
+        "oci_auto_scaling_configuration_helper",
+    ),
+    "AutonomousDataWarehouseHelperCustom": (
+        "resourcehelpers",
+        "oci_autonomous_data_warehouse_helper",
+    ),
+    "ObjectLifecyclePolicyHelperCustom": (
+        "resourcehelpers",
+        "oci_object_lifecycle_policy_helper",
+    ),
+    "WaasPolicyHelperCustom": ("resourcehelpers", "oci_waas_policy_helper"),
+    "BucketActionsHelperCustom": (
+        "actionhelpers",
+        "oci_object_storage_bucket_actions_helper",
+    ),
+    "SecurityRuleActionsHelperCustom": (
+        "actionhelpers",
+        "oci_security_rule_actions_helper",
+    ),
+}
 
 
 class DefaultHelperCustom:
     pass
 
 
+def _find_custom_class(resource_type):
+    if resource_type in CUSTOM_CLASS_INDEX:
+        pkg_name, module_name = CUSTOM_CLASS_INDEX[resource_type]
+        module = import_module(HELPER_PACKAGES[pkg_name], module_name)
+        return getattr(module, resource_type, None)
+    # Search the helper modules which are not in the index
+    indexed_modules = set(CUSTOM_CLASS_INDEX.values())
+    for pkg_name, pkg in six.iteritems(HELPER_PACKAGES):
+        for dummy, module_name, ispkg in pkgutil.iter_modules(pkg.__path__):
+            if ispkg or (pkg_name, module_name) in indexed_modules:
+                continue
+            custom_class = getattr(import_module(pkg, module_name), resource_type, None)
+            if inspect.isclass(custom_class):
+                return custom_class
+    return None
+
+
 def get_custom_class(resource_type):
-    custom_class = custom_helper_mapping.get(resource_type)
+    if resource_type not in custom_helper_mapping:
+        custom_helper_mapping[resource_type] = _find_custom_class(resource_type)
+    custom_class = custom_helper_mapping[resource_type]
     if not custom_class:
         return DefaultHelperCustom
     return custom_class
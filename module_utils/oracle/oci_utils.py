@@ -6,7 +6,6 @@
 from __future__ import absolute_import
 
 import logging
-import logging.config
 import os
 import tempfile
 from datetime import datetime
@@ -16,12 +15,8 @@ import time
 from ansible.module_utils import six
 
 try:
-    import yaml
-
     import oci
     from oci.exceptions import ServiceError, MaximumWaitTimeExceeded
-    from oci.identity.identity_client import IdentityClient
-    from oci.retry import RetryStrategyBuilder
     from oci.util import to_dict, Sentinel
 
     HAS_OCI_PY_SDK = True
@@ -32,6 +27,8 @@ except ImportError:
 from ansible.module_utils.basic import _load_params
 from ansible.module_utils._text import to_bytes
 
+from ansible.module_utils.oracle import oci_common_utils
+
 # Moved the __version__ to oci_common_utils. But import here as it is used in some places.
 from ansible.module_utils.oracle.oci_common_utils import __version__  # noqa: F401
 
@@ -40,6 +37,10 @@ from ansible.module_utils.oracle.oci_config_utils import (
     create_service_client,
 )
 
+# Only used when a logging config file is present
+yaml = oci_common_utils.LazyModule("yaml")
+logging_config = oci_common_utils.LazyModule("logging.config")
+
 MAX_WAIT_TIMEOUT_IN_SECONDS = 2000
 
 # If a resource is in one of these states it would be considered inactive
@@ -55,6 +56,17 @@ DEAD_STATES = [
     "DETACHED",
 ]
 
+# Attributes whose string values are used to narrow down the existing resources before a full comparison with the user
+# inputs. See _get_candidate_resources.
+MATCH_FILTER_ATTRIBUTES = [
+    "display_name",
+    "name",
+    "availability_domain",
+    "shape",
+    "cidr_block",
+    "lifecycle_state",
+]
+
 # If a resource is in one of these states it would be considered available
 DEFAULT_READY_STATES = [
     "AVAILABLE",
@@ -102,6 +114,7 @@ def get_common_arg_spec(supports_create=False, supports_wait=False):
         ),
         tenancy=dict(type="str"),
         region=dict(type="str"),
+        home_region=dict(type="str"),
     )
 
     if supports_create:
@@ -195,8 +208,11 @@ def list_all_resources(target_fn, **kwargs):
     :raises MaximumWaitTimeExceededError: When maximum wait time is exceeded while invoking target_fn
     """
     filter_params = None
+    if "retry_strategy" not in kwargs:
+        # rate limit and retry the call of every page
+        kwargs["retry_strategy"] = oci_common_utils.get_retry_strategy(target_fn)
     try:
-        response = oci.pagination.list_call_get_all_results(target_fn, **kwargs)
+        response = oci_common_utils.list_call_get_all_results(target_fn, **kwargs)
     except ValueError as ex:
         if "unknown kwargs" in str(ex):
             if "display_name" in kwargs:
@@ -207,20 +223,29 @@ def list_all_resources(target_fn, **kwargs):
                 if kwargs["name"]:
                     filter_params = {"name": kwargs["name"]}
                 del kwargs["name"]
-        response = oci.pagination.list_call_get_all_results(target_fn, **kwargs)
+        response = oci_common_utils.list_call_get_all_results(target_fn, **kwargs)
 
     # If the underlying SDK Service list* method doesn't support filtering by name or display_name, filter the resources
     # and return the matching list of resources
     return filter_response_data(response.data, filter_params)
 
 
-def _debug(s):
-    get_logger("oci_utils").debug(s)
+def _debug(s, *args):
+    """Log a debug message. The message is formatted with args only when debug logging is enabled. Use
+    oci_common_utils.lazy for the args which are expensive to compute."""
+    oci_common_utils.log_debug(get_logger("oci_utils"), s, *args)
+
+
+_logging_configured = False
 
 
 def get_logger(module_name):
-    oci_logging = setup_logging()
-    return oci_logging.getLogger(module_name)
+    # Configure logging once per process. setup_logging reads the logging config file.
+    global _logging_configured
+    if not _logging_configured:
+        setup_logging()
+        _logging_configured = True
+    return logging.getLogger(module_name)
 
 
 def setup_logging(
@@ -247,7 +272,7 @@ def setup_logging(
                 ]["filename"].format(
                     path=log_path, date=datetime.today().strftime("%d-%m-%Y")
                 )
-        logging.config.dictConfig(config)
+        logging_config.dictConfig(config)
     else:
         log_level_str = os.getenv(env_log_level, default_level)
         log_level = logging.getLevelName(log_level_str)
@@ -403,37 +428,7 @@ def is_dictionary_subset(sub, super_dict):
 
 
 def are_lists_equal(s, t):
-    if s is None and t is None:
-        return True
-
-    if (s is None and len(t) >= 0) or (t is None and len(s) >= 0) or (len(s) != len(t)):
-        return False
-
-    if len(s) == 0:
-        return True
-
-    s = to_dict(s)
-    t = to_dict(t)
-
-    if type(s[0]) == dict:
-        # Handle list of dicts. Dictionary returned by the API may have additional keys. For example, a get call on
-        # service gateway has an attribute `services` which is a list of `ServiceIdResponseDetails`. This has a key
-        # `service_name` which is not provided in the list of `services` by a user while making an update call; only
-        # `service_id` is provided by the user in the update call.
-        sorted_s = sort_list_of_dictionary(s)
-        sorted_t = sort_list_of_dictionary(t)
-        for index, d in enumerate(sorted_s):
-            if not is_dictionary_subset(d, sorted_t[index]):
-                return False
-        return True
-    else:
-        # Handle lists of primitive types.
-        try:
-            for elem in s:
-                t.remove(elem)
-        except ValueError:
-            return False
-        return not t
+    return oci_common_utils.are_lists_equal(s, t)
 
 
 def get_attr_to_update(
@@ -502,14 +497,14 @@ def add_tags_to_model_class(model, freeform_tags, defined_tags):
     """
     try:
         if freeform_tags is not None:
-            _debug("Model {0} set freeform tags to {1}".format(model, freeform_tags))
+            _debug("Model {0} set freeform tags to {1}", model, freeform_tags)
             model.__setattr__("freeform_tags", freeform_tags)
 
         if defined_tags is not None:
-            _debug("Model {0} set defined tags to {1}".format(model, defined_tags))
+            _debug("Model {0} set defined tags to {1}", model, defined_tags)
             model.__setattr__("defined_tags", defined_tags)
     except AttributeError as ae:
-        _debug("Model {0} doesn't support tags. Error {1}".format(model, ae))
+        _debug("Model {0} doesn't support tags. Error {1}", model, ae)
 
     return model
 
@@ -560,7 +555,7 @@ def check_and_create_resource(
     """
 
     if module.params.get("force_create", None):
-        _debug("Force creating {0}".format(resource_type))
+        _debug("Force creating {0}", resource_type)
         result = call_with_backoff(create_fn, **kwargs_create)
         return result
 
@@ -570,8 +565,22 @@ def check_and_create_resource(
         exclude_attributes = {}
     if default_attribute_values is None:
         default_attribute_values = {}
+    attributes_to_consider = _get_attributes_to_consider(
+        exclude_attributes,
+        model,
+        module,
+        exclude_attributes_even_when_user_provides_value=exclude_attributes_even_when_user_provides_value,
+    )
+    match_filters = _get_match_filters(
+        module, attributes_to_consider, create_model_attr_to_get_model_mapping
+    )
     try:
         if existing_resources is None:
+            # Let the service filter the resources which cannot match on the attributes the list operation supports.
+            # The resources are still compared with the user inputs below.
+            kwargs_list = dict(
+                _get_list_filter_kwargs(list_fn, match_filters), **kwargs_list
+            )
             if supports_sort_by_time_created:
                 kwargs_list["sort_by"] = "TIMECREATED"
             existing_resources = list_all_resources(list_fn, **kwargs_list)
@@ -602,40 +611,41 @@ def check_and_create_resource(
 
     result = dict()
 
-    attributes_to_consider = _get_attributes_to_consider(
-        exclude_attributes,
-        model,
-        module,
-        exclude_attributes_even_when_user_provides_value=exclude_attributes_even_when_user_provides_value,
-    )
     if "defined_tags" not in default_attribute_values:
         default_attribute_values["defined_tags"] = {}
     resource_matched = None
     _debug(
-        "Trying to find a match within {0} existing resources".format(
-            len(existing_resources)
-        )
+        "Trying to find a match within {0} existing resources",
+        len(existing_resources),
+    )
+    candidate_resources = _get_candidate_resources(existing_resources, match_filters)
+    _debug(
+        "{0} existing resources are candidates for a match",
+        len(candidate_resources),
     )
 
-    for resource in existing_resources:
+    for resource in candidate_resources:
         if _is_resource_active(resource, dead_states):
+            resource_dict = to_dict(resource)
             _debug(
                 "Comparing user specified values {0} against an existing resource's "
-                "values {1}".format(module.params, to_dict(resource))
+                "values {1}",
+                module.params,
+                resource_dict,
             )
             if does_existing_resource_match_user_inputs(
-                to_dict(resource),
+                resource_dict,
                 module,
                 attributes_to_consider,
                 exclude_attributes,
                 default_attribute_values,
                 create_model_attr_to_get_model_mapping=create_model_attr_to_get_model_mapping,
             ):
-                resource_matched = to_dict(resource)
+                resource_matched = resource_dict
                 break
 
     if resource_matched:
-        _debug("Resource with same attributes found: {0}.".format(resource_matched))
+        _debug("Resource with same attributes found: {0}.", resource_matched)
         result[resource_type] = resource_matched
         result["changed"] = False
     else:
@@ -645,6 +655,75 @@ def check_and_create_resource(
     return result
 
 
+def _get_match_filters(
+    module, attributes_to_consider, create_model_attr_to_get_model_mapping=None
+):
+    """
+    Return the (get model attribute, value) pairs which an existing resource must have to match the user inputs. These
+    are the MATCH_FILTER_ATTRIBUTES for which the user provided a string. does_existing_resource_match_user_inputs
+    reports a mismatch for a resource whose value of such an attribute is a different string or None.
+    :param module: An instance of AnsibleModule that contains user's desires around a resource's state
+    :param attributes_to_consider: A list of attributes that needs to be matched
+    :param create_model_attr_to_get_model_mapping: Mapping between attribute names in create and get model.
+    :return: List of (attribute name, value) tuples
+    """
+    match_filters = []
+    for attr in MATCH_FILTER_ATTRIBUTES:
+        if attr not in attributes_to_consider:
+            continue
+        user_provided_value_for_attr = _get_user_provided_value(module, attr)
+        if isinstance(user_provided_value_for_attr, six.string_types):
+            get_model_attr = (create_model_attr_to_get_model_mapping or {}).get(
+                attr
+            ) or attr
+            match_filters.append((get_model_attr, user_provided_value_for_attr))
+    return match_filters
+
+
+def _get_list_filter_kwargs(list_fn, match_filters):
+    """Return the kwargs of the match filters which the list operation supports"""
+    supported_kwargs = oci_common_utils.get_supported_kwargs(list_fn)
+    return dict(
+        (get_model_attr, value)
+        for get_model_attr, value in match_filters
+        if get_model_attr in supported_kwargs
+    )
+
+
+def _get_candidate_resources(existing_resources, match_filters):
+    """
+    Return the existing resources which can match the user inputs, in the same order. A resource is left out when its
+    value of one of the match filter attributes (see _get_match_filters) is a different string or None, so the
+    expensive conversion to dict and the full comparison are only done for the remaining resources.
+    :param existing_resources: The existing resources, as models
+    :param match_filters: The (attribute name, value) pairs returned by _get_match_filters
+    :return: List of the candidate resources
+    """
+    if not match_filters:
+        return existing_resources
+    return [
+        resource
+        for resource in existing_resources
+        if all(
+            _can_attr_match(resource, get_model_attr, value)
+            for get_model_attr, value in match_filters
+        )
+    ]
+
+
+def _can_attr_match(resource, get_model_attr, user_provided_value_for_attr):
+    if get_model_attr not in getattr(resource, "attribute_map", {}):
+        # the attribute is not compared when it is not in the get model of the resource
+        return True
+    resources_value_for_attr = getattr(resource, get_model_attr)
+    if resources_value_for_attr is None:
+        return False
+    if not isinstance(resources_value_for_attr, six.string_types):
+        # leave the comparison of other types to does_existing_resource_match_user_inputs
+        return True
+    return resources_value_for_attr == user_provided_value_for_attr
+
+
 def _get_attributes_to_consider(
     exclude_attributes,
     model,
@@ -675,7 +754,7 @@ def _get_attributes_to_consider(
             for exclude_attr in exclude_attributes_even_when_user_provides_value:
                 if exclude_attr in attributes_to_consider:
                     attributes_to_consider.remove(exclude_attr)
-    _debug("attributes to consider: {0}".format(attributes_to_consider))
+    _debug("attributes to consider: {0}", attributes_to_consider)
     return attributes_to_consider
 
 
@@ -751,7 +830,7 @@ def create_resource(resource_type, create_fn, kwargs_create, module):
     result = dict(changed=False)
     try:
         resource = to_dict(call_with_backoff(create_fn, **kwargs_create).data)
-        _debug("Created {0}, {1}".format(resource_type, resource))
+        _debug("Created {0}, {1}", resource_type, resource)
         result["changed"] = True
         result[resource_type] = resource
         return result
@@ -806,9 +885,10 @@ def does_existing_resource_match_user_inputs(
                 if not res[0]:
                     _debug(
                         "Mismatch on attribute '{0}'. User provided value is {1} & existing resource's value"
-                        "is {2}.".format(
-                            attr, user_provided_value_for_attr, resources_value_for_attr
-                        )
+                        "is {2}.",
+                        attr,
+                        user_provided_value_for_attr,
+                        resources_value_for_attr,
                     )
                     return False
             else:
@@ -831,11 +911,10 @@ def does_existing_resource_match_user_inputs(
                         if existing_resource[attr] != default_attribute_value:
                             _debug(
                                 "Mismatch on attribute '{0}'. User provided value is {1} & existing resource's value "
-                                "is {2}.".format(
-                                    attr,
-                                    user_provided_value_for_attr,
-                                    resources_value_for_attr,
-                                )
+                                "is {2}.",
+                                attr,
+                                user_provided_value_for_attr,
+                                resources_value_for_attr,
                             )
                             return False
                     # Check if attr has a value that is not default. For example, a custom `security_list_id`
@@ -846,21 +925,20 @@ def does_existing_resource_match_user_inputs(
                     ):
                         _debug(
                             "Mismatch on attribute '{0}'. User provided value is {1} & existing resource's value "
-                            "is {2}. Default attribute value was: {3}".format(
-                                attr,
-                                user_provided_value_for_attr,
-                                resources_value_for_attr,
-                                default_attribute_values.get(attr, None),
-                            )
+                            "is {2}. Default attribute value was: {3}",
+                            attr,
+                            user_provided_value_for_attr,
+                            resources_value_for_attr,
+                            default_attribute_values.get(attr, None),
                         )
                         return False
 
         else:
             _debug(
                 "Attribute {0} is in the create model of resource {1}"
-                "but doesn't exist in the get model of the resource".format(
-                    attr, existing_resource.__class__
-                )
+                "but doesn't exist in the get model of the resource",
+                attr,
+                existing_resource.__class__,
             )
     return True
 
@@ -1096,12 +1174,11 @@ def are_dicts_equal(
             if existing_resource_dict[sub_attr] != user_provided_dict[sub_attr]:
                 _debug(
                     "Failed to match: Existing resource's attr {0} sub-attr {1} value is {2}, while user "
-                    "provided value is {3}".format(
-                        option_name,
-                        sub_attr,
-                        existing_resource_dict[sub_attr],
-                        user_provided_dict.get(sub_attr, None),
-                    )
+                    "provided value is {3}",
+                    option_name,
+                    sub_attr,
+                    existing_resource_dict[sub_attr],
+                    user_provided_dict.get(sub_attr, None),
                 )
                 return False
 
@@ -1126,9 +1203,10 @@ def are_dicts_equal(
                         "Consider as match: Existing resource's attr {0} sub-attr {1} value is {2}, while user did"
                         "not provide a value for it. The module author also has not provided a default value for it"
                         "or marked it for exclusion. So ignoring this attribute during matching and continuing with"
-                        "other checks".format(
-                            option_name, sub_attr, existing_resource_dict[sub_attr]
-                        )
+                        "other checks",
+                        option_name,
+                        sub_attr,
+                        existing_resource_dict[sub_attr],
                     )
 
     return True
@@ -1225,7 +1303,7 @@ def create_and_wait_on_work_request(
         result["changed"] = True
         result[resource_type] = to_dict(response.data)
         work_request_id = get_work_request_id_fn(response)
-        _debug("Work request id: {0}".format(work_request_id))
+        _debug("Work request id: {0}", work_request_id)
         result[resource_type] = wait_for_work_request(
             client,
             module,
@@ -1432,9 +1510,8 @@ def wait_for_resource_lifecycle_state(
             time.sleep(15)
         if kwargs_get:
             _debug(
-                "Waiting for resource to reach READY state. get_args: {0}".format(
-                    kwargs_get
-                )
+                "Waiting for resource to reach READY state. get_args: {0}",
+                kwargs_get,
             )
             if get_param:
                 kwargs_get[get_param] = resource["id"]
@@ -1442,9 +1519,8 @@ def wait_for_resource_lifecycle_state(
             response_get = call_with_backoff(get_fn, **kwargs_get)
         else:
             _debug(
-                "Waiting for resource with id {0} to reach READY state.".format(
-                    resource["id"]
-                )
+                "Waiting for resource with id {0} to reach READY state.",
+                resource["id"],
             )
             response_get = call_with_backoff(get_fn, **{get_param: resource["id"]})
         if states is None:
@@ -1466,9 +1542,8 @@ def wait_on_work_request(client, response, module):
     try:
         if module.params.get("wait", None):
             _debug(
-                "Waiting for work request with id {0} to reach SUCCEEDED state.".format(
-                    response.data.id
-                )
+                "Waiting for work request with id {0} to reach SUCCEEDED state.",
+                response.data.id,
             )
             wait_response = oci.wait_until(
                 client,
@@ -1480,9 +1555,8 @@ def wait_on_work_request(client, response, module):
             )
         else:
             _debug(
-                "Waiting for work request with id {0} to reach ACCEPTED state.".format(
-                    response.data.id
-                )
+                "Waiting for work request with id {0} to reach ACCEPTED state.",
+                response.data.id,
             )
             wait_response = oci.wait_until(
                 client,
@@ -1493,10 +1567,10 @@ def wait_on_work_request(client, response, module):
                 ),
             )
     except MaximumWaitTimeExceeded as ex:
-        _debug(str(ex))
+        _debug("{0}", ex)
         module.fail_json(msg=str(ex))
     except ServiceError as ex:
-        _debug(str(ex))
+        _debug("{0}", ex)
         module.fail_json(msg=str(ex))
     return wait_response.data
 
@@ -1556,7 +1630,7 @@ def delete_and_wait(
                     result["changed"] = True
                     resource = to_dict(call_with_backoff(get_fn, **kwargs_get).data)
                 else:
-                    _debug("Deleted {0}, {1}".format(resource_type, resource))
+                    _debug("Deleted {0}, {1}", resource_type, resource)
                     result["changed"] = True
 
                     if wait_applicable and module.params.get("wait", None):
@@ -1599,9 +1673,9 @@ def delete_and_wait(
             result[resource_type] = resource
         else:
             _debug(
-                "Resource {0} with {1} already deleted. So returning changed=False".format(
-                    resource_type, kwargs_get
-                )
+                "Resource {0} with {1} already deleted. So returning changed=False",
+                resource_type,
+                kwargs_get,
             )
     except ServiceError as ex:
         # DNS API throws a 400 InvalidParameter when a zone id is provided for zone_name_or_id and if the zone
@@ -1609,9 +1683,9 @@ def delete_and_wait(
         if type(client) == oci.dns.DnsClient:
             if ex.status == 400 and ex.code == "InvalidParameter":
                 _debug(
-                    "Resource {0} with {1} already deleted. So returning changed=False".format(
-                        resource_type, kwargs_get
-                    )
+                    "Resource {0} with {1} already deleted. So returning changed=False",
+                    resource_type,
+                    kwargs_get,
                 )
         elif ex.status != 404:
             module.fail_json(msg=ex.message)
@@ -1636,12 +1710,11 @@ def are_attrs_equal(current_resource, module, attributes):
         if user_provided_value is not None:
             if curr_value != user_provided_value:
                 _debug(
-                    "are_attrs_equal - current resource's attribute "
-                    + attr
-                    + " value is "
-                    + str(curr_value)
-                    + " and this doesn't match user provided value of "
-                    + str(user_provided_value)
+                    "are_attrs_equal - current resource's attribute {0} value is {1} and this doesn't match user "
+                    "provided value of {2}",
+                    attr,
+                    curr_value,
+                    user_provided_value,
                 )
                 return False
     return True
@@ -1683,36 +1756,18 @@ def update_model_with_user_options(curr_model, update_model, module):
                 # Only update if a user has specified a value for an option
                 _debug(
                     "User requested {0} for attribute {1}, whereas the current value is {2}. So adding it "
-                    "to the update model".format(
-                        user_provided_value, attr, curr_value_for_attr
-                    )
+                    "to the update model",
+                    user_provided_value,
+                    attr,
+                    curr_value_for_attr,
                 )
                 setattr(update_model, attr, user_provided_value)
     return update_model
 
 
-def _get_retry_strategy():
-    retry_strategy_builder = RetryStrategyBuilder(
-        max_attempts_check=True,
-        max_attempts=3,
-        retry_max_wait_between_calls_seconds=60,
-        retry_base_sleep_time_seconds=10,
-        backoff_type=oci.retry.BACKOFF_FULL_JITTER_EQUAL_ON_THROTTLE_VALUE,
-    )
-    retry_strategy_builder.add_service_error_check(
-        service_error_retry_config={
-            429: [],
-            400: ["QuotaExceeded", "LimitExceeded"],
-            409: ["Conflict"],
-        },
-        service_error_retry_on_any_5xx=True,
-    )
-    return retry_strategy_builder.get_retry_strategy()
-
-
 def call_with_backoff(fn, **kwargs):
     if "retry_strategy" not in kwargs:
-        kwargs["retry_strategy"] = _get_retry_strategy()
+        kwargs["retry_strategy"] = oci_common_utils.get_retry_strategy(fn)
     try:
         return fn(**kwargs)
     except TypeError as te:
@@ -1725,24 +1780,32 @@ def call_with_backoff(fn, **kwargs):
             raise
 
 
+def _get_hashable_value(value):
+    """
+    Convert a value into a hashable structure which compares equal for equal values. Lists are converted to tuples,
+    dicts to frozensets of their items and model objects to tuples of their field values.
+    :param value: Value to convert
+    :return: A hashable representation of the value
+    """
+    if isinstance(value, list):
+        return tuple(_get_hashable_value(item) for item in value)
+    if isinstance(value, dict):
+        return frozenset((k, _get_hashable_value(v)) for k, v in six.iteritems(value))
+    if hasattr(value, "attribute_map"):
+        return tuple(
+            _get_hashable_value(getattr(value, field)) for field in value.attribute_map
+        )
+    return value
+
+
 def generic_hash(obj):
     """
-    Compute a hash of all the fields in the object
+    Compute a hash of all the fields in the object. The hash is computed from the structure of the field values, so
+    that objects with the same values in different fields or in a different order do not collide.
     :param obj: Object whose hash needs to be computed
     :return: a hash value for the object
     """
-    sum = 0
-    for field in obj.attribute_map.keys():
-        field_value = getattr(obj, field)
-        if isinstance(field_value, list):
-            for value in field_value:
-                sum = sum + hash(value)
-        elif isinstance(field_value, dict):
-            for k, v in field_value.items():
-                sum = sum + hash(hash(k) + hash(":") + hash(v))
-        else:
-            sum = sum + hash(getattr(obj, field))
-    return sum
+    return hash(_get_hashable_value(obj))
 
 
 def generic_eq(s, other):
@@ -1751,18 +1814,25 @@ def generic_eq(s, other):
     return s.__dict__ == other.__dict__
 
 
+# Hashable subclasses generated by generate_subclass, keyed by the parent class
+_hashed_subclasses = {}
+
+
 def generate_subclass(parent_class):
-    """Make a class hash-able by generating a subclass with a __hash__ method that returns the sum of all fields within
-    the parent class"""
-    dict_of_method_in_subclass = {
-        "__init__": parent_class.__init__,
-        "__hash__": generic_hash,
-        "__eq__": generic_eq,
-    }
-    subclass_name = "GeneratedSub" + parent_class.__name__
-    generated_sub_class = type(
-        subclass_name, (parent_class,), dict_of_method_in_subclass
-    )
+    """Make a class hash-able by generating a subclass with a __hash__ method that returns a hash of all fields within
+    the parent class. The subclass is generated once per parent class."""
+    generated_sub_class = _hashed_subclasses.get(parent_class)
+    if generated_sub_class is None:
+        dict_of_method_in_subclass = {
+            "__init__": parent_class.__init__,
+            "__hash__": generic_hash,
+            "__eq__": generic_eq,
+        }
+        subclass_name = "GeneratedSub" + parent_class.__name__
+        generated_sub_class = type(
+            subclass_name, (parent_class,), dict_of_method_in_subclass
+        )
+        _hashed_subclasses[parent_class] = generated_sub_class
     return generated_sub_class
 
 
@@ -1882,7 +1952,7 @@ def get_attached_instances_info(
     module, lookup_attached_instance, list_attachments_fn, list_attachments_args
 ):
     config = get_oci_config(module)
-    identity_client = create_service_client(module, IdentityClient)
+    identity_client = create_service_client(module, oci.identity.IdentityClient)
 
     volume_attachments = []
 
@@ -1958,7 +2028,7 @@ def get_component_list_difference(
         if existing_components is None:
             return None, False
         component_differences = set(existing_components).intersection(
-            set(input_component_list)
+            input_component_list
         )
         if component_differences:
             return list(set(existing_components) - component_differences), True
@@ -1966,24 +2036,20 @@ def get_component_list_difference(
             return None, False
     if existing_components is None:
         return input_component_list, True
+    input_components_set = set(input_component_list)
+    existing_components_set = set(existing_components)
     if purge_components:
-        components_differences = set(input_component_list).symmetric_difference(
-            set(existing_components)
-        )
-
-        if components_differences:
+        if input_components_set != existing_components_set:
             return input_component_list, True
 
-    components_differences = set(input_component_list).difference(
-        set(existing_components)
-    )
+    components_differences = input_components_set - existing_components_set
     if components_differences:
         return list(components_differences) + existing_components, True
     return None, False
 
 
 def write_to_file(path, content):
-    with open(to_bytes(path), "wb") as dest_file:
+    with oci_common_utils.atomic_write(path) as dest_file:
         dest_file.write(content)
 
 
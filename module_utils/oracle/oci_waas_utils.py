@@ -7,7 +7,7 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-from ansible.module_utils.oracle import oci_utils
+from ansible.module_utils.oracle import oci_common_utils, oci_utils
 
 try:
     from oci.util import to_dict
@@ -554,7 +554,10 @@ def get_waas_policy_id_from_work_request_response(
 ):
     if not work_request_response:
         return None
-    logger.debug("Work request response: %s", to_dict(work_request_response.data))
+    logger.debug(
+        "Work request response: %s",
+        oci_common_utils.lazy(to_dict, work_request_response.data),
+    )
     for work_request_resource in work_request_response.data.resources:
         if (
             work_request_resource.entity_type == entity_type
@@ -4,10 +4,14 @@
 # Apache License v2.0
 # See LICENSE.TXT for details.
 
-from ansible.module_utils.oracle.resourcehelpers import (
-    oci_api_key_helper,
-    oci_waas_policy_helper,
-    oci_object_lifecycle_policy_helper,
-    oci_audit_configuration_helper,
-    oci_auto_scaling_configuration_helper,
-)
+# The helper modules are imported on demand by oci_resource_utils.get_custom_class. The imports below are never
+# executed, they only make Ansible ship the helper modules with the modules which use this package.
+if False:  # pragma: no cover
+    from ansible.module_utils.oracle.resourcehelpers import (  # noqa: F401
+        oci_api_key_helper,
+        oci_waas_policy_helper,
+        oci_object_lifecycle_policy_helper,
+        oci_audit_configuration_helper,
+        oci_auto_scaling_configuration_helper,
+        oci_autonomous_data_warehouse_helper,
+    )
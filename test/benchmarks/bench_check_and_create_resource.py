@@ -0,0 +1,99 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Micro-benchmark of the idempotency check of oci_utils.check_and_create_resource.
+
+Compares the full comparison of every existing resource (no match filter attributes) with the comparison of the
+candidates left after filtering on the match filter attributes, when no existing resource matches.
+
+    $ python test/benchmarks/bench_check_and_create_resource.py
+"""
+
+from __future__ import print_function
+
+import timeit
+
+from ansible.module_utils.oracle import oci_utils
+from oci.core.models import CreateVolumeDetails, Volume
+
+
+class FakeModule(object):
+    def __init__(self, **kwargs):
+        self.params = kwargs
+        self.aliases = {}
+        self.argument_spec = {}
+
+    def fail_json(self, **kwargs):
+        raise Exception(kwargs["msg"])
+
+
+def get_volumes(num_volumes):
+    return [
+        Volume(
+            id="ocid1.volume.oc1..{0}".format(i),
+            compartment_id="ocid1.compartment.oc1..xxx",
+            availability_domain="AD-{0}".format(i % 3 + 1),
+            display_name="volume{0}".format(i),
+            size_in_gbs=50,
+            lifecycle_state="AVAILABLE",
+            defined_tags={},
+            freeform_tags={"env": "prod"},
+            is_hydrated=True,
+            time_created="2019-01-01T00:00:00.000Z",
+        )
+        for i in range(num_volumes)
+    ]
+
+
+def check_and_create_volume(volumes):
+    module = FakeModule(
+        compartment_id="ocid1.compartment.oc1..xxx",
+        availability_domain="AD-1",
+        display_name="new_volume",
+        size_in_gbs=50,
+    )
+    return oci_utils.check_and_create_resource(
+        resource_type="volume",
+        create_fn=lambda **kwargs: {"volume": None, "changed": True},
+        kwargs_create={},
+        list_fn=None,
+        kwargs_list={},
+        module=module,
+        model=CreateVolumeDetails(),
+        existing_resources=volumes,
+        exclude_attributes={"display_name": True},
+    )
+
+
+def time_check_and_create_volume(volumes, match_filter_attributes):
+    default_match_filter_attributes = oci_utils.MATCH_FILTER_ATTRIBUTES
+    oci_utils.MATCH_FILTER_ATTRIBUTES = match_filter_attributes
+    try:
+        return min(
+            timeit.repeat(
+                lambda: check_and_create_volume(volumes), number=1, repeat=3
+            )
+        )
+    finally:
+        oci_utils.MATCH_FILTER_ATTRIBUTES = default_match_filter_attributes
+
+
+def main():
+    print(
+        "{0:>10} {1:>16} {2:>16}".format("resources", "full scan (s)", "filtered (s)")
+    )
+    for num_volumes in [100, 1000, 10000]:
+        volumes = get_volumes(num_volumes)
+        print(
+            "{0:>10} {1:>16.4f} {2:>16.4f}".format(
+                num_volumes,
+                time_check_and_create_volume(volumes, []),
+                time_check_and_create_volume(
+                    volumes, oci_utils.MATCH_FILTER_ATTRIBUTES
+                ),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
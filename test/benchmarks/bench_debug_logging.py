@@ -0,0 +1,130 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Micro-benchmark of the debug logging of the module utilities.
+
+Compares a debug message formatted eagerly by the caller with a message passed with its arguments to
+oci_common_utils.log_debug, which formats it only when debug logging is enabled, and times the idempotency check of
+oci_utils.check_and_create_resource with debug logging disabled and enabled.
+
+    $ python test/benchmarks/bench_debug_logging.py
+"""
+
+from __future__ import print_function
+
+import logging
+import timeit
+
+from ansible.module_utils.oracle import oci_common_utils, oci_utils
+from oci.core.models import CreateVolumeDetails, Volume
+from oci.util import to_dict
+
+
+class FakeModule(object):
+    def __init__(self, **kwargs):
+        self.params = kwargs
+        self.aliases = {}
+        self.argument_spec = {}
+
+    def fail_json(self, **kwargs):
+        raise Exception(kwargs["msg"])
+
+
+def get_volumes(num_volumes):
+    return [
+        Volume(
+            id="ocid1.volume.oc1..{0}".format(i),
+            compartment_id="ocid1.compartment.oc1..xxx",
+            availability_domain="AD-{0}".format(i % 3 + 1),
+            display_name="volume{0}".format(i),
+            size_in_gbs=50,
+            lifecycle_state="AVAILABLE",
+            defined_tags={},
+            freeform_tags={"env": "prod"},
+            is_hydrated=True,
+            time_created="2019-01-01T00:00:00.000Z",
+        )
+        for i in range(num_volumes)
+    ]
+
+
+def check_and_create_volume(volumes):
+    module = FakeModule(
+        compartment_id="ocid1.compartment.oc1..xxx",
+        availability_domain="AD-1",
+        display_name="new_volume",
+        size_in_gbs=50,
+    )
+    return oci_utils.check_and_create_resource(
+        resource_type="volume",
+        create_fn=lambda **kwargs: {"volume": None, "changed": True},
+        kwargs_create={},
+        list_fn=None,
+        kwargs_list={},
+        module=module,
+        model=CreateVolumeDetails(),
+        existing_resources=volumes,
+        exclude_attributes={"display_name": True},
+    )
+
+
+def time_fn(fn, number=1):
+    return min(timeit.repeat(fn, number=number, repeat=3))
+
+
+def main():
+    logger = oci_utils.get_logger("oci_utils")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    volume = get_volumes(1)[0]
+    number = 10000
+    print("{0} debug messages with a resource, debug logging disabled:".format(number))
+    print(
+        "{0:>24} {1:>12.4f}s".format(
+            "eager format",
+            time_fn(
+                lambda: logger.debug("Resource {0}".format(to_dict(volume))), number
+            ),
+        )
+    )
+    print(
+        "{0:>24} {1:>12.4f}s".format(
+            "log_debug with lazy",
+            time_fn(
+                lambda: oci_common_utils.log_debug(
+                    logger, "Resource {0}", oci_common_utils.lazy(to_dict, volume)
+                ),
+                number,
+            ),
+        )
+    )
+
+    print()
+    print(
+        "{0:>10} {1:>16} {2:>16}".format(
+            "resources", "debug off (s)", "debug on (s)"
+        )
+    )
+    match_filter_attributes = oci_utils.MATCH_FILTER_ATTRIBUTES
+    # Compare every existing resource, so that every comparison logs its debug messages.
+    oci_utils.MATCH_FILTER_ATTRIBUTES = []
+    try:
+        for num_volumes in [100, 1000]:
+            volumes = get_volumes(num_volumes)
+            timings = []
+            for level in [logging.INFO, logging.DEBUG]:
+                logger.setLevel(level)
+                timings.append(time_fn(lambda: check_and_create_volume(volumes)))
+            print(
+                "{0:>10} {1:>16.4f} {2:>16.4f}".format(
+                    num_volumes, timings[0], timings[1]
+                )
+            )
+    finally:
+        oci_utils.MATCH_FILTER_ATTRIBUTES = match_filter_attributes
+
+
+if __name__ == "__main__":
+    main()
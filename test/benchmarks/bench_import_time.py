@@ -0,0 +1,207 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Import time benchmark of the module utilities and the modules.
+
+Ansible starts a new python process for every task, so the import time of a module is paid for every task. Every case
+runs in a fresh python process, so that the modules are not already imported, and the best time of the runs is
+printed. The setup of a case is not timed.
+
+    $ python test/benchmarks/bench_import_time.py
+
+With --modules, the cold start import time of every module in library/ (or of the given modules) and the number of
+python modules it imports are measured with `python -X importtime`. They can be recorded as a budget, and checked
+against the budget to fail on regressions. The number of imported modules does not depend on the load of the machine,
+so it is checked exactly, while the time may exceed its budget by the tolerance:
+
+    $ python test/benchmarks/bench_import_time.py --modules --record test/benchmarks/import_time_budget.json
+    $ python test/benchmarks/bench_import_time.py --modules --check test/benchmarks/import_time_budget.json
+    $ python test/benchmarks/bench_import_time.py --modules oci_vcn oci_subnet
+
+`tox -e importtime` runs the check with the versions of the SDK and of Ansible the budget was recorded with.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+RUNS = 10
+
+CASES = [
+    (
+        "oci_resource_utils + get_custom_class",
+        "import oci",
+        "from ansible.module_utils.oracle import oci_resource_utils\n"
+        "oci_resource_utils.get_custom_class('BudgetHelperCustom')",
+    ),
+    (
+        "oci_resource_utils + walk of the helper packages",
+        "import oci",
+        "from ansible.module_utils.oracle import oci_resource_utils\n"
+        "oci_resource_utils.get_custom_class_mapping(\n"
+        "    oci_resource_utils.HELPER_PACKAGES.values()\n"
+        ")",
+    ),
+    (
+        "oci_utils",
+        "import oci",
+        "from ansible.module_utils.oracle import oci_utils",
+    ),
+    (
+        "oci_vcn module",
+        "import oci",
+        "from ansible.modules.cloud.oracle import oci_vcn",
+    ),
+]
+
+TIMER = """
+import time
+{setup}
+start = time.time()
+{stmt}
+print(time.time() - start)
+"""
+
+MODULES_PACKAGE = "ansible.modules.cloud.oracle"
+LIBRARY_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "library")
+
+
+def time_import(setup, stmt):
+    timings = []
+    for dummy in range(RUNS):
+        output = subprocess.check_output(
+            [sys.executable, "-c", TIMER.format(setup=setup, stmt=stmt)]
+        )
+        timings.append(float(output.decode().strip().splitlines()[-1]))
+    return min(timings)
+
+
+def get_module_names():
+    return sorted(
+        name[: -len(".py")]
+        for name in os.listdir(LIBRARY_DIR)
+        if name.endswith(".py") and not name.startswith("_")
+    )
+
+
+def time_module_import(module_name, runs):
+    """Return the cumulative import time of the module in seconds, as reported by python -X importtime, and the number
+    of modules imported by the python process"""
+    full_name = MODULES_PACKAGE + "." + module_name
+    timings = []
+    module_count = 0
+    for dummy in range(runs):
+        process = subprocess.Popen(
+            [sys.executable, "-X", "importtime", "-c", "import " + full_name],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        dummy, stderr = process.communicate()
+        if process.returncode != 0:
+            raise Exception(
+                "Importing {0} failed: {1}".format(full_name, stderr.decode())
+            )
+        # import time: self [us] | cumulative | imported package
+        lines = [
+            line.split("|")
+            for line in stderr.decode().splitlines()
+            if line.startswith("import time:") and len(line.split("|")) == 3
+        ]
+        module_count = len(lines) - 1  # without the header
+        for fields in lines:
+            if fields[2].strip() == full_name:
+                timings.append(int(fields[1]) / 1000000.0)
+    return min(timings), module_count
+
+
+def check_budget(results, budget, tolerance):
+    """Return the messages of the modules which import more modules than their budget, or whose import time exceeds
+    their budget by more than the tolerance"""
+    regressions = []
+    for module_name, result in sorted(results.items()):
+        if module_name not in budget:
+            print("{0} has no budget".format(module_name))
+            continue
+        module_budget = budget[module_name]
+        if result["modules"] > module_budget["modules"]:
+            regressions.append(
+                "{0} imports {1} modules, over its budget of {2} modules".format(
+                    module_name, result["modules"], module_budget["modules"]
+                )
+            )
+        if result["time"] > module_budget["time"] * (1 + tolerance):
+            regressions.append(
+                "{0} imports in {1:.4f}s, over its budget of {2:.4f}s".format(
+                    module_name, result["time"], module_budget["time"]
+                )
+            )
+    return regressions
+
+
+def bench_modules(args):
+    module_names = args.modules or get_module_names()
+    results = {}
+    print("{0:<64} {1:>10} {2:>8}".format("module", "time (s)", "modules"))
+    for module_name in module_names:
+        timing, module_count = time_module_import(module_name, args.runs)
+        results[module_name] = dict(time=timing, modules=module_count)
+        print("{0:<64} {1:>10.4f} {2:>8}".format(module_name, timing, module_count))
+    print(
+        "{0:<64} {1:>10.4f}".format(
+            "median",
+            sorted(result["time"] for result in results.values())[len(results) // 2],
+        )
+    )
+
+    if args.record:
+        with open(args.record, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.check:
+        with open(args.check) as f:
+            budget = json.load(f)
+        regressions = check_budget(results, budget, args.tolerance)
+        for regression in regressions:
+            print(regression)
+        if regressions:
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--modules",
+        nargs="*",
+        metavar="MODULE",
+        help="measure the import time of the modules, all the modules in library/ if none is given",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=1, help="runs per module, the best is kept"
+    )
+    parser.add_argument("--record", help="record the import times as a budget file")
+    parser.add_argument(
+        "--check", help="fail if an import time exceeds the budget in this file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.0,
+        help="fraction of the budget an import time may exceed it by, the times vary with the load of the machine",
+    )
+    args = parser.parse_args()
+
+    if args.modules is not None:
+        bench_modules(args)
+        return
+
+    print("{0:<56} {1:>10}".format("case", "time (s)"))
+    for name, setup, stmt in CASES:
+        print("{0:<56} {1:>10.4f}".format(name, time_import(setup, stmt)))
+
+
+if __name__ == "__main__":
+    main()
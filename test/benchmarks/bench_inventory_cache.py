@@ -0,0 +1,134 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Benchmark of the cache formats of the dynamic inventory script.
+
+Writes the inventory of a large number of hosts in each cache format and reports the size of the cache file, the time
+to produce the --list output, the time to read the vars of a single host (--host) and the peak memory of these reads.
+
+    $ python test/benchmarks/bench_inventory_cache.py [NUM_HOSTS]
+"""
+
+from __future__ import print_function
+
+import base64
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from bench_inventory_merge import load_inventory_script
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def get_inventory(num_hosts):
+    # Instances are usually launched from a small number of templates, so most of the metadata and user_data is shared.
+    user_data = [
+        base64.b64encode(os.urandom(12 * 1024)).decode("ascii") for i in range(20)
+    ]
+    inventory = {"all": {"hosts": set(), "vars": {}}, "_meta": {"hostvars": {}}}
+    for i in range(num_hosts):
+        host = "10.0.{0}.{1}".format(i // 250, i % 250)
+        inventory["all"]["hosts"].add(host)
+        inventory.setdefault("ad{0}".format(i % 3), {"hosts": set()})["hosts"].add(
+            host
+        )
+        inventory["_meta"]["hostvars"][host] = {
+            "id": "ocid1.instance.oc1.iad.{0:060d}".format(i),
+            "display_name": "instance{0}".format(i),
+            "availability_domain": "IwGV:US-ASHBURN-AD-{0}".format(i % 3 + 1),
+            "compartment_id": "ocid1.compartment.oc1..{0:060d}".format(i % 10),
+            "shape": "VM.Standard2.1",
+            "lifecycle_state": "RUNNING",
+            "region": "iad",
+            "time_created": "2019-01-16T12:13:35.336000+00:00",
+            "image_id": "ocid1.image.oc1.iad.{0:060d}".format(i % 20),
+            "freeform_tags": {"env": "prod", "team": "team{0}".format(i % 5)},
+            "defined_tags": {"ops": {"cost_center": "cc{0}".format(i % 4)}},
+            "extended_metadata": {},
+            "metadata": {
+                "ssh_authorized_keys": "ssh-rsa AAAAB3NzaC1yc2E{0} user".format(
+                    i % 20
+                ),
+                "user_data": user_data[i % 20],
+            },
+            "source_details": {
+                "image_id": "ocid1.image.oc1.iad.{0:060d}".format(i % 20),
+                "source_type": "image",
+            },
+        }
+    return inventory
+
+
+class NullStream(object):
+    def write(self, data):
+        pass
+
+
+def measure(fn):
+    elapsed = min(timeit.repeat(fn, number=1, repeat=3))
+    peak = None
+    if tracemalloc:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    num_hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    oci_inventory = load_inventory_script()
+    inventory = get_inventory(num_hosts)
+    host = "10.0.0.1"
+    cache_dir = tempfile.mkdtemp()
+    try:
+        print("{0} hosts".format(num_hosts))
+        print(
+            "{0:>14} {1:>11} {2:>10} {3:>10} {4:>13} {5:>10} {6:>13}".format(
+                "format",
+                "size (MB)",
+                "write (s)",
+                "list (s)",
+                "list peak MB",
+                "host (s)",
+                "host peak MB",
+            )
+        )
+        for cache_format in oci_inventory.OCIInventory.CACHE_FORMATS:
+            inv = oci_inventory.OCIInventory.__new__(oci_inventory.OCIInventory)
+            inv.params = {
+                "cache_format": cache_format,
+                "cache_file": os.path.join(cache_dir, cache_format),
+            }
+            write_time = min(
+                timeit.repeat(
+                    lambda: inv.write_to_cache(inventory), number=1, repeat=1
+                )
+            )
+            list_time, list_peak = measure(
+                lambda: inv.write_cached_inventory_json(NullStream())
+            )
+            host_time, host_peak = measure(lambda: inv.read_from_cache(hosts=[host]))
+            print(
+                "{0:>14} {1:>11.1f} {2:>10.3f} {3:>10.3f} {4:>13} {5:>10.3f} {6:>13}".format(
+                    cache_format,
+                    os.path.getsize(inv.params["cache_file"]) / 1024.0 / 1024,
+                    write_time,
+                    list_time,
+                    "{0:.1f}".format(list_peak / 1024.0 / 1024) if list_peak else "-",
+                    host_time,
+                    "{0:.1f}".format(host_peak / 1024.0 / 1024) if host_peak else "-",
+                )
+            )
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    main()
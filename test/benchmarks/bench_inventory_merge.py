@@ -0,0 +1,89 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Micro-benchmark of the merge of the instance inventories in the dynamic inventory script.
+
+The time per host should stay flat as the number of hosts grows.
+
+    $ python test/benchmarks/bench_inventory_merge.py
+"""
+
+from __future__ import print_function
+
+import os
+import timeit
+
+INVENTORY_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "..",
+    "inventory-script",
+    "oci_inventory.py",
+)
+
+
+def load_inventory_script(path=INVENTORY_SCRIPT):
+    try:
+        from importlib.util import module_from_spec, spec_from_file_location
+    except ImportError:
+        import imp
+
+        return imp.load_source("oci_inventory", path)
+    spec = spec_from_file_location("oci_inventory", path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_instance_inventories(oci_inventory, num_hosts):
+    instance_inventories = []
+    for i in range(num_hosts):
+        instance_inventory = {}
+        oci_inventory.OCIInventory.create_instance_inventory_for_host(
+            instance_inventory,
+            "host{0}".format(i),
+            vars={"id": "ocid1.instance.oc1..{0}".format(i)},
+            groups=[
+                "all",
+                "ad{0}".format(i % 3),
+                "region_us-ashburn-1",
+                "subnet{0}".format(i % 10),
+                "vcn{0}".format(i % 2),
+                "tag_env=prod",
+            ],
+            parents=["ad{0}".format(i % 3), "vcn{0}".format(i % 2)],
+            children=["subnet{0}".format(i % 10), "subnet{0}".format(i % 10)],
+        )
+        instance_inventories.append(instance_inventory)
+    return instance_inventories
+
+
+def merge(oci_inventory, instance_inventories):
+    inventory = oci_inventory.OCIInventory.__new__(oci_inventory.OCIInventory)
+    inventory.inventory = {
+        "all": {"hosts": set(), "vars": {}},
+        "_meta": {"hostvars": {}},
+    }
+    inventory.merge_instance_inventories(instance_inventories)
+    return inventory.get_serializable_inventory(inventory.inventory)
+
+
+def main():
+    oci_inventory = load_inventory_script()
+    print("{0:>8} {1:>12} {2:>16}".format("hosts", "merge (s)", "per host (us)"))
+    for num_hosts in [1000, 2000, 5000, 10000, 20000]:
+        instance_inventories = get_instance_inventories(oci_inventory, num_hosts)
+        elapsed = min(
+            timeit.repeat(
+                lambda: merge(oci_inventory, instance_inventories), number=1, repeat=3
+            )
+        )
+        print(
+            "{0:>8} {1:>12.4f} {2:>16.2f}".format(
+                num_hosts, elapsed, elapsed / num_hosts * 1e6
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Micro-benchmark of the comparison of list attributes.
+
+Times oci_common_utils.are_lists_equal on lists of primitives and on lists of dicts with additional server side keys,
+and oci_common_utils.is_list_subset on lists of security rule like dicts, for 10 to 10000 elements.
+The pairwise and sort based comparisons which these functions replaced are timed for reference, up to 1000 elements.
+
+    $ python test/benchmarks/bench_list_comparison.py
+"""
+
+from __future__ import print_function
+
+import timeit
+
+from ansible.module_utils.oracle import oci_common_utils
+from oci.util import to_dict
+
+MAX_PAIRWISE_ELEMENTS = 1000
+
+
+def pairwise_are_lists_equal(s, t):
+    s = to_dict(s)
+    t = to_dict(t)
+    try:
+        for elem in s:
+            t.remove(elem)
+    except ValueError:
+        return False
+    return not t
+
+
+def sorted_are_lists_equal(s, t):
+    s = to_dict(s)
+    t = to_dict(t)
+    sorted_s = oci_common_utils.sort_list_of_dictionary(s)
+    sorted_t = oci_common_utils.sort_list_of_dictionary(t)
+    return all(
+        oci_common_utils.is_dictionary_subset(d, sorted_t[index])
+        for index, d in enumerate(sorted_s)
+    )
+
+
+def pairwise_is_list_subset(source_list, target_list):
+    return all(
+        any(
+            oci_common_utils.is_dict_subset(element, target_element)
+            for target_element in target_list
+        )
+        for element in source_list
+    )
+
+
+def get_rules(num_rules, with_server_keys=False):
+    rules = []
+    for i in range(num_rules):
+        rule = {
+            "source": "10.0.{0}.{1}/32".format(i // 256, i % 256),
+            "protocol": "6",
+            "is_stateless": False,
+            "tcp_options": {"destination_port_range": {"min": i, "max": i + 1}},
+        }
+        if with_server_keys:
+            rule["source_type"] = "CIDR_BLOCK"
+            rule["icmp_options"] = None
+        rules.append(rule)
+    return rules
+
+
+def time_fn(fn):
+    return min(timeit.repeat(fn, number=1, repeat=3))
+
+
+def print_timings(name, fn, pairwise_fn, get_args):
+    print(name)
+    print("{0:>10} {1:>16} {2:>16}".format("elements", "previous (s)", "hashed (s)"))
+    for num_elements in [10, 100, 1000, 10000]:
+        args = get_args(num_elements)
+        if num_elements <= MAX_PAIRWISE_ELEMENTS:
+            pairwise = "{0:>16.4f}".format(time_fn(lambda: pairwise_fn(*args)))
+        else:
+            pairwise = "{0:>16}".format("-")
+        print(
+            "{0:>10} {1} {2:>16.4f}".format(
+                num_elements, pairwise, time_fn(lambda: fn(*args))
+            )
+        )
+    print()
+
+
+def main():
+    print_timings(
+        "are_lists_equal, list of strings",
+        oci_common_utils.are_lists_equal,
+        pairwise_are_lists_equal,
+        lambda n: (
+            ["ocid1.nsg.oc1..{0}".format(i) for i in range(n)],
+            ["ocid1.nsg.oc1..{0}".format(i) for i in reversed(range(n))],
+        ),
+    )
+    print_timings(
+        "are_lists_equal, list of dicts with additional server side keys",
+        oci_common_utils.are_lists_equal,
+        sorted_are_lists_equal,
+        lambda n: (get_rules(n), list(reversed(get_rules(n, with_server_keys=True)))),
+    )
+    print_timings(
+        "is_list_subset, list of dicts with additional server side keys",
+        oci_common_utils.is_list_subset,
+        pairwise_is_list_subset,
+        lambda n: (get_rules(n), list(reversed(get_rules(n, with_server_keys=True)))),
+    )
+
+
+if __name__ == "__main__":
+    main()
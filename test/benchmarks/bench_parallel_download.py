@@ -0,0 +1,93 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Benchmark of the download of an object in a single stream and in parallel byte ranges.
+
+The object storage client is simulated: every connection streams at a fixed bandwidth, as the downloads of large
+objects are limited by the bandwidth of a single connection rather than by the bandwidth of the host.
+
+    $ python test/benchmarks/bench_parallel_download.py
+"""
+
+from __future__ import print_function
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from ansible.module_utils.oracle import oci_object_storage_utils
+
+MIB = 1024 * 1024
+# Bandwidth of a single connection in bytes per second
+CONNECTION_BANDWIDTH = 64 * MIB
+
+
+class Stream(object):
+    def __init__(self, content):
+        self.content = content
+
+    def stream(self, chunk_size, decode_content=True):
+        for start in range(0, len(self.content), chunk_size):
+            chunk = self.content[start : start + chunk_size]
+            time.sleep(len(chunk) / float(CONNECTION_BANDWIDTH))
+            yield chunk
+
+
+class Response(object):
+    def __init__(self, content, headers=None):
+        self.headers = headers or {}
+        self.data = self
+        self.raw = Stream(content)
+
+
+class FakeObjectStorageClient(object):
+    def __init__(self, content):
+        self.content = content
+        self.headers = {
+            "Content-Length": str(len(content)),
+            "Content-MD5": oci_object_storage_utils.get_base64_md5(
+                hashlib.md5(content)
+            ),
+        }
+
+    def get_object(self, range=None, **kwargs):
+        if range is None:
+            return Response(self.content, self.headers)
+        start, end = [int(byte) for byte in range[len("bytes=") :].split("-")]
+        return Response(self.content[start : end + 1])
+
+
+def main():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        dest = os.path.join(tmpdir, "object")
+        print(
+            "{0:>10} {1:>12} {2:>12} {3:>16}".format(
+                "size", "part size", "stream (s)", "in parts (s)"
+            )
+        )
+        for size, part_size in [(64 * MIB, 16 * MIB), (256 * MIB, 32 * MIB)]:
+            client = FakeObjectStorageClient(os.urandom(size))
+
+            start = time.time()
+            oci_object_storage_utils.download_object(client.get_object(), dest)
+            stream_time = time.time() - start
+
+            start = time.time()
+            oci_object_storage_utils.download_object_in_parts(
+                client, dest, size, client.headers, part_size=part_size
+            )
+            parts_time = time.time() - start
+            print(
+                "{0:>7}MiB {1:>9}MiB {2:>12.2f} {3:>16.2f}".format(
+                    size // MIB, part_size // MIB, stream_time, parts_time
+                )
+            )
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
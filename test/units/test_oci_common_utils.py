@@ -4,8 +4,9 @@
 # Apache License v2.0
 # See LICENSE.TXT for details.
 
+import oci
 import pytest
-from ansible.module_utils.oracle import oci_common_utils
+from ansible.module_utils.oracle import oci_common_utils, oci_config_utils, oci_utils
 
 
 @pytest.fixture
@@ -518,3 +519,440 @@ def test_merge_dicts():
     merged_dict = oci_common_utils.merge_dicts(d1, none_dict)
     assert "key1" in merged_dict
     assert len(merged_dict) == 1
+
+
+def get_host_vars():
+    return {
+        "id": "ocid1.instance.oc1..xxxxxEXAMPLExxxxx",
+        "display_name": "instance1",
+        "metadata": {
+            "ssh_authorized_keys": "ssh-rsa AAAA",
+            "user_data": "dXNlcmRhdGE=",
+        },
+        "defined_tags": {"ns": {"key1": "val1", "key2": "val2"}},
+    }
+
+
+def test_project_dict_without_paths():
+    host_vars = get_host_vars()
+    assert oci_common_utils.project_dict(host_vars) == host_vars
+
+
+def test_project_dict_with_include_paths():
+    host_vars = get_host_vars()
+    assert oci_common_utils.project_dict(
+        host_vars, include_paths=["id", "metadata.ssh_authorized_keys", "missing.key"]
+    ) == {
+        "id": "ocid1.instance.oc1..xxxxxEXAMPLExxxxx",
+        "metadata": {"ssh_authorized_keys": "ssh-rsa AAAA"},
+    }
+    # a path covers the longer paths under it
+    assert oci_common_utils.project_dict(
+        host_vars, include_paths=["defined_tags.ns.key1", "defined_tags"]
+    ) == {"defined_tags": {"ns": {"key1": "val1", "key2": "val2"}}}
+    assert host_vars == get_host_vars()
+
+
+def test_project_dict_with_exclude_paths():
+    host_vars = get_host_vars()
+    assert oci_common_utils.project_dict(
+        host_vars,
+        exclude_paths=["metadata.user_data", "defined_tags.ns.key2", "id.missing"],
+    ) == {
+        "id": "ocid1.instance.oc1..xxxxxEXAMPLExxxxx",
+        "display_name": "instance1",
+        "metadata": {"ssh_authorized_keys": "ssh-rsa AAAA"},
+        "defined_tags": {"ns": {"key1": "val1"}},
+    }
+    assert host_vars == get_host_vars()
+
+
+def test_project_dict_with_include_and_exclude_paths():
+    assert oci_common_utils.project_dict(
+        get_host_vars(),
+        include_paths=["display_name", "metadata"],
+        exclude_paths=["metadata.user_data"],
+    ) == {
+        "display_name": "instance1",
+        "metadata": {"ssh_authorized_keys": "ssh-rsa AAAA"},
+    }
+
+
+def get_compartment_dicts():
+    return [
+        {"id": "tenancy", "compartment_id": None, "name": "tenancy"},
+        {"id": "c1", "compartment_id": "tenancy", "name": "c1"},
+        {"id": "c2", "compartment_id": "tenancy", "name": "c2"},
+        {"id": "c11", "compartment_id": "c1", "name": "c11"},
+        {"id": "c111", "compartment_id": "c11", "name": "c111"},
+    ]
+
+
+def test_get_compartment_subtree():
+    tree = oci_common_utils._get_compartment_tree(get_compartment_dicts())
+    assert tree["children"]["tenancy"] == ["c1", "c2"]
+    assert [
+        compartment["id"]
+        for compartment in oci_common_utils.get_compartment_subtree(tree, "tenancy")
+    ] == ["tenancy", "c1", "c2", "c11", "c111"]
+    assert [
+        compartment["id"]
+        for compartment in oci_common_utils.get_compartment_subtree(tree, "c1")
+    ] == ["c1", "c11", "c111"]
+    assert [
+        compartment["id"]
+        for compartment in oci_common_utils.get_compartment_subtree(
+            tree, "tenancy", depth=2
+        )
+    ] == ["tenancy", "c1", "c2", "c11"]
+    assert [
+        compartment["id"]
+        for compartment in oci_common_utils.get_compartment_subtree(
+            tree, "c1", depth=0
+        )
+    ] == ["c1"]
+
+
+def test_get_compartment_models_ignores_unknown_attributes():
+    compartments = oci_common_utils.get_compartment_models(
+        [{"id": "c1", "name": "c1", "attribute_of_a_newer_sdk": "value"}]
+    )
+    assert [(compartment.id, compartment.name) for compartment in compartments] == [
+        ("c1", "c1")
+    ]
+
+
+def test_json_cache(monkeypatch, tmpdir):
+    monkeypatch.setenv(oci_common_utils.CACHE_DIR_ENV_VAR, str(tmpdir.join("cache")))
+    oci_common_utils.write_json_cache("test.json", {"key": "value"})
+    assert oci_common_utils.read_json_cache("test.json", 60) == {"key": "value"}
+    assert oci_common_utils.read_json_cache("test.json", 0) is None
+    assert oci_common_utils.read_json_cache("missing.json", 60) is None
+
+
+def test_atomic_write_replaces_the_target_of_a_symlink(tmpdir):
+    target = tmpdir.join("target")
+    target.write_binary(b"old content")
+    link = tmpdir.join("link")
+    link.mksymlinkto(target)
+
+    with oci_common_utils.atomic_write(str(link)) as f:
+        f.write(b"new content")
+
+    assert link.islink()
+    assert target.read_binary() == b"new content"
+    assert sorted(tmpdir.listdir()) == [link, target]
+
+
+def test_get_compartment_tree_from_cache(monkeypatch, tmpdir, mocker):
+    monkeypatch.setenv(oci_common_utils.CACHE_DIR_ENV_VAR, str(tmpdir))
+    tree = oci_common_utils._get_compartment_tree(get_compartment_dicts())
+    tree["tenancy_id"] = "tenancy"
+    oci_common_utils.write_json_cache(
+        oci_common_utils.get_compartment_tree_cache_name("tenancy"), tree
+    )
+    identity_client = mocker.Mock()
+    assert (
+        oci_common_utils.get_compartment_tree(identity_client, "tenancy", max_age=60)
+        == tree
+    )
+    identity_client.get_compartment.assert_not_called()
+    identity_client.list_compartments.assert_not_called()
+
+
+def test_invalidate_compartment_tree(monkeypatch, tmpdir):
+    monkeypatch.setenv(oci_common_utils.CACHE_DIR_ENV_VAR, str(tmpdir))
+    cache_name = oci_common_utils.get_compartment_tree_cache_name("tenancy")
+    oci_common_utils.write_json_cache(cache_name, {"tenancy_id": "tenancy"})
+    oci_common_utils.invalidate_compartment_tree("tenancy")
+    assert oci_common_utils.read_json_cache(cache_name, 60) is None
+    # Invalidating a tree which is not cached does nothing
+    oci_common_utils.invalidate_compartment_tree("tenancy")
+
+
+def test_list_subcompartments_in_parallel_upto_depth(mocker):
+    compartments = [
+        oci.identity.models.Compartment(
+            lifecycle_state="INACTIVE" if compartment["id"] == "c2" else "ACTIVE",
+            **compartment
+        )
+        for compartment in get_compartment_dicts()
+    ]
+    list_all_resources_patch = mocker.patch.object(
+        oci_common_utils,
+        "list_all_resources",
+        side_effect=lambda list_fn, compartment_id: [
+            compartment
+            for compartment in compartments
+            if compartment.compartment_id == compartment_id
+        ],
+    )
+    identity_client = mocker.Mock()
+    assert [
+        compartment.id
+        for compartment in oci_common_utils.list_subcompartments_in_parallel(
+            identity_client, "tenancy", depth=2, lifecycle_state=None
+        )
+    ] == ["c1", "c2", "c11"]
+    assert [
+        compartment.id
+        for compartment in oci_common_utils.list_subcompartments_in_parallel(
+            identity_client, "tenancy"
+        )
+    ] == ["c1", "c11", "c111"]
+    assert list_all_resources_patch.call_count == 7
+
+
+def test_adaptive_rate_limiter_decreases_rate_on_throttle_and_recovers():
+    rate_limiter = oci_common_utils.AdaptiveRateLimiter("test", max_rate=10)
+    rate_limiter.on_throttle()
+    assert rate_limiter.rate == 5
+    # throttles of the requests in flight do not decrease the rate again
+    rate_limiter.on_throttle()
+    assert rate_limiter.rate == 5
+    for i in range(100):
+        rate_limiter.on_success()
+    assert rate_limiter.rate == 10
+
+
+def test_get_rate_limiter_is_none_by_default(monkeypatch, mocker):
+    monkeypatch.delenv(oci_common_utils.RATE_LIMIT_ENV_VAR, raising=False)
+    client = mocker.Mock(base_client=mocker.Mock(endpoint="https://iaas.r1"))
+    assert oci_common_utils.get_rate_limiter(client) is None
+
+
+def test_get_rate_limiter_is_shared_by_clients_of_same_endpoint(monkeypatch, mocker):
+    monkeypatch.setenv(oci_common_utils.RATE_LIMIT_ENV_VAR, "20")
+    client_1 = mocker.Mock(base_client=mocker.Mock(endpoint="https://iaas.r1"))
+    client_2 = mocker.Mock(base_client=mocker.Mock(endpoint="https://iaas.r1"))
+    client_3 = mocker.Mock(base_client=mocker.Mock(endpoint="https://iaas.r2"))
+    rate_limiter = oci_common_utils.get_rate_limiter(client_1)
+    assert rate_limiter is oci_common_utils.get_rate_limiter(client_2)
+    assert rate_limiter is not oci_common_utils.get_rate_limiter(client_3)
+    assert oci_common_utils.get_rate_limiter(None) is None
+
+
+SDK_CONFIG = dict(
+    user="ocid1.user.oc1..xxx",
+    tenancy="ocid1.tenancy.oc1..xxx",
+    fingerprint=":".join(["aa"] * 16),
+    key_file="~/.oci/oci_api_key.pem",
+    region="us-ashburn-1",
+)
+
+
+def get_compute_client(mocker):
+    client = oci.core.ComputeClient(SDK_CONFIG, signer=mocker.Mock())
+    call_api_patch = mocker.patch.object(client.base_client, "call_api", autospec=True)
+    call_api_patch.return_value = oci.response.Response(200, {}, [], None)
+    return client, call_api_patch
+
+
+def test_call_with_backoff_rate_limits_every_attempt_of_sdk_operations(
+    monkeypatch, mocker
+):
+    monkeypatch.setenv(oci_common_utils.RATE_LIMIT_ENV_VAR, "20")
+    mocker.patch("time.sleep")
+    client, call_api_patch = get_compute_client(mocker)
+    call_api_patch.side_effect = [
+        oci.exceptions.ServiceError(503, "ServiceUnavailable", {}, "Unavailable"),
+        oci.response.Response(200, {}, [], None),
+    ]
+    rate_limiter_call = mocker.spy(
+        oci_common_utils.get_rate_limiter(client), "call"
+    )
+
+    response = oci_common_utils.call_with_backoff(
+        client.list_instances, compartment_id="ocid1.compartment.oc1..xxx"
+    )
+
+    assert response.status == 200
+    assert call_api_patch.call_count == 2
+    assert rate_limiter_call.call_count == 2
+    # The SDK rewinds the file bodies before a retry only when the retried function is call_api
+    assert client.base_client.call_api.__name__ == "call_api"
+
+
+def test_list_all_resources_rate_limits_sdk_operations(monkeypatch, mocker):
+    monkeypatch.setenv(oci_common_utils.RATE_LIMIT_ENV_VAR, "20")
+    client, call_api_patch = get_compute_client(mocker)
+
+    for list_all_resources in [
+        oci_common_utils.list_all_resources,
+        oci_utils.list_all_resources,
+    ]:
+        assert (
+            list_all_resources(
+                client.list_instances, compartment_id="ocid1.compartment.oc1..xxx"
+            )
+            == []
+        )
+    assert oci_utils.call_with_backoff(
+        client.list_instances, compartment_id="ocid1.compartment.oc1..xxx"
+    ).data == []
+
+    assert call_api_patch.call_count == 3
+    rate_limiter = oci_common_utils.get_rate_limiter(client)
+    assert client.base_client.call_api.rate_limiter is rate_limiter
+
+
+def test_list_all_resources_without_retry_strategy_support(mocker):
+    def list_fn(**kwargs):
+        if "retry_strategy" in kwargs:
+            raise TypeError(
+                "list_fn() got an unexpected keyword argument 'retry_strategy'"
+            )
+        return oci.response.Response(200, {}, ["resource"], None)
+
+    assert oci_utils.list_all_resources(list_fn) == ["resource"]
+    assert oci_common_utils.list_all_resources(list_fn) == ["resource"]
+
+
+def test_get_region_subscriptions_is_cached(monkeypatch, tmpdir, mocker):
+    monkeypatch.setenv(oci_common_utils.CACHE_DIR_ENV_VAR, str(tmpdir))
+    region_subscriptions = [
+        {"region_name": "us-phoenix-1", "is_home_region": True},
+        {"region_name": "us-ashburn-1", "is_home_region": False},
+    ]
+    identity_client = mocker.Mock()
+    identity_client.list_region_subscriptions.return_value = mocker.Mock(
+        data=region_subscriptions
+    )
+    for i in range(2):
+        assert (
+            oci_common_utils.get_region_subscriptions(identity_client, "tenancy")
+            == region_subscriptions
+        )
+    identity_client.list_region_subscriptions.assert_called_once()
+
+
+def test_get_home_region_is_cached_until_invalidated(monkeypatch, tmpdir, mocker):
+    monkeypatch.setenv(oci_common_utils.CACHE_DIR_ENV_VAR, str(tmpdir))
+    identity_client = mocker.Mock()
+    identity_client.list_region_subscriptions.return_value = mocker.Mock(
+        data=[{"region_name": "us-phoenix-1", "is_home_region": True}]
+    )
+    for i in range(2):
+        assert (
+            oci_common_utils.get_home_region(identity_client, "tenancy")
+            == "us-phoenix-1"
+        )
+    identity_client.list_region_subscriptions.assert_called_once()
+    oci_common_utils.invalidate_home_region("tenancy")
+    oci_common_utils.get_home_region(identity_client, "tenancy")
+    assert identity_client.list_region_subscriptions.call_count == 2
+
+
+def test_get_supported_kwargs():
+    def list_resources(compartment_id, **kwargs):
+        """
+        :param str compartment_id: (required)
+            The OCID of the compartment.
+
+        :param str display_name: (optional)
+            A filter to return only resources that match the given display name exactly.
+
+        :param str lifecycle_state: (optional)
+            A filter to only return resources that match the given lifecycle state.
+        """
+
+    assert oci_common_utils.get_supported_kwargs(list_resources) == frozenset(
+        ["display_name", "lifecycle_state"]
+    )
+    assert oci_common_utils.get_supported_kwargs(lambda **kwargs: None) == frozenset()
+
+
+def test_log_debug_formats_message_only_when_debug_is_enabled(mocker):
+    logger = mocker.MagicMock()
+    to_dict = mocker.MagicMock(return_value={"id": "ocid1"})
+
+    logger.isEnabledFor.return_value = False
+    oci_common_utils.log_debug(
+        logger, "Resource {0}", oci_common_utils.lazy(to_dict, "resource")
+    )
+    to_dict.assert_not_called()
+    logger.debug.assert_not_called()
+
+    logger.isEnabledFor.return_value = True
+    oci_common_utils.log_debug(
+        logger, "Resource {0}", oci_common_utils.lazy(to_dict, "resource")
+    )
+    to_dict.assert_called_once_with("resource")
+    logger.debug.assert_called_once_with("Resource {'id': 'ocid1'}")
+
+
+def test_are_lists_equal_compares_multisets():
+    assert oci_common_utils.are_lists_equal([1, 2, 2, 3], [2, 3, 1, 2]) is True
+    assert oci_common_utils.are_lists_equal([1, 2, 2, 3], [1, 2, 3, 3]) is False
+    assert oci_common_utils.are_lists_equal([[1, 2], [3]], [[3], [2, 1]]) is True
+
+    # the dicts in the target list may have additional keys
+    source = [{"id": "b", "ports": [2, 1]}, {"id": "a", "ports": [1]}]
+    target = [
+        {"id": "a", "ports": [1], "name": "x"},
+        {"id": "b", "ports": [1, 2], "name": "y"},
+    ]
+    assert oci_common_utils.are_lists_equal(source, target) is True
+    target[1]["ports"] = [1, 3]
+    assert oci_common_utils.are_lists_equal(source, target) is False
+
+
+def test_is_list_subset_with_indexed_elements():
+    target = [
+        {"id": "a", "options": {"min": 1, "max": 2, "extra": None}, "name": "x"},
+        {"id": "b", "options": {"min": 3, "max": 4}},
+        "c",
+    ]
+    assert oci_common_utils.is_list_subset(
+        [{"id": "b", "options": {"min": 3}}, {"id": "a", "name": None}, "c"], target
+    )
+    assert not oci_common_utils.is_list_subset(
+        [{"id": "b", "options": {"min": 1}}], target
+    )
+    assert not oci_common_utils.is_list_subset([{"id": "c"}], target)
+    assert not oci_common_utils.is_list_subset(["d"], target)
+    assert oci_common_utils.freeze({"a": [1, {"b": 2}]}) == oci_common_utils.freeze(
+        {"a": [{"b": 2}, 1]}
+    )
+
+
+def test_lazy_module_imports_module_on_first_attribute_access(mocker):
+    import_module = mocker.patch.object(oci_common_utils.importlib, "import_module")
+    lazy_module = oci_common_utils.LazyModule("yaml")
+    import_module.assert_not_called()
+    assert lazy_module.safe_load is import_module.return_value.safe_load
+    assert lazy_module.dump is import_module.return_value.dump
+    import_module.assert_called_once_with("yaml")
+
+
+def test_is_sdk_class():
+    from oci.identity.identity_client import IdentityClient
+
+    assert oci_common_utils.is_sdk_class(
+        IdentityClient, "oci.identity.identity_client", "IdentityClient"
+    )
+    assert not oci_common_utils.is_sdk_class(
+        object, "oci.identity.identity_client", "IdentityClient"
+    )
+    assert not oci_common_utils.is_sdk_class(
+        IdentityClient, "oci.not_imported_module", "IdentityClient"
+    )
+
+
+def test_create_service_client_lets_the_client_build_the_api_key_signer(mocker):
+    mocker.patch.object(oci_config_utils, "_service_client_cache", {})
+    mocker.patch.object(oci_config_utils, "_signer_cache", {})
+    mocker.patch.object(
+        oci_config_utils, "get_oci_config", return_value=dict(SDK_CONFIG)
+    )
+    module = mocker.Mock(params=dict(auth_type="api_key"))
+    service_client_class = mocker.Mock()
+
+    client = oci_config_utils.create_service_client(module, service_client_class)
+
+    assert client is service_client_class.return_value
+    service_client_class.assert_called_once_with(SDK_CONFIG)
+    assert (
+        oci_config_utils.create_service_client(module, service_client_class) is client
+    )
+    service_client_class.assert_called_once_with(SDK_CONFIG)
@@ -0,0 +1,149 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# This software is made available to you under the terms of the GPL 3.0 license or the Apache 2.0 license.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+# Apache License v2.0
+# See LICENSE.TXT for details.
+
+import pytest
+from nose.plugins.skip import SkipTest
+from ansible.modules.cloud.oracle import oci_compartment_facts
+from ansible.module_utils.oracle import oci_common_utils, oci_utils
+
+try:
+    from oci.identity.models import Compartment
+    from oci.exceptions import ServiceError
+except ImportError:
+    raise SkipTest("test_oci_compartment_facts.py requires `oci` module")
+
+
+class FakeModule(object):
+    def __init__(self, **kwargs):
+        self.params = kwargs
+
+    def fail_json(self, *args, **kwargs):
+        self.exit_args = args
+        self.exit_kwargs = kwargs
+        raise Exception(kwargs["msg"])
+
+
+@pytest.fixture()
+def identity_client(mocker):
+    mock_identity_client = mocker.patch("oci.identity.identity_client.IdentityClient")
+    return mock_identity_client.return_value
+
+
+@pytest.fixture()
+def get_oci_config_patch(mocker):
+    return mocker.patch.object(
+        oci_utils, "get_oci_config", return_value={"tenancy": "tenancy"}
+    )
+
+
+@pytest.fixture()
+def get_compartment_tree_patch(mocker):
+    return mocker.patch.object(oci_common_utils, "get_compartment_tree")
+
+
+@pytest.fixture()
+def list_all_resources_patch(mocker):
+    return mocker.patch.object(oci_common_utils, "list_all_resources")
+
+
+def get_compartment_tree():
+    return oci_common_utils._get_compartment_tree(
+        [
+            {"id": "tenancy", "compartment_id": None, "name": "tenancy"},
+            {"id": "c1", "compartment_id": "tenancy", "name": "c1"},
+            {"id": "c2", "compartment_id": "tenancy", "name": "c2"},
+            {"id": "c11", "compartment_id": "c1", "name": "c11"},
+            {"id": "c111", "compartment_id": "c11", "name": "c111"},
+        ]
+    )
+
+
+def get_compartments_by_parent():
+    compartments = {
+        "c1": [Compartment(id="c11", compartment_id="c1", lifecycle_state="ACTIVE")],
+        "c11": [
+            Compartment(id="c111", compartment_id="c11", lifecycle_state="ACTIVE"),
+            Compartment(id="c112", compartment_id="c11", lifecycle_state="DELETED"),
+        ],
+    }
+    return lambda list_fn, compartment_id: compartments.get(compartment_id, [])
+
+
+def test_list_subcompartments_lists_all_the_states_by_default(
+    identity_client, get_compartment_tree_patch, list_all_resources_patch
+):
+    list_all_resources_patch.side_effect = get_compartments_by_parent()
+    module = FakeModule(compartment_id="c1", depth=2, compartment_cache_max_age=0)
+    result = oci_compartment_facts.list_subcompartments(identity_client, module, None)
+    assert [compartment["id"] for compartment in result] == ["c11", "c111", "c112"]
+    get_compartment_tree_patch.assert_not_called()
+
+
+def test_list_subcompartments_of_non_root_compartment_from_tree(
+    identity_client,
+    get_oci_config_patch,
+    get_compartment_tree_patch,
+    list_all_resources_patch,
+):
+    get_compartment_tree_patch.return_value = get_compartment_tree()
+    module = FakeModule(compartment_id="c1", depth=2, compartment_cache_max_age=60)
+    result = oci_compartment_facts.list_subcompartments(identity_client, module, None)
+    assert [compartment["id"] for compartment in result] == ["c11", "c111"]
+    get_compartment_tree_patch.assert_called_once_with(
+        identity_client, "tenancy", max_age=60
+    )
+    list_all_resources_patch.assert_not_called()
+
+
+def test_list_subcompartments_of_root_compartment_from_tree(
+    identity_client, get_compartment_tree_patch, list_all_resources_patch
+):
+    get_compartment_tree_patch.return_value = get_compartment_tree()
+    module = FakeModule(compartment_id="tenancy", depth=6, compartment_cache_max_age=60)
+    tenancy = Compartment(id="tenancy")
+    result = oci_compartment_facts.list_subcompartments(
+        identity_client, module, tenancy
+    )
+    assert [compartment["id"] for compartment in result] == [
+        "c1",
+        "c2",
+        "c11",
+        "c111",
+    ]
+    list_all_resources_patch.assert_not_called()
+
+
+def test_list_subcompartments_when_tree_cannot_be_listed(
+    identity_client,
+    get_oci_config_patch,
+    get_compartment_tree_patch,
+    list_all_resources_patch,
+):
+    get_compartment_tree_patch.side_effect = ServiceError(403, "NotAuthorized", {}, "")
+    list_all_resources_patch.side_effect = get_compartments_by_parent()
+    module = FakeModule(compartment_id="c1", depth=2, compartment_cache_max_age=60)
+    result = oci_compartment_facts.list_subcompartments(identity_client, module, None)
+    assert [compartment["id"] for compartment in result] == ["c11", "c111", "c112"]
+
+
+def test_list_subcompartments_of_compartment_not_in_tree(
+    identity_client,
+    get_oci_config_patch,
+    get_compartment_tree_patch,
+    list_all_resources_patch,
+):
+    get_compartment_tree_patch.return_value = get_compartment_tree()
+    list_all_resources_patch.return_value = []
+    module = FakeModule(
+        compartment_id="inactive", depth=3, compartment_cache_max_age=60
+    )
+    assert (
+        oci_compartment_facts.list_subcompartments(identity_client, module, None)
+        == []
+    )
+    list_all_resources_patch.assert_called_once_with(
+        identity_client.list_compartments, compartment_id="inactive"
+    )
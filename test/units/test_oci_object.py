@@ -0,0 +1,374 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# This software is made available to you under the terms of the GPL 3.0 license or the Apache 2.0 license.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+# Apache License v2.0
+# See LICENSE.TXT for details.
+
+import base64
+import hashlib
+
+import pytest
+from nose.plugins.skip import SkipTest
+from ansible.modules.cloud.oracle import oci_object
+from ansible.module_utils.oracle import (
+    oci_common_utils,
+    oci_object_storage_utils,
+    oci_utils,
+)
+
+try:
+    import oci
+except ImportError:
+    raise SkipTest("test_oci_object.py requires `oci` module")
+
+
+class FakeModule(object):
+    def __init__(self, **kwargs):
+        self.params = kwargs
+
+    def fail_json(self, *args, **kwargs):
+        self.exit_args = args
+        self.exit_kwargs = kwargs
+        raise Exception(kwargs["msg"])
+
+    def exit_json(self, *args, **kwargs):
+        self.exit_args = args
+        self.exit_kwargs = kwargs
+
+
+@pytest.fixture()
+def object_storage_client(mocker):
+    mock_ob_store = mocker.patch(
+        "oci.object_storage.object_storage_client.ObjectStorageClient"
+    )
+    return mock_ob_store.return_value
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmpdir_factory):
+    cache_dir = tmpdir_factory.mktemp("cache")
+    monkeypatch.setenv(oci_common_utils.CACHE_DIR_ENV_VAR, str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture()
+def call_with_backoff_patch(mocker):
+    return mocker.patch.object(oci_utils, "call_with_backoff")
+
+
+def get_module(dest):
+    return FakeModule(
+        namespace_name="mynamespace",
+        bucket_name="mybucket",
+        object_name="myobject",
+        dest=dest,
+    )
+
+
+def get_md5(content):
+    return base64.b64encode(hashlib.md5(content).digest()).decode("ascii")
+
+
+def get_response(mocker, chunks, md5):
+    response = mocker.MagicMock()
+    response.headers = {"Content-MD5": md5}
+    response.data.raw.stream.return_value = iter(chunks)
+    return response
+
+
+def test_get_object_streams_object_to_dest(
+    mocker, object_storage_client, call_with_backoff_patch, tmpdir
+):
+    dest = tmpdir.join("myobject")
+    chunks = [b"a" * 10, b"b" * 10, b"c"]
+    response = get_response(mocker, chunks, get_md5(b"".join(chunks)))
+    call_with_backoff_patch.return_value = response
+
+    result = oci_object.get_object(object_storage_client, get_module(str(dest)))
+
+    assert result["changed"] is True
+    assert dest.read_binary() == b"".join(chunks)
+    response.data.raw.stream.assert_called_once()
+    assert tmpdir.listdir() == [dest]
+
+
+def test_get_object_leaves_dest_unchanged_when_md5_does_not_match(
+    mocker, object_storage_client, call_with_backoff_patch, tmpdir
+):
+    dest = tmpdir.join("myobject")
+    dest.write_binary(b"old content")
+    response = get_response(mocker, [b"new content"], get_md5(b"other content"))
+    call_with_backoff_patch.return_value = response
+
+    with pytest.raises(Exception) as exc_info:
+        oci_object.get_object(object_storage_client, get_module(str(dest)))
+
+    assert "does not match the expected MD5" in str(exc_info.value)
+    assert dest.read_binary() == b"old content"
+    assert tmpdir.listdir() == [dest]
+
+
+def test_get_object_not_changed_when_dest_has_same_md5(
+    mocker, object_storage_client, call_with_backoff_patch, tmpdir
+):
+    dest = tmpdir.join("myobject")
+    dest.write_binary(b"content")
+    response = get_response(mocker, [b"content"], get_md5(b"content"))
+    call_with_backoff_patch.return_value = response
+
+    result = oci_object.get_object(object_storage_client, get_module(str(dest)))
+
+    assert result["changed"] is False
+    response.data.raw.stream.assert_not_called()
+
+
+class FakeObjectStorageClient(object):
+    """Serves the byte ranges of content, failing the stream of the ranges in failing_ranges once"""
+
+    def __init__(self, mocker, content, headers, failing_ranges=()):
+        self.mocker = mocker
+        self.content = content
+        self.headers = dict(headers, **{"Content-Length": str(len(content))})
+        self.failing_ranges = set(failing_ranges)
+        self.ranges = []
+
+    def head_object(self, **kwargs):
+        response = self.mocker.MagicMock()
+        response.headers = self.headers
+        return response
+
+    def get_object(self, range, if_match=None, **kwargs):
+        start, end = [int(byte) for byte in range[len("bytes=") :].split("-")]
+        self.ranges.append((start, end))
+        response = self.mocker.MagicMock()
+        if (start, end) in self.failing_ranges:
+            self.failing_ranges.remove((start, end))
+            response.data.raw.stream.side_effect = IOError("Connection reset")
+        else:
+            response.data.raw.stream.return_value = iter(
+                [self.content[start : end + 1]]
+            )
+        return response
+
+
+def get_multipart_md5(content, part_size):
+    part_digests = b"".join(
+        hashlib.md5(content[start : start + part_size]).digest()
+        for start in range(0, len(content), part_size)
+    )
+    return "{0}-{1}".format(
+        get_md5(part_digests), (len(content) + part_size - 1) // part_size
+    )
+
+
+def test_get_object_downloads_large_object_in_ranges(mocker, tmpdir):
+    mocker.patch.object(oci_object_storage_utils, "DOWNLOAD_PART_SIZE", 4)
+    dest = tmpdir.join("myobject")
+    content = b"0123456789abcdefghij!"
+    client = FakeObjectStorageClient(
+        mocker,
+        content,
+        {"ETag": "myetag", "opc-multipart-md5": get_multipart_md5(content, 4)},
+        failing_ranges=[(8, 11)],
+    )
+    module = get_module(str(dest))
+    module.params["parallel_downloads"] = True
+
+    result = oci_object.get_object(client, module)
+
+    assert result["changed"] is True
+    assert dest.read_binary() == content
+    assert sorted(client.ranges) == [
+        (0, 3),
+        (4, 7),
+        (8, 11),
+        (8, 11),
+        (12, 15),
+        (16, 19),
+        (20, 20),
+    ]
+    assert tmpdir.listdir() == [dest]
+
+
+def test_get_object_in_ranges_of_multipart_object_with_other_part_size(mocker, tmpdir):
+    # The object has as many parts as there are ranges, but its parts of 7 bytes are not the ranges of 8 bytes
+    mocker.patch.object(oci_object_storage_utils, "DOWNLOAD_PART_SIZE", 8)
+    dest = tmpdir.join("myobject")
+    content = b"0123456789abcdefghij"
+    client = FakeObjectStorageClient(
+        mocker,
+        content,
+        {"ETag": "myetag", "opc-multipart-md5": get_multipart_md5(content, 7)},
+    )
+    module = get_module(str(dest))
+    module.params["parallel_downloads"] = True
+
+    result = oci_object.get_object(client, module)
+
+    assert result["changed"] is True
+    assert dest.read_binary() == content
+    assert sorted(client.ranges) == [(0, 7), (8, 15), (16, 19)]
+
+
+def test_download_object_in_parts_verifies_multipart_md5_of_known_part_size(
+    mocker, tmpdir
+):
+    dest = tmpdir.join("myobject")
+    content = b"0123456789abcdefghij"
+    headers = {"opc-multipart-md5": get_multipart_md5(content, 7)}
+    client = FakeObjectStorageClient(mocker, content, headers)
+
+    assert oci_object_storage_utils.download_object_in_parts(
+        client, str(dest), len(content), headers, upload_part_size=7
+    ) == get_multipart_md5(content, 7)
+    assert sorted(client.ranges) == [(0, 6), (7, 13), (14, 19)]
+
+    headers = {"opc-multipart-md5": get_multipart_md5(b"0123456789abcdefghiJ", 7)}
+    with pytest.raises(ValueError):
+        oci_object_storage_utils.download_object_in_parts(
+            client, str(dest), len(content), headers, upload_part_size=7
+        )
+    assert dest.read_binary() == content
+
+
+def test_get_object_in_ranges_leaves_dest_unchanged_when_md5_does_not_match(
+    mocker, tmpdir
+):
+    mocker.patch.object(oci_object_storage_utils, "DOWNLOAD_PART_SIZE", 4)
+    dest = tmpdir.join("myobject")
+    dest.write_binary(b"old content")
+    client = FakeObjectStorageClient(
+        mocker, b"new content", {"Content-MD5": get_md5(b"other content")}
+    )
+    module = get_module(str(dest))
+    module.params["parallel_downloads"] = True
+
+    with pytest.raises(Exception) as exc_info:
+        oci_object.get_object(client, module)
+
+    assert "does not match the expected MD5" in str(exc_info.value)
+    assert dest.read_binary() == b"old content"
+    assert tmpdir.listdir() == [dest]
+
+
+def get_put_module(src):
+    return FakeModule(
+        namespace_name="mynamespace",
+        bucket_name="mybucket",
+        object_name="myobject",
+        src=src,
+        content_type=None,
+        content_length=None,
+        content_md5=None,
+        content_language=None,
+        content_encoding=None,
+        opc_meta=None,
+        multipart_upload=True,
+        parallel_uploads=True,
+    )
+
+
+def test_put_object_not_changed_when_multipart_object_has_same_md5(
+    mocker, object_storage_client, call_with_backoff_patch, tmpdir
+):
+    mocker.patch.object(oci_object_storage_utils, "UPLOAD_PART_SIZE", 4)
+    upload_manager_patch = mocker.patch.object(oci_object, "UploadManager")
+    src = tmpdir.join("myobject")
+    src.write_binary(b"0123456789")
+    head_response = mocker.MagicMock()
+    head_response.headers = {
+        "Content-Length": "10",
+        "opc-multipart-md5": get_multipart_md5(b"0123456789", 4),
+    }
+    call_with_backoff_patch.return_value = head_response
+
+    result = oci_object.put_object(object_storage_client, get_put_module(str(src)))
+
+    assert result["changed"] is False
+    upload_manager_patch.assert_not_called()
+
+    # The md5 of the file is cached until the file changes
+    get_file_multipart_md5_patch = mocker.patch.object(
+        oci_object_storage_utils, "get_file_multipart_md5"
+    )
+    result = oci_object.put_object(object_storage_client, get_put_module(str(src)))
+
+    assert result["changed"] is False
+    get_file_multipart_md5_patch.assert_not_called()
+
+
+def test_put_object_does_not_hash_src_when_size_differs(
+    mocker, object_storage_client, call_with_backoff_patch, tmpdir
+):
+    get_cached_file_md5_patch = mocker.patch.object(
+        oci_object_storage_utils, "get_cached_file_md5"
+    )
+    mocker.patch.object(oci_object, "UploadManager")
+    src = tmpdir.join("myobject")
+    src.write_binary(b"0123456789")
+    head_response = mocker.MagicMock()
+    head_response.headers = {"Content-Length": "11", "Content-MD5": "md5"}
+    call_with_backoff_patch.return_value = head_response
+
+    result = oci_object.put_object(object_storage_client, get_put_module(str(src)))
+
+    assert result["changed"] is True
+    get_cached_file_md5_patch.assert_not_called()
+
+
+def test_put_object_streams_src_when_not_multipart(
+    mocker, object_storage_client, call_with_backoff_patch, tmpdir
+):
+    src = tmpdir.join("myobject")
+    src.write_binary(b"0123456789")
+    mocker.patch.object(oci_object, "head_object", return_value=None)
+    module = get_put_module(str(src))
+    module.params["multipart_upload"] = False
+
+    result = oci_object.put_object(object_storage_client, module)
+
+    assert result["changed"] is True
+    kwargs = call_with_backoff_patch.call_args[1]
+    assert kwargs["put_object_body"].name == str(src).encode()
+    assert kwargs["content_length"] == 10
+
+
+@pytest.mark.skipif(
+    not hasattr(oci.util, "should_record_body_position_for_retry"),
+    reason="The SDK does not retry the requests with a file body",
+)
+def test_put_object_retry_sends_the_whole_src(monkeypatch, mocker, tmpdir):
+    # The requests go through the rate limiter, which must not prevent the SDK from rewinding the body
+    monkeypatch.setenv(oci_common_utils.RATE_LIMIT_ENV_VAR, "20")
+    mocker.patch("time.sleep")
+    src = tmpdir.join("myobject")
+    src.write_binary(b"0123456789" * 1000)
+    client = oci.object_storage.ObjectStorageClient(
+        dict(
+            user="ocid1.user.oc1..xxx",
+            tenancy="ocid1.tenancy.oc1..xxx",
+            fingerprint=":".join(["aa"] * 16),
+            key_file="~/.oci/oci_api_key.pem",
+            region="us-ashburn-1",
+        ),
+        signer=mocker.Mock(),
+    )
+    bodies = []
+
+    def request(request, *args, **kwargs):
+        bodies.append(request.body.read())
+        if len(bodies) == 1:
+            raise oci.exceptions.ServiceError(
+                503, "ServiceUnavailable", {}, "Unavailable"
+            )
+        return oci.response.Response(200, {"opc-content-md5": "md5"}, None, request)
+
+    mocker.patch.object(client.base_client, "request", side_effect=request)
+    mocker.patch.object(oci_object, "head_object", return_value=None)
+    module = get_put_module(str(src))
+    module.params["multipart_upload"] = False
+
+    result = oci_object.put_object(client, module)
+
+    assert result["changed"] is True
+    assert bodies == [src.read_binary(), src.read_binary()]
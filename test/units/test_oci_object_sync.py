@@ -0,0 +1,228 @@
+# Copyright (c) 2019, Oracle and/or its affiliates.
+# This software is made available to you under the terms of the GPL 3.0 license or the Apache 2.0 license.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+# Apache License v2.0
+# See LICENSE.TXT for details.
+
+import base64
+import hashlib
+
+import pytest
+from nose.plugins.skip import SkipTest
+from ansible.modules.cloud.oracle import oci_object_sync
+from ansible.module_utils.oracle import oci_common_utils, oci_utils
+
+try:
+    from oci.object_storage.models import ListObjects, ObjectSummary
+    from oci.exceptions import MultipartUploadError, ServiceError
+    from oci._vendor.requests.exceptions import ConnectionError
+except ImportError:
+    raise SkipTest("test_oci_object_sync.py requires `oci` module")
+
+
+class FakeModule(object):
+    def __init__(self, check_mode=False, **kwargs):
+        self.params = kwargs
+        self.check_mode = check_mode
+
+    def fail_json(self, *args, **kwargs):
+        self.exit_args = args
+        self.exit_kwargs = kwargs
+        raise Exception(kwargs["msg"])
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmpdir_factory):
+    cache_dir = tmpdir_factory.mktemp("cache")
+    monkeypatch.setenv(oci_common_utils.CACHE_DIR_ENV_VAR, str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture()
+def object_storage_client(mocker):
+    mock_ob_store = mocker.patch(
+        "oci.object_storage.object_storage_client.ObjectStorageClient"
+    )
+    return mock_ob_store.return_value
+
+
+@pytest.fixture()
+def list_all_resources_patch(mocker):
+    return mocker.patch.object(oci_utils, "list_all_resources")
+
+
+@pytest.fixture()
+def call_with_backoff_patch(mocker):
+    return mocker.patch.object(oci_utils, "call_with_backoff")
+
+
+@pytest.fixture()
+def upload_manager_patch(mocker):
+    return mocker.patch.object(oci_object_sync, "UploadManager")
+
+
+def get_module(src_dir, **kwargs):
+    params = dict(
+        namespace_name="mynamespace",
+        bucket_name="mybucket",
+        src_dir=src_dir,
+        prefix="backups/",
+        delete=True,
+        parallel_count=2,
+    )
+    params.update(kwargs)
+    return FakeModule(**params)
+
+
+def get_object_summary(name, content):
+    return ObjectSummary(
+        name=name,
+        size=len(content),
+        md5=base64.b64encode(hashlib.md5(content).digest()).decode("ascii"),
+    )
+
+
+def get_src_dir(tmpdir):
+    src_dir = tmpdir.mkdir("src")
+    src_dir.join("unchanged.txt").write_binary(b"unchanged")
+    src_dir.join("changed.txt").write_binary(b"new content")
+    src_dir.mkdir("dir").join("new.txt").write_binary(b"new")
+    return src_dir
+
+
+def test_sync_dir_uploads_and_deletes_the_differences(
+    object_storage_client,
+    list_all_resources_patch,
+    call_with_backoff_patch,
+    upload_manager_patch,
+    tmpdir,
+):
+    src_dir = get_src_dir(tmpdir)
+    list_all_resources_patch.return_value = ListObjects(
+        objects=[
+            get_object_summary("backups/unchanged.txt", b"unchanged"),
+            get_object_summary("backups/changed.txt", b"old content"),
+            get_object_summary("backups/deleted.txt", b"deleted"),
+        ]
+    )
+
+    result = oci_object_sync.sync_dir(
+        object_storage_client, get_module(str(src_dir))
+    )
+
+    assert result["changed"] is True
+    assert result["uploaded"] == ["backups/changed.txt", "backups/dir/new.txt"]
+    assert result["deleted"] == ["backups/deleted.txt"]
+    assert result["unchanged"] == ["backups/unchanged.txt"]
+    assert result["failed"] == []
+    list_all_resources_patch.assert_called_once()
+    assert list_all_resources_patch.call_args[1]["prefix"] == "backups/"
+    assert sorted(
+        call_args[1]["object_name"]
+        for call_args in call_with_backoff_patch.call_args_list
+    ) == ["backups/changed.txt", "backups/deleted.txt", "backups/dir/new.txt"]
+
+
+def test_sync_dir_with_prefix_without_slash_only_syncs_its_directory(
+    object_storage_client,
+    list_all_resources_patch,
+    call_with_backoff_patch,
+    upload_manager_patch,
+    tmpdir,
+):
+    src_dir = get_src_dir(tmpdir)
+    list_all_resources_patch.return_value = ListObjects(
+        objects=[
+            get_object_summary("backups/unchanged.txt", b"unchanged"),
+            get_object_summary("backups/deleted.txt", b"deleted"),
+        ]
+    )
+
+    result = oci_object_sync.sync_dir(
+        object_storage_client, get_module(str(src_dir), prefix="backups")
+    )
+
+    # The objects of backups2/ or backups-old/ are not listed, uploaded or deleted
+    assert list_all_resources_patch.call_args[1]["prefix"] == "backups/"
+    assert result["uploaded"] == ["backups/changed.txt", "backups/dir/new.txt"]
+    assert result["deleted"] == ["backups/deleted.txt"]
+    assert result["unchanged"] == ["backups/unchanged.txt"]
+
+
+def test_sync_dir_in_check_mode_does_not_change_the_bucket(
+    object_storage_client,
+    list_all_resources_patch,
+    call_with_backoff_patch,
+    upload_manager_patch,
+    tmpdir,
+):
+    src_dir = get_src_dir(tmpdir)
+    list_all_resources_patch.return_value = ListObjects(
+        objects=[get_object_summary("backups/deleted.txt", b"deleted")]
+    )
+    module = get_module(str(src_dir))
+    module.check_mode = True
+
+    result = oci_object_sync.sync_dir(object_storage_client, module)
+
+    assert result["changed"] is True
+    assert len(result["uploaded"]) == 3
+    assert result["deleted"] == ["backups/deleted.txt"]
+    call_with_backoff_patch.assert_not_called()
+
+
+def test_sync_dir_reports_the_failed_uploads(
+    object_storage_client,
+    list_all_resources_patch,
+    call_with_backoff_patch,
+    upload_manager_patch,
+    tmpdir,
+):
+    src_dir = get_src_dir(tmpdir)
+    list_all_resources_patch.return_value = ListObjects(objects=[])
+
+    def upload_file(fn, object_name, **kwargs):
+        if object_name == "backups/changed.txt":
+            raise ServiceError(500, "InternalServerError", dict(), "Upload failed")
+
+    call_with_backoff_patch.side_effect = upload_file
+
+    result = oci_object_sync.sync_dir(
+        object_storage_client, get_module(str(src_dir), delete=False)
+    )
+
+    assert result["uploaded"] == ["backups/dir/new.txt", "backups/unchanged.txt"]
+    assert result["failed"] == [dict(name="backups/changed.txt", msg="Upload failed")]
+
+
+def test_sync_dir_reports_any_error_of_an_object(
+    object_storage_client,
+    list_all_resources_patch,
+    call_with_backoff_patch,
+    upload_manager_patch,
+    tmpdir,
+):
+    src_dir = get_src_dir(tmpdir)
+    list_all_resources_patch.return_value = ListObjects(
+        objects=[get_object_summary("backups/deleted.txt", b"deleted")]
+    )
+
+    def call_with_backoff(fn, object_name, **kwargs):
+        if object_name == "backups/changed.txt":
+            raise MultipartUploadError()
+        if object_name == "backups/deleted.txt":
+            raise ConnectionError("Connection aborted")
+
+    call_with_backoff_patch.side_effect = call_with_backoff
+
+    result = oci_object_sync.sync_dir(
+        object_storage_client, get_module(str(src_dir))
+    )
+
+    assert result["uploaded"] == ["backups/dir/new.txt", "backups/unchanged.txt"]
+    assert [failed["name"] for failed in result["failed"]] == [
+        "backups/changed.txt",
+        "backups/deleted.txt",
+    ]
+    assert "MultipartUploadError" in result["failed"][0]["msg"]
+    assert result["failed"][1]["msg"] == "Connection aborted"
@@ -171,3 +171,34 @@ def test_convert_input_data_to_model_class_polymorphic_input_type_ignore_fields_
     assert isinstance(model, oci.core.models.InstanceSourceViaImageDetails)
     assert model.image_id == image_id
     assert model.source_type == source_type
+
+
+def test_get_model_conversion_plan_is_cached():
+    module, fields = oci_resource_utils.get_model_conversion_plan(
+        oci.core.models.LaunchInstanceDetails
+    )
+    assert module is oci.core.models
+    fields = dict((attr, (field_type, cls)) for attr, field_type, cls in fields)
+    assert fields["create_vnic_details"] == (
+        oci_resource_utils.MODEL_FIELD,
+        oci.core.models.CreateVnicDetails,
+    )
+    assert fields["display_name"] == (None, None)
+    assert oci_resource_utils.get_model_conversion_plan(
+        oci.core.models.LaunchInstanceDetails
+    ) is oci_resource_utils.get_model_conversion_plan(
+        oci.core.models.LaunchInstanceDetails
+    )
+
+
+def test_custom_class_index_matches_helper_modules():
+    custom_class_mapping = oci_resource_utils.get_custom_class_mapping(
+        oci_resource_utils.HELPER_PACKAGES.values()
+    )
+    assert set(oci_resource_utils.CUSTOM_CLASS_INDEX) == set(custom_class_mapping)
+    for class_name, custom_class in custom_class_mapping.items():
+        assert oci_resource_utils.get_custom_class(class_name) is custom_class
+    assert (
+        oci_resource_utils.get_custom_class("NonExistentHelperCustom")
+        is oci_resource_utils.DefaultHelperCustom
+    )
@@ -888,6 +888,39 @@ def test_create_or_update_security_list_fails_when_ingress_security_rules_are_no
     assert check_and_create_resource_patch.call_count == 0
 
 
+def test_get_hashed_security_rules_share_generated_classes_and_hash_by_structure():
+    rules = [
+        IngressSecurityRule(
+            source="0.0.0.0/0",
+            protocol="6",
+            tcp_options=TcpOptions(destination_port_range=PortRange(min=22, max=80)),
+        ),
+        IngressSecurityRule(
+            source="0.0.0.0/0",
+            protocol="6",
+            tcp_options=TcpOptions(destination_port_range=PortRange(min=80, max=22)),
+        ),
+    ]
+    hashed_rules = oci_security_list.get_hashed_security_rules(
+        "ingress_security_rules", rules
+    )
+    assert type(hashed_rules[0]) is type(hashed_rules[1])
+    assert type(hashed_rules[0].tcp_options.destination_port_range) is type(
+        oci_utils.create_hashed_instance(PortRange)
+    )
+    assert hash(hashed_rules[0]) != hash(hashed_rules[1])
+    assert len(set(hashed_rules)) == 2
+    assert (
+        set(
+            oci_security_list.get_hashed_security_rules(
+                "ingress_security_rules", rules[:1]
+            )
+        )
+        & set(hashed_rules)
+        == set(hashed_rules[:1])
+    )
+
+
 def get_security_rules(
     security_rule_type,
     security_rule_flavour,